@@ -0,0 +1,19 @@
+from exportacion.motor import Columna, Exportacion, registrar
+
+from .models import Acudiente
+
+EXPORTACION_ACUDIENTES = registrar(Exportacion(
+    nombre='acudientes',
+    queryset=Acudiente.objects.all(),
+    columnas=[
+        Columna('tipo_documento_acudiente', 'tipo_documento_acudiente'),
+        Columna('numero_documento_acudiente', 'numero_documento_acudiente'),
+        Columna('nombre_acudiente', 'nombre_acudiente'),
+        Columna('apellido_acudiente', 'apellido_acudiente'),
+        Columna('celular_acudiente', 'celular_acudiente'),
+    ],
+    filtros={
+        'tipo_documento_acudiente': 'tipo_documento_acudiente',
+    },
+    orden=('id_acudiente',),
+))
@@ -12,14 +12,11 @@ from .serializers import AcudienteSerializer
 from rest_framework.permissions import IsAuthenticated, AllowAny
 #Permisos
 from cuenta.permissions import IsEstudiante, IsProfesor, IsAdministrador, IsProfesorOrAdministrador, IsEstudianteOrAdministrador
-#HTTP
-from django.http import HttpResponse
-#fecha y hora 
-from datetime import datetime
 #Acciones
 from rest_framework.decorators import action
-#pandas
-import pandas as pd
+#Exportacion
+from exportacion.motor import responder_exportacion
+from .exportaciones import EXPORTACION_ACUDIENTES
 
 class AcudienteViewSet(viewsets.ModelViewSet):
     """
@@ -119,7 +116,10 @@ class AcudienteViewSet(viewsets.ModelViewSet):
     
     @swagger_auto_schema(
         operation_summary="Exportar acudientes a Excel",
-        operation_description="Genera un archivo Excel con la lista completa de acudientes",
+        operation_description=(
+            "Genera en streaming el archivo con la lista de acudientes (xlsx por defecto o "
+            "`?formato=csv`). Con `?segundo_plano=1` se genera como trabajo de exportación."
+        ),
         responses={
             status.HTTP_200_OK: "Archivo Excel generado correctamente",
             status.HTTP_500_INTERNAL_SERVER_ERROR: "Error al generar el archivo Excel"
@@ -128,15 +128,6 @@ class AcudienteViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='export-excel',
             permission_classes=[IsAdministrador])
     def export_excel(self, request):
-        acudientes = Acudiente.objects.all().values(
-            'tipo_documento_acudiente', 'numero_documento_acudiente',
-            'nombre_acudiente', 'apellido_acudiente', 'celular_acudiente'
-        )
-        df = pd.DataFrame(list(acudientes))
-        filename = f'acudientes_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        df.to_excel(response, index=False)
-        return response
+        return responder_exportacion(request, EXPORTACION_ACUDIENTES)
 
 
@@ -0,0 +1,46 @@
+import pytest
+from rest_framework.test import APIClient
+
+from administrador.models import Administrador
+from cuenta.models import CustomUser
+
+
+def _crear_administrador(documento, correo):
+    user = CustomUser.objects.create_user(username=documento, password='adminpass123', user_type='administrador')
+    return Administrador.objects.create(
+        user=user,
+        nombre='Carlos',
+        apellido='Perez',
+        correo=correo,
+        contrasena='adminpass123',
+        numero_documento=documento,
+    )
+
+
+@pytest.mark.django_db
+def test_partial_update_valida_campos_de_cuenta():
+    admin = _crear_administrador('11111111', 'carlos@example.com')
+    _crear_administrador('22222222', 'otro@example.com')
+    client = APIClient()
+    client.force_authenticate(user=admin.user)
+    url = f'/administrador/admin/{admin.id_administrador}/'
+
+    respuesta = client.patch(url, {'numero_documento': '22222222'}, format='json')
+    assert respuesta.status_code == 400
+    assert 'numero_documento' in respuesta.data
+
+    respuesta = client.patch(url, {'correo': 'no-es-correo'}, format='json')
+    assert respuesta.status_code == 400
+    assert 'correo' in respuesta.data
+
+    admin.refresh_from_db()
+    admin.user.refresh_from_db()
+    assert admin.numero_documento == '11111111'
+    assert admin.correo == 'carlos@example.com'
+    assert admin.user.username == '11111111'
+
+    respuesta = client.patch(url, {'correo': 'nuevo@example.com', 'nombre': 'Carla'}, format='json')
+    assert respuesta.status_code == 200
+    admin.user.refresh_from_db()
+    assert admin.user.email == 'nuevo@example.com'
+    assert admin.user.first_name == 'Carla'
@@ -1,6 +1,6 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.contrib.auth.hashers import make_password
+from cuenta.contrasenas import hashear
 
 #Documentacion
 from drf_yasg.utils import swagger_auto_schema
@@ -8,6 +8,8 @@ from drf_yasg import openapi
 #Modelo
 from .models import Administrador
 from cuenta.models import CustomUser
+from cuenta.perfiles import actualizar_perfil, validar_datos_cuenta
+from auditlog.context import set_actor
 #Serializadores
 from .serializers import AdministradorSerializer
 #Autenticacion
@@ -63,8 +65,8 @@ class AdministradorViewSet(viewsets.ModelViewSet):
         if not data.get('contrasena'):
             data['contrasena'] = data.get('numero_documento', '')
 
-        # Hashear la contraseña
-        hashed_password = make_password(data['contrasena'])
+        # Se hashea una sola vez: el mismo hash va al usuario y al perfil (ver cuenta/contrasenas.py)
+        hashed_password = hashear(data['contrasena'])
 
         # Crear el usuario sin contraseña y asignarla usando set_password
         user = CustomUser.objects.create(
@@ -123,8 +125,23 @@ class AdministradorViewSet(viewsets.ModelViewSet):
         operation_description="Actualiza uno o más campos de un administrador existente"
     )
     def partial_update(self, request, *args, **kwargs):
-        kwargs['partial'] = True
-        return self.update(request, *args, **kwargs)
+        data = request.data.copy()
+        instance = self.get_object()
+
+        # Los campos de cuenta se validan antes de que actualizar_perfil los consuma
+        validar_datos_cuenta(self.get_serializer(instance), data)
+
+        with set_actor(request.user):
+            # Datos de cuenta sincronizados con el usuario en un solo save por tabla (ver cuenta/perfiles.py)
+            actualizar_perfil(instance, data)
+
+            if data:
+                serializer = self.get_serializer(instance, data=data, partial=True)
+                serializer.is_valid(raise_exception=True)
+                self.perform_update(serializer)
+            else:
+                serializer = self.get_serializer(instance)
+        return Response(serializer.data)
     
     @swagger_auto_schema(
         operation_summary="Eliminar un administrador",
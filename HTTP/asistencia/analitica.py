@@ -0,0 +1,230 @@
+"""
+Analítica de asistencia calculada en la base de datos.
+
+Los clientes descargaban todas las asistencias (`list`, sin paginar) y
+calculaban los porcentajes en el frontend. Aquí:
+
+- Los conteos (registros y asistencias por inscripción) salen de un GROUP BY
+  por semana e inscripción, filtrado por inscripción y fecha: lo sirve el
+  índice de la restricción única (id_inscripcion, fecha_asistencia, sesion).
+- Las semanas cerradas (de lunes a domingo, anteriores a la actual y
+  completas dentro del rango pedido) se guardan en caché; solo las semanas
+  abiertas o parciales se consultan cada vez, en la misma consulta que las
+  semanas cerradas que falten. Registrar o cambiar asistencias de una semana
+  cerrada, cambiar el grupo, módulo u oferta de una inscripción, o el
+  profesor de un grupo (o borrar el grupo), invalida la caché (incrementando
+  su versión, ver signals.py y toma.py).
+- El riesgo de deserción es la racha actual de ausencias consecutivas, con
+  una suma acumulada (función de ventana) de asistencias por inscripción,
+  ordenada de la más reciente a la más antigua: las filas donde aún vale 0
+  son las ausencias seguidas al final.
+- Los porcentajes por grupo y por módulo suman los conteos por estudiante.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, F, IntegerField, Min, Q, Sum, Value, When, Window
+from django.db.models.functions import Lower, Trim, TruncWeek
+from django.utils import timezone
+
+from inscripcion.models import Inscripcion
+
+from .models import Asistencia
+
+# Estados (en minúsculas) que cuentan como asistencia; los demás son ausencias
+ESTADOS_ASISTENCIA = ('asistio', 'asistió', 'presente', 'tarde', 'llego tarde', 'llegó tarde')
+
+CLAVE_VERSION = 'asistencia:analitica:version'
+TTL_SEMANA = 60 * 60 * 24 * 7
+
+
+def ausencias_riesgo():
+    """Ausencias consecutivas a partir de las cuales se marca riesgo de deserción."""
+    return getattr(settings, 'ASISTENCIA_AUSENCIAS_RIESGO', 3)
+
+
+def lunes(fecha):
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def _version():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, 1, timeout=None)
+        version = cache.get(CLAVE_VERSION, 1)
+    return version
+
+
+def invalidar_analitica():
+    """Invalida los conteos en caché de todas las semanas cerradas."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, 2, timeout=None)
+
+
+def invalidar_si_semana_cerrada(*fechas):
+    """Solo los cambios en semanas ya cerradas afectan la caché."""
+    inicio_semana = lunes(timezone.localdate())
+    if any(fecha is not None and fecha < inicio_semana for fecha in fechas):
+        invalidar_analitica()
+
+
+def _asistio():
+    return Case(
+        When(estado_normalizado__in=ESTADOS_ASISTENCIA, then=Value(1)),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+
+
+def _asistencias(inscripciones):
+    return Asistencia.objects.filter(id_inscripcion__in=inscripciones.values('id_inscripcion')).annotate(
+        estado_normalizado=Lower(Trim('estado_asistencia'))
+    )
+
+
+def _semanas_cerradas(desde, hasta):
+    """Lunes de las semanas completas dentro de [desde, hasta] anteriores a la actual."""
+    primera = lunes(desde) if desde.weekday() == 0 else lunes(desde) + timedelta(days=7)
+    limite = min(lunes(hasta + timedelta(days=1)), lunes(timezone.localdate()))
+    semanas = []
+    while primera < limite:
+        semanas.append(primera)
+        primera += timedelta(days=7)
+    return semanas
+
+
+def conteos_por_inscripcion(inscripciones, desde, hasta, alcance):
+    """
+    `{id_inscripcion: [registros, asistencias]}` entre `desde` y `hasta`. Una
+    lectura de caché y, como mucho, una consulta. `alcance` identifica el
+    filtro de `inscripciones` en las llaves de la caché.
+    """
+    semanas = _semanas_cerradas(desde, hasta)
+    version = _version()
+    claves = {semana: f'asistencia:analitica:{version}:{alcance}:{semana.isoformat()}' for semana in semanas}
+    en_cache = cache.get_many(list(claves.values()))
+    por_semana = {semana: en_cache[clave] for semana, clave in claves.items() if clave in en_cache}
+
+    # Rangos a consultar: semanas cerradas que faltan y lo que queda fuera de ellas
+    rangos = [(semana, semana + timedelta(days=6)) for semana in semanas if semana not in por_semana]
+    if semanas:
+        if desde < semanas[0]:
+            rangos.append((desde, semanas[0] - timedelta(days=1)))
+        if semanas[-1] + timedelta(days=6) < hasta:
+            rangos.append((semanas[-1] + timedelta(days=7), hasta))
+    else:
+        rangos.append((desde, hasta))
+
+    abiertas = {}
+    if rangos:
+        filtro = Q()
+        for inicio, fin in rangos:
+            filtro |= Q(fecha_asistencia__range=(inicio, fin))
+        filas = (
+            _asistencias(inscripciones).filter(filtro).order_by()
+            .annotate(semana=TruncWeek('fecha_asistencia'))
+            .values('semana', 'id_inscripcion')
+            .annotate(registros=Count('pk'), asistencias=Sum(_asistio()))
+        )
+        nuevas = {semana: {} for semana in claves if semana not in por_semana}
+        for fila in filas:
+            destino = nuevas.get(fila['semana'], abiertas)
+            anterior = destino.get(fila['id_inscripcion'], [0, 0])
+            destino[fila['id_inscripcion']] = [anterior[0] + fila['registros'], anterior[1] + fila['asistencias']]
+        if nuevas:
+            cache.set_many({claves[semana]: conteos for semana, conteos in nuevas.items()}, TTL_SEMANA)
+        por_semana.update(nuevas)
+
+    totales = {}
+    for conteos in [*por_semana.values(), abiertas]:
+        for id_inscripcion, (registros, asistencias) in conteos.items():
+            anterior = totales.get(id_inscripcion, [0, 0])
+            totales[id_inscripcion] = [anterior[0] + registros, anterior[1] + asistencias]
+    return totales
+
+
+def rachas_de_ausencias(inscripciones, hasta):
+    """`{id_inscripcion: ausencias consecutivas más recientes}` hasta la fecha dada (una consulta)."""
+    asistencias_posteriores = Window(
+        Sum(_asistio()),
+        partition_by=[F('id_inscripcion')],
+        order_by=[F('fecha_asistencia').desc(), F('sesion').desc(nulls_last=True), F('id_asistencia').desc()],
+    )
+    filas = (
+        _asistencias(inscripciones).filter(fecha_asistencia__lte=hasta)
+        .annotate(asistencias_posteriores=asistencias_posteriores)
+        .filter(asistencias_posteriores=0)
+        .values_list('id_inscripcion', flat=True)
+    )
+    rachas = {}
+    for id_inscripcion in filas:
+        rachas[id_inscripcion] = rachas.get(id_inscripcion, 0) + 1
+    return rachas
+
+
+def _porcentaje(registros, asistencias):
+    return round(100 * asistencias / registros, 2) if registros else None
+
+
+def _acumular(destino, llave, base, fila):
+    item = destino.setdefault(llave, {**base, 'estudiantes': 0, 'registros': 0, 'asistencias': 0, 'en_riesgo': 0})
+    item['estudiantes'] += 1
+    item['registros'] += fila['registros']
+    item['asistencias'] += fila['asistencias']
+    item['en_riesgo'] += int(fila['riesgo_desercion'])
+
+
+def analitica_asistencia(inscripciones, desde=None, hasta=None, umbral=None, alcance='todas'):
+    """
+    Porcentaje de asistencia por estudiante, grupo y módulo y riesgo de
+    deserción (`umbral` o más ausencias consecutivas) de `inscripciones`.
+    """
+    umbral = umbral or ausencias_riesgo()
+    hasta = hasta or timezone.localdate()
+    if desde is None:
+        desde = _asistencias(inscripciones).aggregate(desde=Min('fecha_asistencia'))['desde'] or hasta
+
+    estudiantes = list(
+        inscripciones.order_by('grupo__nombre', 'id_estudiante__apellido', 'id_estudiante__nombre', 'id_inscripcion')
+        .values(
+            'id_inscripcion', 'grupo',
+            nombre=F('id_estudiante__nombre'),
+            apellido=F('id_estudiante__apellido'),
+            grupo_nombre=F('grupo__nombre'),
+            modulo=F('id_modulo'),
+            modulo_nombre=F('id_modulo__nombre_modulo'),
+        )
+    )
+    conteos = conteos_por_inscripcion(inscripciones, desde, hasta, alcance) if desde <= hasta else {}
+    rachas = rachas_de_ausencias(inscripciones, hasta)
+
+    grupos = {}
+    modulos = {}
+    for fila in estudiantes:
+        registros, asistencias = conteos.get(fila['id_inscripcion'], [0, 0])
+        racha = rachas.get(fila['id_inscripcion'], 0)
+        fila.update(
+            registros=registros,
+            asistencias=asistencias,
+            porcentaje=_porcentaje(registros, asistencias),
+            ausencias_consecutivas=racha,
+            riesgo_desercion=racha >= umbral,
+        )
+        _acumular(grupos, fila['grupo'], {'grupo': fila['grupo'], 'grupo_nombre': fila['grupo_nombre'] or 'Sin grupo'}, fila)
+        _acumular(modulos, fila['modulo'], {'modulo': fila['modulo'], 'modulo_nombre': fila['modulo_nombre'] or 'N/A'}, fila)
+
+    for item in [*grupos.values(), *modulos.values()]:
+        item['porcentaje'] = _porcentaje(item['registros'], item['asistencias'])
+
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'ausencias_riesgo': umbral,
+        'en_riesgo': sum(1 for fila in estudiantes if fila['riesgo_desercion']),
+        'estudiantes': estudiantes,
+        'grupos': list(grupos.values()),
+        'modulos': list(modulos.values()),
+    }
@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:12
+
+from django.db import migrations, models
+
+
+def eliminar_duplicados(apps, schema_editor):
+    """Conserva el registro más reciente de cada (inscripción, fecha, sesión)."""
+    from django.db.models import Count, Max
+
+    Asistencia = apps.get_model('asistencia', 'Asistencia')
+    duplicados = (
+        Asistencia.objects.order_by()
+        .values('id_inscripcion', 'fecha_asistencia', 'sesion')
+        .annotate(cantidad=Count('pk'), ultimo=Max('pk'))
+        .filter(cantidad__gt=1)
+    )
+    for fila in list(duplicados):
+        Asistencia.objects.filter(
+            id_inscripcion=fila['id_inscripcion'],
+            fecha_asistencia=fila['fecha_asistencia'],
+            sesion=fila['sesion'],
+        ).exclude(pk=fila['ultimo']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asistencia', '0005_alter_asistencia_sesion'),
+        ('inscripcion', '0009_indices_filtros'),
+    ]
+
+    operations = [
+        migrations.RunPython(eliminar_duplicados, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='asistencia',
+            constraint=models.UniqueConstraint(fields=('id_inscripcion', 'fecha_asistencia', 'sesion'), name='asistencia_unica_por_sesion', nulls_distinct=False),
+        ),
+    ]
@@ -15,6 +15,15 @@ class Asistencia(models.Model):
         verbose_name = 'Asistencia'
         verbose_name_plural = 'Asistencias'
         ordering = ['fecha_asistencia']
+        constraints = [
+            # Un registro por inscripción, fecha y sesión (sin sesión cuenta como una sola).
+            # Su índice sirve también las consultas por (id_inscripcion, fecha_asistencia).
+            models.UniqueConstraint(
+                fields=['id_inscripcion', 'fecha_asistencia', 'sesion'],
+                name='asistencia_unica_por_sesion',
+                nulls_distinct=False,
+            ),
+        ]
 
     def __str__(self):
         return f'Asistencia {self.id_asistencia} - {self.id_inscripcion} - {self.fecha_asistencia} - {self.estado_asistencia} - {self.comentarios}'
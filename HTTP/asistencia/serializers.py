@@ -16,10 +16,46 @@ class AsistenciaSerializer(serializers.ModelSerializer):
         source='id_inscripcion',           
         write_only=True                    
     )
+    # La restricción única (inscripción, fecha, sesión) la volvería obligatoria
+    sesion = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None)
 
     class Meta:
         model = Asistencia
         fields = '__all__'
         read_only_fields = [
             'id_asistencia'
-        ]
\ No newline at end of file
+        ]
+
+    def validate(self, attrs):
+        # UniqueTogetherValidator no valida cuando sesion es None, pero la
+        # restricción (nulls_distinct=False) trata "sin sesión" como un solo valor
+        def actual(campo):
+            return attrs[campo] if campo in attrs else getattr(self.instance, campo, None)
+
+        if actual('sesion') is None:
+            repetidas = Asistencia.objects.filter(
+                id_inscripcion=actual('id_inscripcion'),
+                fecha_asistencia=actual('fecha_asistencia'),
+                sesion__isnull=True,
+            )
+            if self.instance is not None:
+                repetidas = repetidas.exclude(pk=self.instance.pk)
+            if repetidas.exists():
+                raise serializers.ValidationError(
+                    'Ya existe una asistencia sin sesión para esta inscripción y fecha.',
+                    code='unique',
+                )
+        return attrs
+
+class RegistroSesionSerializer(serializers.Serializer):
+    """Estado de un estudiante en la toma de asistencia de una sesión (ver asistencia/toma.py)."""
+    id_inscripcion = serializers.IntegerField()
+    estado_asistencia = serializers.CharField(max_length=20)
+    comentarios = serializers.CharField(max_length=500, required=False, allow_blank=True)
+
+
+class SesionAsistenciaSerializer(serializers.Serializer):
+    """Grupo, fecha y sesión de una toma de asistencia."""
+    grupo = serializers.IntegerField()
+    fecha_asistencia = serializers.DateField()
+    sesion = serializers.CharField(required=False, allow_null=True, allow_blank=True, default=None)
@@ -0,0 +1,70 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from grupo.models import Grupo
+from inscripcion.models import Inscripcion
+from .models import Asistencia
+from .analitica import invalidar_analitica, invalidar_si_semana_cerrada
+
+
+# ---------------------------------------------------------------------------
+# Analítica de asistencia: conteos en caché de las semanas cerradas
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Asistencia)
+def analitica_asistencia_pre_save(sender, instance, raw=False, **kwargs):
+    instance._fecha_previa = None
+    if raw or not instance.pk:
+        return
+    instance._fecha_previa = Asistencia.objects.filter(pk=instance.pk).values_list('fecha_asistencia', flat=True).first()
+
+
+@receiver(post_save, sender=Asistencia)
+@receiver(post_delete, sender=Asistencia)
+def analitica_asistencia_cambio(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidar_si_semana_cerrada(instance.fecha_asistencia, getattr(instance, '_fecha_previa', None))
+
+
+# Campos de Inscripcion que forman parte del alcance de la analítica (filtros
+# de la vista) -> columna. Cambiarlos mueve los conteos de un alcance a otro.
+ALCANCE_INSCRIPCION = {'grupo': 'grupo_id', 'id_modulo': 'id_modulo_id', 'oferta_academica': 'oferta_academica_id'}
+
+
+@receiver(pre_save, sender=Inscripcion)
+def analitica_inscripcion_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._alcance_asistencia_cambio = False
+    if raw or not instance.pk or (update_fields is not None and not set(ALCANCE_INSCRIPCION) & set(update_fields)):
+        return
+    anterior = Inscripcion.objects.filter(pk=instance.pk).values(*ALCANCE_INSCRIPCION.values()).first()
+    instance._alcance_asistencia_cambio = anterior is not None and any(
+        anterior[columna] != getattr(instance, columna) for columna in ALCANCE_INSCRIPCION.values()
+    )
+
+
+@receiver(post_save, sender=Inscripcion)
+def analitica_inscripcion_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_alcance_asistencia_cambio', False):
+        invalidar_analitica()
+
+
+@receiver(pre_save, sender=Grupo)
+def analitica_grupo_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    # El profesor del grupo define el alcance de la analítica de los profesores
+    instance._profesor_cambio = False
+    if raw or not instance.pk or (update_fields is not None and 'profesor' not in update_fields):
+        return
+    anterior = Grupo.objects.filter(pk=instance.pk).values_list('profesor_id', flat=True).first()
+    instance._profesor_cambio = anterior != instance.profesor_id
+
+
+@receiver(post_save, sender=Grupo)
+def analitica_grupo_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_profesor_cambio', False):
+        invalidar_analitica()
+
+
+@receiver(post_delete, sender=Grupo)
+def analitica_grupo_post_delete(sender, instance, **kwargs):
+    # Las inscripciones quedan sin grupo con un UPDATE que no emite señales
+    invalidar_analitica()
@@ -1,3 +1,131 @@
-from django.test import TestCase
+from datetime import timedelta
 
-# Create your tests here.
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Asistencia
+
+
+@pytest.mark.django_db
+def test_sesion_guarda_por_lote_y_no_duplica(inscripcion_instance, profesor_instance, django_assert_max_num_queries):
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    toma = {
+        'grupo': inscripcion_instance.grupo_id,
+        'fecha_asistencia': '2026-06-16',
+        'sesion': '1',
+        'asistencias': [
+            {'id_inscripcion': inscripcion_instance.pk, 'estado_asistencia': 'Asistio'},
+            {'id_inscripcion': 999999, 'estado_asistencia': 'Asistio'},
+            {'id_inscripcion': inscripcion_instance.pk},
+        ],
+    }
+
+    with django_assert_max_num_queries(7):
+        respuesta = client.post('/asistencia/asis/sesion/', toma, format='json')
+
+    assert respuesta.status_code == 200
+    assert [r['estado'] for r in respuesta.data['resultados']] == ['creado', 'error', 'error']
+    assert respuesta.data['sesion']['resumen'] == {'Asistio': 1}
+
+    toma['asistencias'] = [{'id_inscripcion': inscripcion_instance.pk, 'estado_asistencia': 'No asistio'}]
+    respuesta = client.post('/asistencia/asis/sesion/', toma, format='json')
+
+    assert respuesta.data['resultados'][0]['estado'] == 'actualizado'
+    assert list(Asistencia.objects.values_list('estado_asistencia', flat=True)) == ['No asistio']
+
+    respuesta = client.get('/asistencia/asis/sesion/', {'grupo': inscripcion_instance.grupo_id, 'fecha_asistencia': '2026-06-16'})
+    assert respuesta.data['resumen'] == {'sin_registro': 1}
+
+
+@pytest.mark.django_db
+def test_analitica_porcentajes_riesgo_y_cache_de_semanas_cerradas(inscripcion_instance, profesor_instance, django_assert_max_num_queries):
+    # Tres semanas cerradas: asistió, luego tres ausencias seguidas
+    hoy = timezone.localdate()
+    inicio = hoy - timedelta(days=hoy.weekday() + 21)
+    estados = ['Asistio', 'No asistio', 'No asistio', 'No asistio']
+    Asistencia.objects.bulk_create([
+        Asistencia(id_inscripcion=inscripcion_instance, fecha_asistencia=inicio + timedelta(days=5 * i), estado_asistencia=estado)
+        for i, estado in enumerate(estados)
+    ])
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    parametros = {'desde': inicio.isoformat(), 'hasta': (inicio + timedelta(days=20)).isoformat()}
+
+    respuesta = client.get('/asistencia/asis/analitica/', parametros)
+
+    assert respuesta.status_code == 200
+    estudiante = respuesta.data['estudiantes'][0]
+    assert (estudiante['registros'], estudiante['asistencias'], estudiante['porcentaje']) == (4, 1, 25.0)
+    assert estudiante['ausencias_consecutivas'] == 3 and estudiante['riesgo_desercion']
+    assert respuesta.data['grupos'][0]['en_riesgo'] == 1
+
+    # Las tres semanas están en caché: solo el perfil, los estudiantes y las rachas
+    with django_assert_max_num_queries(3):
+        assert client.get('/asistencia/asis/analitica/', parametros).data['estudiantes'][0]['porcentaje'] == 25.0
+
+    # Corregir una semana cerrada invalida la caché
+    asistencia = Asistencia.objects.get(fecha_asistencia=inicio + timedelta(days=15))
+    asistencia.estado_asistencia = 'Asistio'
+    asistencia.save()
+    estudiante = client.get('/asistencia/asis/analitica/', parametros).data['estudiantes'][0]
+    assert (estudiante['porcentaje'], estudiante['ausencias_consecutivas'], estudiante['riesgo_desercion']) == (50.0, 0, False)
+
+
+@pytest.mark.django_db
+def test_analitica_invalida_la_cache_al_cambiar_oferta_o_profesor(inscripcion_instance, profesor_instance):
+    from datetime import date
+    from profesor.models import Profesor
+    from oferta_academica.models import OfertaAcademica
+
+    hoy = timezone.localdate()
+    inicio = hoy - timedelta(days=hoy.weekday() + 7)
+    Asistencia.objects.create(id_inscripcion=inscripcion_instance, fecha_asistencia=inicio, estado_asistencia='Asistio')
+    parametros = {'desde': inicio.isoformat(), 'hasta': (inicio + timedelta(days=6)).isoformat()}
+    admin = get_user_model().objects.create_user(username='admin_analitica', password='x', user_type='administrador')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    # Semana cerrada en caché para el alcance de una oferta sin inscripciones
+    otra_oferta = OfertaAcademica.objects.create(nombre='Semestre 2026-II', fecha_inicio=date(2026, 8, 1), estado='inscripcion')
+    assert client.get('/asistencia/asis/analitica/', {**parametros, 'oferta_academica': otra_oferta.pk}).data['estudiantes'] == []
+    inscripcion_instance.oferta_academica = otra_oferta
+    inscripcion_instance.save()
+    estudiante = client.get('/asistencia/asis/analitica/', {**parametros, 'oferta_academica': otra_oferta.pk}).data['estudiantes'][0]
+    assert (estudiante['registros'], estudiante['porcentaje']) == (1, 100.0)
+
+    # Lo mismo para un profesor al que se le asigna el grupo
+    nuevo = Profesor.objects.create(
+        user=get_user_model().objects.create_user(username='prof_nuevo', password='x', user_type='profesor'),
+        nombre='Nuevo', apellido='Profesor', numero_documento='55555555', email='nuevo@example.com',
+        ciudad_residencia='Cali', eps='Sura', tipo_documento='CC', genero='Femenino',
+        fecha_nacimiento=date(1990, 1, 1), telefono_fijo='3333333', celular='3000000002',
+        departamento_residencia='Valle', comuna_residencia='17', direccion_residencia='Calle 1',
+        area_desempeño='Física', grado_escolaridad='Magister',
+    )
+    client.force_authenticate(user=nuevo.user)
+    assert client.get('/asistencia/asis/analitica/', parametros).data['estudiantes'] == []
+    grupo = inscripcion_instance.grupo
+    grupo.profesor = nuevo
+    grupo.save()
+    estudiante = client.get('/asistencia/asis/analitica/', parametros).data['estudiantes'][0]
+    assert (estudiante['registros'], estudiante['porcentaje']) == (1, 100.0)
+
+
+@pytest.mark.django_db
+def test_asistencia_sin_sesion_repetida_responde_400(inscripcion_instance, profesor_instance):
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    asistencia = {
+        'id_inscripcion_id': inscripcion_instance.pk,
+        'fecha_asistencia': '2026-06-16',
+        'estado_asistencia': 'Asistio',
+    }
+
+    assert client.post('/asistencia/asis/', asistencia, format='json').status_code == 201
+    respuesta = client.post('/asistencia/asis/', asistencia, format='json')
+
+    assert respuesta.status_code == 400
+    assert Asistencia.objects.count() == 1
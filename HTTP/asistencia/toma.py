@@ -0,0 +1,144 @@
+"""
+Toma de asistencia de una sesión completa en una sola petición.
+
+`create` con una lista pasa por ListSerializer: un INSERT por fila y una
+consulta por fila para validar `id_inscripcion`, y reenviar la lista
+duplicaba los registros. `registrar_sesion`:
+
+1. Valida cada fila por separado (sin consultas) y reporta sus errores.
+2. Verifica en una sola consulta que las inscripciones pertenezcan al grupo.
+3. Hace upsert con `bulk_create(update_conflicts=True)` sobre la restricción
+   única (id_inscripcion, fecha_asistencia, sesion): reenviar la toma
+   actualiza los estados en lugar de duplicarlos.
+4. Retorna la sesión consolidada: todas las inscripciones del grupo con su
+   estado (o None si no tienen registro), en una consulta con LEFT JOIN.
+"""
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+
+from inscripcion.models import Inscripcion
+
+from .analitica import invalidar_si_semana_cerrada
+from .models import Asistencia
+from .serializers import RegistroSesionSerializer
+
+MAXIMO_REGISTROS = 500
+
+
+def _validar_filas(filas):
+    resultados = []
+    vistas = set()
+    for indice, fila in enumerate(filas):
+        serializer = RegistroSesionSerializer(data=fila)
+        if not serializer.is_valid():
+            resultados.append({
+                'fila': indice,
+                'id_inscripcion': fila.get('id_inscripcion') if isinstance(fila, dict) else None,
+                'estado': 'error',
+                'errores': serializer.errors,
+            })
+            continue
+        datos = serializer.validated_data
+        if datos['id_inscripcion'] in vistas:
+            resultados.append({
+                'fila': indice,
+                'id_inscripcion': datos['id_inscripcion'],
+                'estado': 'error',
+                'errores': {'id_inscripcion': ['La inscripción aparece más de una vez en la sesión.']},
+            })
+            continue
+        vistas.add(datos['id_inscripcion'])
+        resultados.append({'fila': indice, 'id_inscripcion': datos['id_inscripcion'], 'estado': 'pendiente', 'datos': datos})
+    return resultados
+
+
+def _condicion_sesion(fecha, sesion):
+    condicion = Q(asistencia__fecha_asistencia=fecha)
+    return condicion & (Q(asistencia__sesion=sesion) if sesion is not None else Q(asistencia__sesion__isnull=True))
+
+
+def sesion_consolidada(grupo_id, fecha, sesion):
+    """Inscripciones del grupo con su registro de la sesión (LEFT JOIN filtrado)."""
+    condicion = _condicion_sesion(fecha, sesion)
+    filas = list(
+        Inscripcion.objects.filter(grupo_id=grupo_id)
+        .annotate(registro=FilteredRelation('asistencia', condition=condicion))
+        .order_by('id_estudiante__apellido', 'id_estudiante__nombre', 'id_inscripcion')
+        .values(
+            'id_inscripcion',
+            nombre=F('id_estudiante__nombre'),
+            apellido=F('id_estudiante__apellido'),
+            numero_documento=F('id_estudiante__numero_documento'),
+            id_asistencia=F('registro__id_asistencia'),
+            estado_asistencia=F('registro__estado_asistencia'),
+            comentarios=F('registro__comentarios'),
+        )
+    )
+    resumen = {}
+    for fila in filas:
+        clave = fila['estado_asistencia'] or 'sin_registro'
+        resumen[clave] = resumen.get(clave, 0) + 1
+    return {
+        'grupo': grupo_id,
+        'fecha_asistencia': fecha,
+        'sesion': sesion,
+        'total': len(filas),
+        'resumen': resumen,
+        'asistencias': filas,
+    }
+
+
+def registrar_sesion(grupo_id, fecha, sesion, filas):
+    """
+    Guarda la asistencia de `filas` para el grupo, la fecha y la sesión
+    indicados. Retorna el resultado de cada fila, en orden, y la sesión
+    consolidada.
+    """
+    resultados = _validar_filas(filas)
+    ids = [r['id_inscripcion'] for r in resultados if r['estado'] == 'pendiente']
+    # Inscripciones del grupo y si ya tenían registro en la sesión
+    condicion = _condicion_sesion(fecha, sesion)
+    existentes = dict(
+        Inscripcion.objects.filter(grupo_id=grupo_id, id_inscripcion__in=ids)
+        .annotate(registro=FilteredRelation('asistencia', condition=condicion))
+        .values_list('id_inscripcion', 'registro__id_asistencia')
+    ) if ids else {}
+
+    por_campos = {}
+    for resultado in resultados:
+        if resultado['estado'] != 'pendiente':
+            continue
+        if resultado['id_inscripcion'] not in existentes:
+            resultado.update(estado='error', errores={'id_inscripcion': ['La inscripción no existe o no pertenece al grupo.']})
+            del resultado['datos']
+            continue
+        campos = tuple(sorted(campo for campo in resultado['datos'] if campo != 'id_inscripcion'))
+        por_campos.setdefault(campos, []).append(resultado)
+
+    with transaction.atomic():
+        for campos, grupo in por_campos.items():
+            objetos = Asistencia.objects.bulk_create(
+                [
+                    Asistencia(
+                        id_inscripcion_id=resultado['id_inscripcion'],
+                        fecha_asistencia=fecha,
+                        sesion=sesion,
+                        **{campo: resultado['datos'][campo] for campo in campos},
+                    )
+                    for resultado in grupo
+                ],
+                update_conflicts=True,
+                unique_fields=['id_inscripcion', 'fecha_asistencia', 'sesion'],
+                # Sin comentarios en la fila se conservan los anteriores
+                update_fields=list(campos),
+            )
+            for resultado, objeto in zip(grupo, objetos):
+                del resultado['datos']
+                resultado.update(
+                    estado='actualizado' if existentes[resultado['id_inscripcion']] else 'creado',
+                    id_asistencia=objeto.pk,
+                )
+    if por_campos:
+        # bulk_create no emite señales
+        invalidar_si_semana_cerrada(fecha)
+    return resultados, sesion_consolidada(grupo_id, fecha, sesion)
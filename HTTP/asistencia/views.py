@@ -8,11 +8,17 @@ from drf_yasg import openapi
 #Modelo
 from .models import Asistencia
 #Serializador
-from .serializers import AsistenciaSerializer
+from .serializers import AsistenciaSerializer, SesionAsistenciaSerializer
+from .toma import MAXIMO_REGISTROS, registrar_sesion, sesion_consolidada
+from .analitica import analitica_asistencia, ausencias_riesgo
+from inscripcion.models import Inscripcion
+from datetime import date
 #Autenticacion
 from rest_framework.permissions import IsAuthenticated
 #Permisos
 from cuenta.permissions import IsAdministrador, IsProfesorOrAdministrador
+from cuenta.authentication import perfil_id_de
+from grupo.models import Grupo
 
 class AsistenciaViewSet(viewsets.ModelViewSet):
     """
@@ -28,7 +34,7 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
         Define permisos según la acción solicitada:
         - Create, list, retrieve, update, partial_update, destroy: Profesores y administradores
         """
-        if self.action in ['create', 'list', 'partial_update', 'destroy', 'retrieve'] :
+        if self.action in ['create', 'list', 'partial_update', 'destroy', 'retrieve', 'sesion', 'analitica'] :
             permission_classes = [IsProfesorOrAdministrador]
         else:
             permission_classes = [IsAdministrador]
@@ -95,4 +101,134 @@ class AsistenciaViewSet(viewsets.ModelViewSet):
         }
     )
     def destroy(self, request, *args, **kwargs):
-        return super().destroy(request, *args, **kwargs)
\ No newline at end of file
+        return super().destroy(request, *args, **kwargs)
+
+    def _grupo_no_permitido(self, request, grupo_id):
+        """Respuesta de error si el grupo no existe o no es del profesor autenticado."""
+        grupos = Grupo.objects.filter(id=grupo_id)
+        if request.user.user_type == 'profesor':
+            grupos = grupos.filter(profesor_id=perfil_id_de(request))
+        if not grupos.exists():
+            return Response({"error": "El grupo no existe o no tienes permiso sobre él"}, status=status.HTTP_404_NOT_FOUND)
+        return None
+
+    @swagger_auto_schema(
+        method='get',
+        operation_summary="Consultar la asistencia de una sesión",
+        operation_description="Retorna todas las inscripciones del grupo con su estado en la fecha y sesión indicadas.",
+        manual_parameters=[
+            openapi.Parameter('grupo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True),
+            openapi.Parameter('fecha_asistencia', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, required=True),
+            openapi.Parameter('sesion', openapi.IN_QUERY, type=openapi.TYPE_STRING),
+        ]
+    )
+    @swagger_auto_schema(
+        method='post',
+        operation_summary="Registrar la asistencia de una sesión",
+        operation_description=(
+            "Guarda en una sola petición la asistencia de los estudiantes de un grupo para una fecha "
+            "y sesión. Reenviar la toma actualiza los registros en lugar de duplicarlos. La respuesta "
+            "trae el resultado de cada fila (`creado`, `actualizado` o `error`) y la sesión consolidada. "
+            f"Máximo {MAXIMO_REGISTROS} registros."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            required=['grupo', 'fecha_asistencia', 'asistencias'],
+            properties={
+                'grupo': openapi.Schema(type=openapi.TYPE_INTEGER),
+                'fecha_asistencia': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+                'sesion': openapi.Schema(type=openapi.TYPE_STRING),
+                'asistencias': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                        'id_inscripcion': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'estado_asistencia': openapi.Schema(type=openapi.TYPE_STRING),
+                        'comentarios': openapi.Schema(type=openapi.TYPE_STRING),
+                    })
+                ),
+            }
+        ),
+        responses={200: "Resultado por fila y sesión consolidada", 400: "Datos inválidos", 404: "Grupo no encontrado"}
+    )
+    @action(detail=False, methods=['get', 'post'], url_path='sesion')
+    def sesion(self, request):
+        datos = request.query_params if request.method == 'GET' else request.data
+        serializer = SesionAsistenciaSerializer(data=datos)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        grupo_id = serializer.validated_data['grupo']
+        fecha = serializer.validated_data['fecha_asistencia']
+        sesion = serializer.validated_data['sesion'] or None
+
+        error = self._grupo_no_permitido(request, grupo_id)
+        if error is not None:
+            return error
+
+        if request.method == 'GET':
+            return Response(sesion_consolidada(grupo_id, fecha, sesion))
+
+        filas = request.data.get('asistencias')
+        if not isinstance(filas, list) or not filas:
+            return Response({"error": "Se espera una lista no vacía en 'asistencias'"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(filas) > MAXIMO_REGISTROS:
+            return Response({"error": f"La sesión supera el máximo de {MAXIMO_REGISTROS} registros"}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultados, consolidada = registrar_sesion(grupo_id, fecha, sesion, filas)
+        errores = sum(1 for resultado in resultados if resultado['estado'] == 'error')
+        return Response({
+            "guardadas": len(resultados) - errores,
+            "errores": errores,
+            "resultados": resultados,
+            "sesion": consolidada,
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Analítica de asistencia",
+        operation_description=(
+            "Porcentaje de asistencia por estudiante, grupo y módulo, calculado en la base de datos, y "
+            "riesgo de deserción (estudiantes cuyas últimas `ausencias_riesgo` asistencias son ausencias). "
+            "Los profesores solo ven sus grupos. Los conteos de semanas cerradas se sirven desde caché."
+        ),
+        manual_parameters=[
+            openapi.Parameter('desde', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Fecha inicial (por defecto, la primera asistencia)"),
+            openapi.Parameter('hasta', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE, description="Fecha final (por defecto, hoy)"),
+            openapi.Parameter('grupo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por grupo"),
+            openapi.Parameter('modulo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por módulo"),
+            openapi.Parameter('oferta_academica', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por oferta académica"),
+            openapi.Parameter('ausencias_riesgo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description=f"Ausencias consecutivas para marcar riesgo (por defecto {ausencias_riesgo()})"),
+        ],
+        responses={200: "Analítica de asistencia", 400: "Parámetros inválidos"}
+    )
+    @action(detail=False, methods=['get'], url_path='analitica')
+    def analitica(self, request):
+        filtros = {}
+        for parametro, lookup in (('grupo', 'grupo'), ('modulo', 'id_modulo'), ('oferta_academica', 'oferta_academica')):
+            valor = request.query_params.get(parametro)
+            if valor:
+                if not valor.isdigit():
+                    return Response({"error": f"'{parametro}' debe ser un id numérico"}, status=status.HTTP_400_BAD_REQUEST)
+                filtros[lookup] = int(valor)
+
+        try:
+            desde = request.query_params.get('desde')
+            desde = date.fromisoformat(desde) if desde else None
+            hasta = request.query_params.get('hasta')
+            hasta = date.fromisoformat(hasta) if hasta else None
+            umbral = int(request.query_params.get('ausencias_riesgo', ausencias_riesgo()))
+        except ValueError:
+            return Response({"error": "Las fechas deben tener formato AAAA-MM-DD y 'ausencias_riesgo' ser numérico"}, status=status.HTTP_400_BAD_REQUEST)
+        if umbral < 1:
+            return Response({"error": "'ausencias_riesgo' debe ser mayor que 0"}, status=status.HTTP_400_BAD_REQUEST)
+        if desde and hasta and desde > hasta:
+            return Response({"error": "'desde' no puede ser posterior a 'hasta'"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.user.user_type == 'profesor':
+            profesor_id = perfil_id_de(request)
+            if profesor_id is None:
+                return Response({"error": "No se encontró perfil de profesor"}, status=status.HTTP_404_NOT_FOUND)
+            filtros['grupo__profesor_id'] = profesor_id
+
+        # El alcance (filtros, incluido el profesor) forma parte de las llaves de la caché
+        alcance = ','.join(f'{lookup}={valor}' for lookup, valor in sorted(filtros.items())) or 'todas'
+        inscripciones = Inscripcion.objects.filter(**filtros)
+        return Response(analitica_asistencia(inscripciones, desde, hasta, umbral, alcance))
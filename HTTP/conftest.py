@@ -3,6 +3,19 @@ from datetime import date
 
 # Configuración global de fixtures para las pruebas unitarias de los serializadores
 
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    """La caché (LocMem) sobrevive al rollback de cada prueba; se limpia antes de cada una."""
+    from django.core.cache import cache
+    from cuenta.authentication import cache_local
+    cache.clear()
+    cache_local.clear()
+
+@pytest.fixture(autouse=True)
+def channel_layer_en_memoria(settings):
+    """Las pruebas no dependen de un Redis en `redis:6379` para los WebSockets."""
+    settings.CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+
 @pytest.fixture
 def test_user(db):
     """Fixture para crear un usuario de prueba de tipo estudiante."""
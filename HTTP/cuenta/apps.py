@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CuentaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cuenta'
+
+    def ready(self):
+        import cuenta.auditoria  # noqa: F401
+        from cuenta import authentication, identidad, sesiones
+        identidad.conectar_senales()
+        authentication.conectar_senales()
+        sesiones.conectar_senales()
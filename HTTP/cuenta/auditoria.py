@@ -0,0 +1,24 @@
+"""
+Captura directa de las entradas de auditoría (django-auditlog).
+
+Al escribir un LogEntry, auditlog emite la señal `post_log` con la instancia
+auditada. Aquí se guarda la entrada en la propia instancia, de modo que las
+vistas pueden enlazarla a sus campos `audit_*` sin volver a buscar "la última
+entrada" en la tabla de logs (que crece sin límite y, con peticiones
+concurrentes, puede devolver la entrada de otra petición).
+"""
+from auditlog.signals import post_log
+from django.dispatch import receiver
+
+ATRIBUTO_ENTRADA = '_entrada_auditoria'
+
+
+@receiver(post_log)
+def capturar_entrada_auditoria(sender, instance, log_entry=None, **kwargs):
+    if log_entry is not None:
+        setattr(instance, ATRIBUTO_ENTRADA, log_entry)
+
+
+def entrada_auditoria(instance):
+    """Último LogEntry escrito por auditlog al guardar esta instancia (o None)."""
+    return getattr(instance, ATRIBUTO_ENTRADA, None)
@@ -1,8 +1,317 @@
+"""
+Autenticación por token con caché.
+
+TokenAuthentication hace en cada petición
+`Token.objects.select_related('user').get(key=...)`, y muchas vistas
+consultan después el perfil (`Profesor.objects.get(user=...)`...). Aquí la
+sesión (token, campos del usuario sin la contraseña y llave del perfil) se
+resuelve con una sola consulta y se guarda en dos niveles:
+
+- Un LRU local por proceso, con TTL corto (TOKEN_CACHE_TTL_LOCAL).
+- La caché compartida de Django (Redis si está configurada), con TTL más
+  largo (TOKEN_CACHE_TTL). TOKEN_CACHE_ALIAS vacío la desactiva.
+
+La llave del perfil queda en `request.perfil_id` (usar `perfil_id_de`). Al
+eliminar un token (logout) o al guardar o eliminar un usuario se invalida la
+sesión en la caché compartida y en el LRU del proceso; los demás procesos
+la descartan como máximo al vencer su TTL local. Las revocaciones en lote
+(cuenta/sesiones.py) cambian la generación de la caché compartida, lo que
+descarta todas las sesiones guardadas allí; cada proceso relee la
+generación como máximo cada TOKEN_GENERACION_INTERVALO segundos y descarta
+también las sesiones de su LRU que sean de una generación anterior.
+
+Los tokens vencen (TTL deslizante, ver cuenta/sesiones.py): la sesión en
+caché incluye `expira` y cada uso la extiende.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
 from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from . import sesiones
+
+# Relación inversa en CustomUser -> llave del perfil. Profesores y monitores
+# heredan de Usuario, así que su llave es el id de Usuario.
+LLAVES_PERFIL = {
+    'estudiante': 'estudiante__id_estudiante',
+    'administrador': 'administrador__id_administrador',
+    'usuario': 'usuario__id',
+}
+SIN_PERFIL = object()
+CLAVE_GENERACION = 'sesion:generacion'
+
+
+class CacheLocal:
+    """LRU con TTL, seguro entre hilos."""
+
+    def __init__(self, maximo, ttl):
+        self.maximo = maximo
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                return None
+            vence, valor = entrada
+            if vence < time.monotonic():
+                del self._datos[clave]
+                return None
+            self._datos.move_to_end(clave)
+            return valor
+
+    def set(self, clave, valor):
+        with self._lock:
+            self._datos[clave] = (time.monotonic() + self.ttl, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maximo:
+                self._datos.popitem(last=False)
+
+    def delete(self, clave):
+        with self._lock:
+            self._datos.pop(clave, None)
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
+
+
+cache_local = CacheLocal(
+    getattr(settings, 'TOKEN_CACHE_MAX_LOCAL', 10000),
+    getattr(settings, 'TOKEN_CACHE_TTL_LOCAL', 30),
+)
+
+
+# (generación, momento de la lectura) de la caché compartida en este proceso
+_generacion_local = (None, float('-inf'))
+
+
+def _cache_compartida():
+    alias = getattr(settings, 'TOKEN_CACHE_ALIAS', 'default')
+    return caches[alias] if alias else None
+
+
+def _clave(key):
+    return f'sesion:token:{key}'
+
+
+def _clave_usuario(user_id):
+    return f'sesion:usuario:{user_id}'
+
+
+def _campos_usuario():
+    return [
+        field.attname for field in get_user_model()._meta.concrete_fields
+        if field.attname != 'password'
+    ]
+
+
+def _perfil_de_fila(fila, prefijo=''):
+    for llave in LLAVES_PERFIL.values():
+        if fila.get(prefijo + llave) is not None:
+            return fila[prefijo + llave]
+    return None
+
+
+def _consultar_sesion(key):
+    """Token, usuario y llave del perfil en una sola consulta."""
+    campos = _campos_usuario()
+    fila = Token.objects.filter(key=key).values(
+        'key', 'created', 'expiracion__expira', *[f'user__{campo}' for campo in campos],
+        *[f'user__{llave}' for llave in LLAVES_PERFIL.values()],
+    ).first()
+    if fila is None:
+        return None
+    return {
+        'token': {'key': fila['key'], 'user_id': fila['user__id'], 'created': fila['created']},
+        'usuario': {campo: fila[f'user__{campo}'] for campo in campos},
+        'perfil_id': _perfil_de_fila(fila, 'user__'),
+        'expira': fila['expiracion__expira'],
+    }
+
+
+def _guardar_compartida(compartida, key, sesion):
+    ttl = getattr(settings, 'TOKEN_CACHE_TTL', 300)
+    compartida.set_many({
+        _clave(key): sesion,
+        _clave_usuario(sesion['token']['user_id']): key,
+    }, ttl)
+
 
-class BearerTokenAuthentication(TokenAuthentication):
+def _generacion_compartida(compartida):
+    """Generación de la caché compartida, releída a lo sumo cada TOKEN_GENERACION_INTERVALO segundos."""
+    global _generacion_local
+    generacion, leida = _generacion_local
+    ahora = time.monotonic()
+    if ahora - leida >= getattr(settings, 'TOKEN_GENERACION_INTERVALO', 1):
+        generacion = compartida.get(CLAVE_GENERACION, 0)
+        _generacion_local = (generacion, ahora)
+    return generacion
+
+
+def obtener_sesion(key):
+    """Sesión del token desde el LRU local, la caché compartida o la base."""
+    global _generacion_local
+    compartida = _cache_compartida()
+    sesion = cache_local.get(key)
+    if sesion is not None:
+        # Una revocación en lote hecha en otro proceso solo limpió su propio LRU
+        if compartida is None or sesion.get('generacion') == _generacion_compartida(compartida):
+            return sesion
+        cache_local.delete(key)
+    generacion = None
+    if compartida is not None:
+        valores = compartida.get_many([_clave(key), CLAVE_GENERACION])
+        generacion = valores.get(CLAVE_GENERACION, 0)
+        _generacion_local = (generacion, time.monotonic())
+        sesion = valores.get(_clave(key))
+        # Sesiones guardadas antes de una revocación en lote se descartan
+        if sesion is not None and sesion.get('generacion') != generacion:
+            sesion = None
+    if sesion is None:
+        sesion = _consultar_sesion(key)
+        if sesion is None:
+            return None
+        sesion['generacion'] = generacion
+        if compartida is not None:
+            _guardar_compartida(compartida, key, sesion)
+    cache_local.set(key, sesion)
+    return sesion
+
+
+def renovar_sesion(key, sesion):
+    """
+    Extiende el vencimiento del token y actualiza la sesión en caché. Retorna
+    None si el token ya no está vigente (p. ej. revocado desde otro proceso).
+    """
+    expira = sesiones.renovar(key)
+    if expira is None:
+        invalidar_token(key)
+        return None
+    sesion = dict(sesion, expira=expira)
+    cache_local.set(key, sesion)
+    compartida = _cache_compartida()
+    if compartida is not None:
+        _guardar_compartida(compartida, key, sesion)
+    return sesion
+
+
+def nueva_generacion():
+    """Descarta todas las sesiones en caché (tras una revocación en lote)."""
+    global _generacion_local
+    cache_local.clear()
+    _generacion_local = (None, float('-inf'))
+    compartida = _cache_compartida()
+    if compartida is not None:
+        compartida.add(CLAVE_GENERACION, 0, None)
+        try:
+            compartida.incr(CLAVE_GENERACION)
+        except ValueError:
+            compartida.set(CLAVE_GENERACION, 1, None)
+
+
+def invalidar_token(key):
+    cache_local.delete(key)
+    compartida = _cache_compartida()
+    if compartida is not None:
+        compartida.delete(_clave(key))
+
+
+def invalidar_usuario(user_id):
+    """Invalida la sesión en caché del usuario (su token, si está cacheado)."""
+    compartida = _cache_compartida()
+    if compartida is not None:
+        # Si el token no está en la caché compartida tampoco sigue en ningún LRU local
+        key = compartida.get(_clave_usuario(user_id))
+        compartida.delete(_clave_usuario(user_id))
+    else:
+        key = Token.objects.filter(user_id=user_id).values_list('key', flat=True).first()
+    if key is not None:
+        invalidar_token(key)
+
+
+def _instancia(modelo, valores):
+    # from_db deja la contraseña diferida: un save() posterior no la sobrescribe
+    return modelo.from_db(DEFAULT_DB_ALIAS, list(valores), list(valores.values()))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication con la sesión en caché. Deja la llave del perfil del
+    usuario en `request.perfil_id`.
+    """
+
+    def authenticate(self, request):
+        resultado = super().authenticate(request)
+        if resultado is not None:
+            request.perfil_id = resultado[0]._perfil_id
+        return resultado
+
+    def authenticate_credentials(self, key):
+        sesion = obtener_sesion(key)
+        if sesion is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        ahora = timezone.now()
+        if sesion['expira'] is not None and sesion['expira'] <= ahora:
+            raise exceptions.AuthenticationFailed('Token expirado. Inicie sesión nuevamente.')
+        if sesiones.debe_renovarse(sesion['expira'], ahora):
+            sesion = renovar_sesion(key, sesion)
+            if sesion is None:
+                raise exceptions.AuthenticationFailed('Token expirado. Inicie sesión nuevamente.')
+        user = _instancia(get_user_model(), sesion['usuario'])
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        user._perfil_id = sesion['perfil_id']
+        return (user, _instancia(Token, sesion['token']))
+
+
+class BearerTokenAuthentication(CachedTokenAuthentication):
     """
     Extiende TokenAuthentication para aceptar la palabra clave 'Bearer'
     en el encabezado de autorización, lo cual es estándar en muchos clientes REST.
     """
     keyword = 'Bearer'
+
+
+def perfil_id_de(request):
+    """
+    Llave del perfil (estudiante, administrador, profesor o monitor) del usuario
+    autenticado. Sin consultas si vino de CachedTokenAuthentication; con otro
+    método de autenticación se consulta una vez y se guarda en el request.
+    """
+    perfil_id = getattr(request, 'perfil_id', SIN_PERFIL)
+    if perfil_id is SIN_PERFIL:
+        perfil_id = None
+        if getattr(request.user, 'is_authenticated', False):
+            fila = get_user_model().objects.filter(pk=request.user.pk).values(*LLAVES_PERFIL.values()).first()
+            perfil_id = _perfil_de_fila(fila) if fila else None
+        request.perfil_id = perfil_id
+    return perfil_id
+
+
+def _token_eliminado(sender, instance, **kwargs):
+    invalidar_token(instance.key)
+
+
+def _usuario_modificado(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    invalidar_usuario(instance.pk)
+
+
+def conectar_senales():
+    post_delete.connect(_token_eliminado, sender=Token, dispatch_uid='sesion_token_eliminado')
+    post_save.connect(_usuario_modificado, sender=get_user_model(), dispatch_uid='sesion_usuario_guardado')
+    post_delete.connect(_usuario_modificado, sender=get_user_model(), dispatch_uid='sesion_usuario_eliminado')
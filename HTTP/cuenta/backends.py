@@ -0,0 +1,61 @@
+"""
+Backend de autenticación por número de documento.
+
+Igual que ModelBackend, pero la consulta del usuario trae con LEFT JOIN su
+token (con su vencimiento) y la llave de su perfil (estudiante,
+administrador o usuario para profesores y monitores). Así el login resuelve
+credenciales, token y perfil en una sola consulta en lugar de tres o cuatro.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+# user_type -> (relación inversa en CustomUser, llave del perfil). Para
+# profesores el login ha retornado siempre el id del usuario.
+PERFILES = {
+    'estudiante': ('estudiante', 'id_estudiante'),
+    'administrador': ('administrador', 'id_administrador'),
+    'monitor_academico': ('usuario', 'id'),
+    'monitor_administrativo': ('usuario', 'id'),
+}
+RELACIONES = ('auth_token__expiracion', 'estudiante', 'administrador', 'usuario')
+
+
+def usuarios_con_perfil():
+    """CustomUser con token y llaves de perfil cargados en la misma consulta."""
+    UserModel = get_user_model()
+    campos = [field.attname for field in UserModel._meta.concrete_fields]
+    return UserModel._default_manager.select_related(*RELACIONES).only(
+        *campos,
+        'auth_token__key', 'auth_token__user', 'auth_token__created',
+        'auth_token__expiracion__expira', 'auth_token__expiracion__token',
+        'estudiante__id_estudiante', 'estudiante__user',
+        'administrador__id_administrador', 'administrador__user',
+        'usuario__id', 'usuario__user',
+    )
+
+
+def perfil_id(user):
+    """Id específico del usuario según su tipo; no consulta si viene de `usuarios_con_perfil`."""
+    if user.user_type == 'profesor':
+        return user.id
+    relacion, llave = PERFILES.get(user.user_type, (None, None))
+    perfil = getattr(user, relacion, None) if relacion else None
+    return getattr(perfil, llave, None)
+
+
+class DocumentoBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = usuarios_con_perfil().get(**{UserModel.USERNAME_FIELD: username})
+        except UserModel.DoesNotExist:
+            # Hashea igual para no revelar por tiempo de respuesta si el usuario existe
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,78 @@
+"""
+Hasheo de contraseñas de las cuentas.
+
+PBKDF2 con las iteraciones por defecto de Django cuesta del orden de cientos
+de milisegundos de CPU por contraseña. Reglas de este módulo:
+
+- Se hashea una sola vez por contraseña: el mismo hash se guarda en
+  `CustomUser.password` y en la columna `contrasena` del perfil.
+- Las cargas masivas usan `hashear_lote` / `crear_usuarios_lote`, que hashean
+  en paralelo en un pool de hilos acotado (PASSWORD_HASH_WORKERS). hashlib
+  libera el GIL durante PBKDF2, así que los hilos aprovechan varios núcleos
+  sin el costo de un pool de procesos.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .models import CustomUser
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _obtener_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                hilos = getattr(settings, 'PASSWORD_HASH_WORKERS', None) or min(4, os.cpu_count() or 1)
+                _pool = ThreadPoolExecutor(max_workers=hilos, thread_name_prefix='hasheo')
+    return _pool
+
+
+def hashear(contrasena):
+    """Hash de la contraseña para guardar en el usuario y en el perfil."""
+    return make_password(contrasena)
+
+
+def hashear_lote(contrasenas):
+    """Hashes en paralelo, en el mismo orden de `contrasenas`."""
+    contrasenas = list(contrasenas)
+    if len(contrasenas) <= 1:
+        return [make_password(contrasena) for contrasena in contrasenas]
+    return list(_obtener_pool().map(make_password, contrasenas))
+
+
+def crear_usuarios_lote(cuentas, user_type, batch_size=500):
+    """
+    Modo de creación masiva para importaciones. `cuentas` es una lista de
+    dicts con `username` y opcionalmente `contrasena` (por defecto el
+    username, igual que en los create de las vistas), `first_name`,
+    `last_name`, `email` e `is_active`. Hashea todas las contraseñas en
+    paralelo y crea los usuarios con un bulk_create. Retorna los usuarios en
+    el mismo orden; `usuario.password` es el hash a reutilizar en la columna
+    `contrasena` del perfil.
+    """
+    cuentas = list(cuentas)
+    hashes = hashear_lote(cuenta.get('contrasena') or cuenta['username'] for cuenta in cuentas)
+    usuarios = [
+        CustomUser(
+            username=cuenta['username'],
+            password=hash_contrasena,
+            user_type=user_type,
+            first_name=cuenta.get('first_name') or '',
+            last_name=cuenta.get('last_name') or '',
+            email=cuenta.get('email') or '',
+            is_active=cuenta.get('is_active', True),
+            is_superuser=False,
+            is_staff=False,
+        )
+        for cuenta, hash_contrasena in zip(cuentas, hashes)
+    ]
+    with transaction.atomic():
+        return CustomUser.objects.bulk_create(usuarios, batch_size=batch_size)
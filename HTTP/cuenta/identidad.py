@@ -0,0 +1,176 @@
+"""
+Resolución de identidad por número de documento.
+
+Login, recuperación de contraseña, las búsquedas por documento y las cargas
+masivas necesitan saber a quién corresponde un documento. Aquí se resuelve
+`numero_documento -> Identidad(user_id, user_type, perfil_id)` con una sola
+consulta (UNION sobre las tres tablas que guardan documentos, cada una por su
+índice único de `numero_documento`) y con caché de lectura:
+
+- `resolver(documento)` consulta la caché y, si no está, la base de datos.
+  También se guardan los documentos inexistentes, por poco tiempo, para que
+  los intentos repetidos con documentos falsos no lleguen a la base.
+- `resolver_lote(documentos)` resuelve muchos documentos con un `get_many`
+  y una sola consulta para los que faltan (importaciones).
+- Guardar o eliminar un perfil invalida su documento actual y el anterior
+  (si cambió), con las señales conectadas en `conectar_senales`.
+
+El `perfil_id` es la llave primaria del perfil: id_estudiante,
+id_administrador o el id de Usuario (profesores y monitores heredan de él).
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, F, Value
+from django.db.models.signals import post_delete, post_save
+
+Identidad = namedtuple('Identidad', ['user_id', 'user_type', 'perfil_id'])
+
+PREFIJO = 'identidad'
+TTL_IDENTIDAD = 60 * 60
+TTL_INEXISTENTE = 60
+INEXISTENTE = []
+
+
+def _clave_documento(documento):
+    return f'{PREFIJO}:doc:{documento}'
+
+
+def _clave_perfil(tabla, pk):
+    return f'{PREFIJO}:{tabla}:{pk}'
+
+
+def _normalizar(documento):
+    return str(documento).strip() if documento is not None else ''
+
+
+def _consulta(documentos):
+    from administrador.models import Administrador
+    from estudiante.models import Estudiante
+    from usuario.models import Usuario
+
+    def columnas(queryset, tabla, pk, user_type):
+        return queryset.filter(numero_documento__in=documentos).annotate(
+            perfil_id=F(pk), tipo=user_type, tabla=Value(tabla, output_field=CharField())
+        ).values_list('numero_documento', 'user_id', 'tipo', 'perfil_id', 'tabla')
+
+    consultas = [
+        columnas(Estudiante.objects.all(), 'estudiante', 'id_estudiante',
+                 Value('estudiante', output_field=CharField())),
+        columnas(Administrador.objects.all(), 'administrador', 'id_administrador',
+                 Value('administrador', output_field=CharField())),
+        # Profesores y monitores comparten la tabla de Usuario; el rol sale del usuario
+        columnas(Usuario.objects.all(), 'usuario', 'id', F('user__user_type')),
+    ]
+    return consultas[0].union(*consultas[1:], all=True).order_by()
+
+
+def _buscar(documentos):
+    """Retorna `({documento: [Identidad, ...]}, {clave del perfil: documento})`."""
+    encontrados = {}
+    claves_perfil = {}
+    for documento, user_id, user_type, perfil_id, tabla in _consulta(documentos):
+        claves_perfil[_clave_perfil(tabla, perfil_id)] = documento
+        # Un mismo documento puede estar en más de una tabla (p. ej. estudiante y monitor)
+        encontrados.setdefault(documento, []).append(Identidad(user_id, user_type, perfil_id))
+    return encontrados, claves_perfil
+
+
+def _guardar(encontrados, claves_perfil, faltantes):
+    cache.set_many(
+        {_clave_documento(d): [tuple(i) for i in identidades] for d, identidades in encontrados.items()},
+        TTL_IDENTIDAD
+    )
+    # Permite invalidar el documento anterior cuando el perfil lo cambia
+    cache.set_many(claves_perfil, TTL_IDENTIDAD)
+    inexistentes = [documento for documento in faltantes if documento not in encontrados]
+    if inexistentes:
+        cache.set_many({_clave_documento(d): INEXISTENTE for d in inexistentes}, TTL_INEXISTENTE)
+
+
+def _elegir(identidades, user_type):
+    for identidad in identidades:
+        if user_type is None or identidad.user_type == user_type:
+            return identidad
+    return None
+
+
+def resolver_lote(documentos, user_type=None):
+    """
+    Retorna `{documento: Identidad}` solo con los documentos existentes (y del
+    `user_type` indicado, si se pasa). Una lectura de caché y, como mucho, una
+    consulta.
+    """
+    documentos = list(dict.fromkeys(d for d in map(_normalizar, documentos) if d))
+    if not documentos:
+        return {}
+    en_cache = cache.get_many([_clave_documento(d) for d in documentos])
+    identidades = {}
+    faltantes = []
+    for documento in documentos:
+        valor = en_cache.get(_clave_documento(documento))
+        if valor is None:
+            faltantes.append(documento)
+        else:
+            identidades[documento] = [Identidad(*identidad) for identidad in valor]
+    if faltantes:
+        encontrados, claves_perfil = _buscar(faltantes)
+        _guardar(encontrados, claves_perfil, faltantes)
+        identidades.update(encontrados)
+
+    resultado = {}
+    for documento, candidatas in identidades.items():
+        identidad = _elegir(candidatas, user_type)
+        if identidad is not None:
+            resultado[documento] = identidad
+    return resultado
+
+
+def resolver(documento, user_type=None):
+    """Identidad del documento, o None si no existe ningún perfil (de ese tipo) con él."""
+    documento = _normalizar(documento)
+    return resolver_lote([documento], user_type).get(documento) if documento else None
+
+
+def invalidar(instance):
+    """Borra de la caché el documento actual y el anterior del perfil."""
+    from usuario.models import Usuario
+
+    tabla = 'usuario' if isinstance(instance, Usuario) else instance._meta.model_name
+    clave_perfil = _clave_perfil(tabla, instance.pk)
+    claves = [clave_perfil]
+    anterior = cache.get(clave_perfil)
+    if anterior:
+        claves.append(_clave_documento(anterior))
+    documento = instance.__dict__.get('numero_documento')
+    if documento:
+        claves.append(_clave_documento(_normalizar(documento)))
+    cache.delete_many(claves)
+
+
+CAMPOS_IDENTIDAD = {'numero_documento', 'user'}
+
+
+def _invalidar_al_confirmar(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    # Guardados que no tocan el documento ni el usuario no cambian la identidad
+    if update_fields is not None and not CAMPOS_IDENTIDAD & set(update_fields):
+        return
+    invalidar(instance)
+    # Otra petición pudo volver a leer el valor anterior antes de confirmar
+    transaction.on_commit(lambda: invalidar(instance))
+
+
+def conectar_senales():
+    from administrador.models import Administrador
+    from estudiante.models import Estudiante
+    from monitor_academico.models import MonitorAcademico
+    from monitor_administrativo.models import MonitorAdministrativo
+    from profesor.models import Profesor
+    from usuario.models import Usuario
+
+    for modelo in (Estudiante, Administrador, Usuario, Profesor, MonitorAcademico, MonitorAdministrativo):
+        post_save.connect(_invalidar_al_confirmar, sender=modelo, dispatch_uid=f'identidad_guardado_{modelo.__name__}')
+        post_delete.connect(_invalidar_al_confirmar, sender=modelo, dispatch_uid=f'identidad_eliminado_{modelo.__name__}')
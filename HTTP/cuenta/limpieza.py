@@ -0,0 +1,163 @@
+"""
+Borrado de archivos del almacenamiento y purga de cuentas.
+
+- `cliente_s3` mantiene un único cliente boto3 por proceso, con pool de
+  conexiones, en lugar de crear uno nuevo en cada petición.
+- `borrar_archivos` agrupa los nombres y en S3 usa `delete_objects` con
+  lotes de hasta 1000 claves (una petición por lote en vez de una por
+  archivo). Con almacenamiento local borra del sistema de archivos, lo que
+  permite probar el flujo completo sin S3. Los archivos que no se pudieron
+  borrar quedan en la cola ArchivoPendienteEliminacion para reintentarse.
+- `purgar_cuentas` elimina en una sola pasada varios perfiles, sus usuarios
+  (con tokens e inscripciones en cascada) y todos sus archivos.
+"""
+import os
+import threading
+
+import boto3
+from botocore.config import Config
+from django.core.files.storage import default_storage
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.deletion import Collector
+
+from .models import CustomUser
+
+LOTE_S3 = 1000
+CONEXIONES_S3 = int(os.getenv('AWS_S3_MAX_POOL_CONNECTIONS', '20'))
+
+_cliente = None
+_cliente_pid = None
+_cliente_lock = threading.Lock()
+
+
+def cliente_s3():
+    """Cliente S3 compartido por todos los hilos del proceso (boto3 es thread-safe)."""
+    global _cliente, _cliente_pid
+    # Tras un fork (workers de gunicorn) cada proceso crea su propio cliente
+    if _cliente is None or _cliente_pid != os.getpid():
+        with _cliente_lock:
+            if _cliente is None or _cliente_pid != os.getpid():
+                _cliente = boto3.session.Session().client(
+                    's3',
+                    aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID') or None,
+                    aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY') or None,
+                    region_name=os.getenv('AWS_S3_REGION_NAME', 'us-east-1'),
+                    config=Config(
+                        max_pool_connections=CONEXIONES_S3,
+                        retries={'max_attempts': 5, 'mode': 'standard'},
+                    ),
+                )
+                _cliente_pid = os.getpid()
+    return _cliente
+
+
+def _borrar_s3(storage, nombres, cliente=None):
+    cliente = cliente or cliente_s3()
+    claves = {storage._normalize_name(nombre): nombre for nombre in nombres}
+    lista = list(claves)
+    fallidos = []
+    for inicio in range(0, len(lista), LOTE_S3):
+        lote = lista[inicio:inicio + LOTE_S3]
+        try:
+            respuesta = cliente.delete_objects(
+                Bucket=storage.bucket_name,
+                Delete={'Objects': [{'Key': clave} for clave in lote], 'Quiet': True},
+            )
+        except Exception as e:
+            print(f"Error eliminando un lote de {len(lote)} archivos de S3: {e}")
+            fallidos.extend(claves[clave] for clave in lote)
+            continue
+        for error in respuesta.get('Errors', []):
+            print(f"Error eliminando {error.get('Key')} de S3: {error.get('Message')}")
+            fallidos.append(claves.get(error.get('Key'), error.get('Key')))
+    return fallidos
+
+
+def _borrar_local(storage, nombres):
+    fallidos = []
+    for nombre in nombres:
+        try:
+            storage.delete(nombre)
+        except Exception as e:
+            print(f"Error eliminando archivo {nombre}: {e}")
+            fallidos.append(nombre)
+    return fallidos
+
+
+def borrar_archivos(nombres, storage=None, cliente=None, encolar_fallidos=True):
+    """
+    Borra los archivos indicados (nombres del almacenamiento). Retorna los que
+    no se pudieron borrar; por defecto se encolan para reintentarse con
+    `eliminar_archivos_pendientes`.
+    """
+    storage = storage or default_storage
+    nombres = list(dict.fromkeys(nombre for nombre in nombres if nombre))
+    if not nombres:
+        return []
+    if hasattr(storage, 'bucket_name'):
+        fallidos = _borrar_s3(storage, nombres, cliente)
+    else:
+        fallidos = _borrar_local(storage, nombres)
+    if fallidos and encolar_fallidos:
+        from inscripcion.models import ArchivoPendienteEliminacion
+
+        ArchivoPendienteEliminacion.objects.bulk_create(
+            [ArchivoPendienteEliminacion(nombre=nombre) for nombre in fallidos]
+        )
+    return fallidos
+
+
+def borrar_archivos_al_confirmar(nombres):
+    """Borra los archivos solo si la transacción en curso se confirma."""
+    nombres = [nombre for nombre in nombres if nombre]
+    if nombres:
+        transaction.on_commit(lambda: borrar_archivos(nombres))
+
+
+def archivos_de(instancias):
+    """Nombres de todos los FileField/ImageField con valor de las instancias dadas."""
+    nombres = []
+    for instancia in instancias:
+        for field in instancia._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                archivo = getattr(instancia, field.attname)
+                nombres.append(getattr(archivo, 'name', archivo))
+    return [nombre for nombre in nombres if nombre]
+
+
+def _archivos_recolectados(collector):
+    nombres = []
+    for instancias in collector.data.values():
+        nombres.extend(archivos_de(instancias))
+    for queryset in collector.fast_deletes:
+        campos = [
+            field.attname for field in queryset.model._meta.concrete_fields
+            if isinstance(field, models.FileField)
+        ]
+        for fila in queryset.values_list(*campos) if campos else []:
+            nombres.extend(nombre for nombre in fila if nombre)
+    return nombres
+
+
+def purgar_cuentas(modelo, ids):
+    """
+    Elimina los perfiles `ids` de `modelo` (Estudiante, Profesor, monitores o
+    Administrador) junto con sus usuarios y todo lo que cae en cascada
+    (tokens, inscripciones...). Los archivos de todas esas filas se borran en
+    lotes al confirmar la transacción. Retorna el total de filas eliminadas y
+    los archivos a borrar.
+    """
+    perfiles = modelo.objects.filter(pk__in=list(ids))
+    usuarios = CustomUser.objects.filter(
+        pk__in=perfiles.exclude(user__isnull=True).values('user_id')
+    )
+
+    with transaction.atomic():
+        collector = Collector(using=DEFAULT_DB_ALIAS)
+        # Al borrar el usuario se borran en cascada su perfil y sus tokens
+        collector.collect(usuarios)
+        collector.collect(perfiles.filter(user__isnull=True))
+        nombres = _archivos_recolectados(collector)
+        eliminados, _ = collector.delete()
+        borrar_archivos_al_confirmar(nombres)
+    return {'eliminados': eliminados, 'archivos': len(set(nombres))}
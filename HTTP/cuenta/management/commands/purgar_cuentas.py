@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from administrador.models import Administrador
+from cuenta.limpieza import purgar_cuentas
+from estudiante.models import Estudiante
+from monitor_academico.models import MonitorAcademico
+from monitor_administrativo.models import MonitorAdministrativo
+from profesor.models import Profesor
+
+MODELOS = {
+    'estudiante': Estudiante,
+    'profesor': Profesor,
+    'monitor_academico': MonitorAcademico,
+    'monitor_administrativo': MonitorAdministrativo,
+    'administrador': Administrador,
+}
+
+
+class Command(BaseCommand):
+    help = "Elimina en lote cuentas de un tipo, con sus usuarios, tokens y archivos"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tipo', required=True, choices=list(MODELOS),
+                            help="Tipo de perfil a eliminar")
+        parser.add_argument('--ids', nargs='+', type=int, default=[],
+                            help="Ids de los perfiles a eliminar")
+        parser.add_argument('--inactivos', action='store_true',
+                            help="Eliminar todos los perfiles cuyo usuario está inactivo")
+
+    def handle(self, *args, **options):
+        modelo = MODELOS[options['tipo']]
+        ids = list(options['ids'])
+        if options['inactivos']:
+            ids += list(modelo.objects.filter(user__is_active=False).values_list('pk', flat=True))
+        if not ids:
+            raise CommandError("Indique --ids o --inactivos.")
+
+        resultado = purgar_cuentas(modelo, ids)
+        self.stdout.write(self.style.SUCCESS(
+            f"Filas eliminadas: {resultado['eliminados']}. Archivos a borrar: {resultado['archivos']}."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from cuenta.sesiones import barrer_vencidos
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes los tokens vencidos (para ejecutarse periódicamente, p. ej. con cron)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000,
+                            help="Tokens a borrar por consulta")
+        parser.add_argument('--limite', type=int, default=None,
+                            help="Máximo de tokens a borrar en esta ejecución")
+
+    def handle(self, *args, **options):
+        eliminados = barrer_vencidos(lote=options['lote'], limite=options['limite'])
+        self.stdout.write(self.style.SUCCESS(f"Tokens vencidos eliminados: {eliminados}."))
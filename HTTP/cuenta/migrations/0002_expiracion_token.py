@@ -0,0 +1,42 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:58
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def crear_expiraciones(apps, schema_editor):
+    # Los tokens existentes reciben un TTL completo desde la migración
+    Token = apps.get_model('authtoken', 'Token')
+    ExpiracionToken = apps.get_model('cuenta', 'ExpiracionToken')
+    expira = timezone.now() + timedelta(seconds=getattr(settings, 'TOKEN_TTL', 7 * 24 * 60 * 60))
+    ExpiracionToken.objects.bulk_create(
+        (ExpiracionToken(token_id=key, expira=expira) for key in Token.objects.values_list('key', flat=True).iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0004_alter_tokenproxy_options'),
+        ('cuenta', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExpiracionToken',
+            fields=[
+                ('token', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='expiracion', serialize=False, to='authtoken.token')),
+                ('expira', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Expiración de token',
+                'verbose_name_plural': 'Expiraciones de tokens',
+            },
+        ),
+        migrations.RunPython(crear_expiraciones, migrations.RunPython.noop),
+    ]
@@ -13,4 +13,20 @@ class CustomUser(AbstractUser):
     
     class Meta:
         verbose_name = 'Usuario'
-        verbose_name_plural = 'Usuarios'
\ No newline at end of file
+        verbose_name_plural = 'Usuarios'
+
+class ExpiracionToken(models.Model):
+    """
+    Vencimiento de cada token de `rest_framework.authtoken` (que no vence por sí
+    mismo). Se extiende con cada uso (TTL deslizante) y el índice de `expira`
+    permite barrer los vencidos y revocar en lote sin recorrer la tabla; ver
+    cuenta/sesiones.py.
+    """
+    token = models.OneToOneField(
+        'authtoken.Token', on_delete=models.CASCADE, primary_key=True, related_name='expiracion'
+    )
+    expira = models.DateTimeField(db_index=True)
+
+    class Meta:
+        verbose_name = 'Expiración de token'
+        verbose_name_plural = 'Expiraciones de tokens'
@@ -0,0 +1,108 @@
+"""
+Actualización coalescida de los datos de cuenta de un perfil (estudiante,
+profesor, monitores y administrador).
+
+Los partial_update manejaban `nombre`, `apellido`, `email`, `is_active`,
+`numero_documento` y `contrasena` campo por campo, con un `user.save()` y un
+`instance.save()` por cada uno: un formulario podía generar una docena de
+UPDATE de fila completa y otras tantas entradas de auditoría. Aquí se aplican
+todos los cambios en memoria y se guarda como máximo una vez por tabla, con
+`update_fields`, dentro de una única transacción; auditlog registra así una
+sola entrada con todos los campos modificados.
+"""
+from django.db import models, transaction
+from rest_framework import serializers
+
+from .contrasenas import hashear
+
+# Campo del perfil (y del request) -> campo equivalente en CustomUser
+CAMPOS_USUARIO = {
+    'nombre': 'first_name',
+    'apellido': 'last_name',
+    'email': 'email',
+    'correo': 'email',
+    'is_active': 'is_active',
+    'numero_documento': 'username',
+}
+
+
+def _valor_unico(valor):
+    if isinstance(valor, list):
+        return valor[0] if valor else ''
+    return valor
+
+
+def _convertir(field, valor):
+    if isinstance(field, models.BooleanField):
+        # Acepta 'true'/'false' de formularios igual que los serializadores
+        return serializers.BooleanField().to_internal_value(valor)
+    return field.to_python(valor)
+
+
+def validar_datos_cuenta(serializer, data):
+    """
+    Valida con el serializador del perfil (instancia ya asociada, `partial`)
+    los campos de cuenta de `data` antes de que `actualizar_perfil` los
+    consuma. Verifica también que el nuevo `numero_documento` no sea el
+    usuario de otra cuenta. Lanza ValidationError.
+    """
+    from .models import CustomUser
+
+    campos = {campo: _valor_unico(data[campo]) for campo in (*CAMPOS_USUARIO, 'contrasena') if campo in data}
+    if not campos:
+        return
+    validador = serializer.__class__(serializer.instance, data=campos, partial=True, context=serializer.context)
+    validador.is_valid(raise_exception=True)
+    documento = validador.validated_data.get('numero_documento')
+    user = getattr(serializer.instance, 'user', None)
+    if documento and user is not None and documento != user.username and \
+            CustomUser.objects.filter(username=documento).exclude(pk=user.pk).exists():
+        raise serializers.ValidationError({'numero_documento': ['Ya existe una cuenta con este número de documento.']})
+
+
+def actualizar_perfil(instance, data):
+    """
+    Consume de `data` los campos de cuenta que existan en el perfil, los aplica
+    al perfil y a su CustomUser y guarda ambos (solo si algo cambió). Retorna
+    la lista de campos del perfil que cambiaron; si incluye `numero_documento`
+    el llamador debe renombrar los archivos asociados.
+    """
+    campos_perfil = {field.name: field for field in instance._meta.concrete_fields}
+    user = getattr(instance, 'user', None)
+    cambios_perfil = []
+    cambios_usuario = []
+
+    for campo, campo_usuario in CAMPOS_USUARIO.items():
+        if campo not in campos_perfil or campo not in data:
+            continue
+        valor = _convertir(campos_perfil[campo], _valor_unico(data.pop(campo)))
+        if getattr(instance, campo) != valor:
+            setattr(instance, campo, valor)
+            cambios_perfil.append(campo)
+        if user is not None and getattr(user, campo_usuario) != valor:
+            setattr(user, campo_usuario, valor)
+            cambios_usuario.append(campo_usuario)
+
+    if 'contrasena' in data:
+        contrasena = _valor_unico(data.pop('contrasena'))
+        if contrasena:
+            if user is not None:
+                user.set_password(contrasena)
+                cambios_usuario.append('password')
+                # Se reutiliza el hash del usuario en lugar de calcular otro
+                instance.contrasena = user.password
+            else:
+                instance.contrasena = hashear(contrasena)
+            cambios_perfil.append('contrasena')
+
+    if cambios_perfil or cambios_usuario:
+        with transaction.atomic():
+            if cambios_usuario:
+                user.save(update_fields=cambios_usuario)
+            if cambios_perfil:
+                # update_fields omite los auto_now (p. ej. fecha_modificacion) si no se incluyen
+                auto_now = [
+                    campo for campo, field in campos_perfil.items() if getattr(field, 'auto_now', False)
+                ]
+                instance.save(update_fields=cambios_perfil + auto_now)
+    return cambios_perfil
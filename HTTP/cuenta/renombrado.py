@@ -0,0 +1,133 @@
+"""
+Renombrado de los archivos de un perfil cuando cambia su numero_documento.
+
+Antes, partial_update leía cada archivo completo en memoria, lo borraba y lo
+volvía a subir con el nuevo nombre dentro de la petición (hasta siete
+archivos por profesor). Ahora la vista solo programa el renombrado, que se
+ejecuta en un hilo al confirmar la transacción:
+
+1. Se copia cada archivo a su nuevo nombre dentro del almacenamiento: copia
+   del lado del servidor en S3 y enlace duro (sin copiar datos) en el
+   sistema de archivos local.
+2. Solo si todas las copias funcionaron se actualizan los nombres, en una
+   transacción, con un UPDATE por campo condicionado a que el campo siga
+   apuntando al nombre anterior (si otra petición lo cambió entretanto, se
+   descarta la copia de ese campo y los demás se renombran igual).
+3. Se borran los originales de los campos renombrados.
+
+Si algo falla antes del UPDATE, se borran las copias y la fila queda intacta.
+"""
+import os
+import threading
+
+from auditlog.models import LogEntry
+from auditlog.registry import auditlog
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+
+def nombre_con_documento(nombre, numero_documento):
+    """Misma carpeta y extensión, con el número de documento como nombre base."""
+    _, extension = os.path.splitext(nombre)
+    return os.path.join(os.path.dirname(nombre), f"{numero_documento}{extension}")
+
+
+def _copiar(storage, origen, destino):
+    if hasattr(storage, 'bucket_name'):
+        storage.bucket.copy(
+            {'Bucket': storage.bucket_name, 'Key': storage._normalize_name(origen)},
+            storage._normalize_name(destino),
+        )
+        return
+    ruta_destino = storage.path(destino)
+    os.makedirs(os.path.dirname(ruta_destino), exist_ok=True)
+    if os.path.exists(ruta_destino):
+        os.remove(ruta_destino)
+    # El enlace duro más el borrado del original equivale a un rename, pero el
+    # original sigue disponible hasta que se confirme el UPDATE
+    os.link(storage.path(origen), ruta_destino)
+
+
+def renombrar_archivos(modelo, pk, campos, numero_documento, storage=None):
+    """
+    Renombra los archivos de `campos` de la fila `pk` para que usen
+    `numero_documento`. Retorna los campos renombrados.
+    """
+    storage = storage or default_storage
+    actuales = modelo.objects.filter(pk=pk).values(*campos).first()
+    if not actuales:
+        return []
+
+    renombres = {}
+    for campo in campos:
+        anterior = actuales[campo]
+        if not anterior:
+            continue
+        nuevo = nombre_con_documento(anterior, numero_documento)
+        if nuevo != anterior:
+            renombres[campo] = (anterior, nuevo)
+    if not renombres:
+        return []
+
+    copiados = []
+    renombrados = {}
+    try:
+        for anterior, nuevo in renombres.values():
+            _copiar(storage, anterior, nuevo)
+            copiados.append(nuevo)
+        with transaction.atomic():
+            for campo, (anterior, nuevo) in renombres.items():
+                # Cada campo se condiciona por separado: si otra petición subió
+                # un archivo nuevo en uno de ellos, los demás se renombran igual
+                if modelo.objects.filter(pk=pk, **{campo: anterior}).update(**{campo: nuevo}):
+                    renombrados[campo] = (anterior, nuevo)
+            if renombrados and auditlog.contains(modelo):
+                # update() no pasa por auditlog: se registra el cambio explícitamente
+                LogEntry.objects.log_create(
+                    modelo.objects.get(pk=pk),
+                    action=LogEntry.Action.UPDATE,
+                    changes={campo: list(nombres) for campo, nombres in renombrados.items()},
+                )
+    except Exception:
+        for nombre in copiados:
+            storage.delete(nombre)
+        raise
+
+    descartados = [campo for campo in renombres if campo not in renombrados]
+    if descartados:
+        vigentes = modelo.objects.filter(pk=pk).values(*descartados).first() or {}
+        for campo in descartados:
+            # La copia se descarta, salvo que el archivo que la otra petición
+            # dejó en el campo tenga justamente ese nombre
+            if vigentes.get(campo) != renombres[campo][1]:
+                storage.delete(renombres[campo][1])
+    for anterior, _ in renombrados.values():
+        try:
+            storage.delete(anterior)
+        except Exception as e:
+            print(f"Error eliminando el archivo renombrado {anterior}: {e}")
+    return list(renombrados)
+
+
+def _tarea_renombrado(modelo, pk, campos, numero_documento):
+    from django.db import connection
+
+    try:
+        renombrar_archivos(modelo, pk, campos, numero_documento)
+    except Exception as e:
+        print(f"Error renombrando archivos de {modelo.__name__} {pk}: {e}")
+    finally:
+        connection.close()
+
+
+def programar_renombrado(instance, campos):
+    """
+    Renombra en segundo plano, al confirmar la transacción, los archivos del
+    perfil. Debe llamarse dentro de la transacción que envuelve todos los save
+    de la petición: en autocommit el hilo arrancaría de inmediato y un save
+    posterior volvería a escribir los nombres anteriores.
+    """
+    modelo, pk, numero_documento = type(instance), instance.pk, instance.numero_documento
+    transaction.on_commit(lambda: threading.Thread(
+        target=_tarea_renombrado, args=(modelo, pk, list(campos), numero_documento), daemon=True
+    ).start())
@@ -0,0 +1,99 @@
+"""
+Vencimiento y revocación de tokens.
+
+Los tokens de `rest_framework.authtoken` no vencen, así que la tabla solo
+crecía. Cada token tiene ahora una fila en ExpiracionToken (columna `expira`
+indexada):
+
+- TTL deslizante: cada uso extiende el vencimiento a TOKEN_TTL segundos, con
+  a lo sumo una escritura cada TOKEN_RENOVACION segundos por token. Solo se
+  extienden sesiones vigentes: un token vencido o revocado no se revive.
+- `barrer_vencidos` borra los tokens vencidos por lotes, usando el índice
+  (comando `purgar_tokens_vencidos`, para ejecutarse periódicamente).
+- `revocar` termina en un solo UPDATE todas las sesiones de un tipo de
+  usuario y/o de un periodo de creación, e invalida las sesiones en caché.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models.signals import post_save
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from .models import ExpiracionToken
+
+
+def ttl():
+    return timedelta(seconds=getattr(settings, 'TOKEN_TTL', 7 * 24 * 60 * 60))
+
+
+def debe_renovarse(expira, ahora=None):
+    """True si la última extensión tiene más de TOKEN_RENOVACION segundos."""
+    ahora = ahora or timezone.now()
+    renovacion = timedelta(seconds=getattr(settings, 'TOKEN_RENOVACION', 300))
+    return expira is None or expira - ahora < ttl() - renovacion
+
+
+def renovar(key):
+    """
+    Extiende el vencimiento de un token vigente. Retorna la nueva fecha, o
+    None si el token ya venció o fue revocado (no se revive).
+    """
+    ahora = timezone.now()
+    expira = ahora + ttl()
+    if ExpiracionToken.objects.filter(token_id=key, expira__gt=ahora).update(expira=expira):
+        return expira
+    # Tokens creados sin pasar por save() (p. ej. bulk_create) no tienen fila
+    _, creada = ExpiracionToken.objects.get_or_create(token_id=key, defaults={'expira': expira})
+    return expira if creada else None
+
+
+def barrer_vencidos(lote=1000, limite=None):
+    """Borra los tokens vencidos en lotes de `lote`. Retorna cuántos borró."""
+    total = 0
+    while limite is None or total < limite:
+        tamano = lote if limite is None else min(lote, limite - total)
+        llaves = list(
+            ExpiracionToken.objects.filter(expira__lte=timezone.now())
+            .order_by('expira').values_list('token_id', flat=True)[:tamano]
+        )
+        if not llaves:
+            break
+        Token.objects.filter(key__in=llaves).delete()
+        total += len(llaves)
+        if len(llaves) < tamano:
+            break
+    return total
+
+
+def revocar(user_type=None, desde=None, hasta=None, excluir=None):
+    """
+    Vence de inmediato las sesiones vigentes del `user_type` indicado y/o
+    creadas entre `desde` y `hasta`, salvo el token `excluir`. Un solo
+    UPDATE; el barrido las borra después. Retorna cuántas sesiones revocó.
+    """
+    from .authentication import nueva_generacion
+
+    ahora = timezone.now()
+    expiraciones = ExpiracionToken.objects.filter(expira__gt=ahora)
+    if user_type:
+        expiraciones = expiraciones.filter(token__user__user_type=user_type)
+    if desde:
+        expiraciones = expiraciones.filter(token__created__gte=desde)
+    if hasta:
+        expiraciones = expiraciones.filter(token__created__lte=hasta)
+    if excluir:
+        expiraciones = expiraciones.exclude(token_id=excluir)
+    revocadas = expiraciones.update(expira=ahora)
+    if revocadas:
+        nueva_generacion()
+    return revocadas
+
+
+def _token_creado(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        ExpiracionToken.objects.create(token=instance, expira=timezone.now() + ttl())
+
+
+def conectar_senales():
+    post_save.connect(_token_creado, sender=Token, dispatch_uid='sesion_token_creado')
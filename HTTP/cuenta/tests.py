@@ -1,3 +1,277 @@
-from django.test import TestCase
+import pytest
+from django.contrib.auth.hashers import check_password
 
-# Create your tests here.
+from cuenta.contrasenas import crear_usuarios_lote, hashear_lote
+
+
+def test_hashear_lote_conserva_el_orden():
+    hashes = hashear_lote(['uno', 'dos', 'tres'])
+    assert [check_password(clave, h) for clave, h in zip(['uno', 'dos', 'tres'], hashes)] == [True] * 3
+
+
+@pytest.mark.django_db
+def test_crear_usuarios_lote_usa_el_documento_como_contrasena_por_defecto():
+    usuarios = crear_usuarios_lote([
+        {'username': '1001', 'first_name': 'Ana'},
+        {'username': '1002', 'contrasena': 'propia'},
+    ], user_type='estudiante')
+
+    assert [usuario.pk is not None for usuario in usuarios] == [True, True]
+    assert usuarios[0].check_password('1001')
+    assert usuarios[1].check_password('propia')
+    assert {usuario.user_type for usuario in usuarios} == {'estudiante'}
+
+
+@pytest.mark.django_db
+def test_renombrar_archivos_actualiza_la_fila_despues_de_copiar(estudiante_instance, settings, tmp_path):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from cuenta.renombrado import renombrar_archivos
+    from estudiante.models import Estudiante
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    estudiante_instance.foto.save('foto.png', ContentFile(b'imagen'), save=True)
+    anterior = estudiante_instance.foto.name
+    Estudiante.objects.filter(pk=estudiante_instance.pk).update(numero_documento='999')
+
+    renombrados = renombrar_archivos(Estudiante, estudiante_instance.pk, ['foto', 'documento_identidad'], '999')
+
+    estudiante_instance.refresh_from_db()
+    assert renombrados == ['foto']
+    assert estudiante_instance.foto.name == 'fotos/999.png'
+    assert default_storage.open(estudiante_instance.foto.name).read() == b'imagen'
+    assert not default_storage.exists(anterior)
+
+
+@pytest.mark.django_db
+def test_renombrar_archivos_respeta_el_campo_cambiado_por_otra_peticion(estudiante_instance, settings, tmp_path, monkeypatch):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from cuenta import renombrado
+    from estudiante.models import Estudiante
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    estudiante_instance.foto.save('foto.png', ContentFile(b'imagen'), save=True)
+    estudiante_instance.documento_identidad.save('doc.pdf', ContentFile(b'pdf'), save=True)
+    anterior_foto = estudiante_instance.foto.name
+    Estudiante.objects.filter(pk=estudiante_instance.pk).update(numero_documento='999')
+
+    copiar = renombrado._copiar
+
+    def copiar_con_subida_concurrente(storage, origen, destino):
+        copiar(storage, origen, destino)
+        # Otra petición sube un documento nuevo mientras se copian los archivos
+        Estudiante.objects.filter(pk=estudiante_instance.pk).update(documento_identidad='documentos/nuevo.pdf')
+
+    monkeypatch.setattr(renombrado, '_copiar', copiar_con_subida_concurrente)
+    renombrados = renombrado.renombrar_archivos(
+        Estudiante, estudiante_instance.pk, ['foto', 'documento_identidad'], '999'
+    )
+
+    estudiante_instance.refresh_from_db()
+    assert renombrados == ['foto']
+    assert estudiante_instance.foto.name == 'fotos/999.png'
+    assert not default_storage.exists(anterior_foto)
+    assert estudiante_instance.documento_identidad.name == 'documentos/nuevo.pdf'
+    # La copia descartada no queda huérfana en el almacenamiento
+    assert not default_storage.exists('documentos_identidad/999.pdf')
+
+
+@pytest.mark.django_db(transaction=True)
+def test_partial_update_renombra_los_archivos_despues_del_ultimo_save(estudiante_instance, settings, tmp_path, monkeypatch):
+    from types import SimpleNamespace
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from rest_framework.test import APIClient
+    from cuenta import renombrado
+
+    class HiloInmediato:
+        # Ejecuta el renombrado en cuanto se inicia el hilo, sin carrera con la petición
+        def __init__(self, target, args, daemon):
+            self.args = args
+
+        def start(self):
+            renombrado.renombrar_archivos(*self.args)
+
+    monkeypatch.setattr(renombrado, 'threading', SimpleNamespace(Thread=HiloInmediato))
+    settings.MEDIA_ROOT = str(tmp_path)
+    estudiante_instance.foto.save('foto.png', ContentFile(b'imagen'), save=True)
+    anterior = estudiante_instance.foto.name
+    from cuenta.models import CustomUser
+
+    admin = CustomUser.objects.create_user(username='admin_renombrado', password='x', user_type='administrador')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    respuesta = client.patch(
+        f'/estudiante/est/{estudiante_instance.pk}/',
+        {'numero_documento': '999', 'grado': '10'},
+        format='json',
+    )
+
+    assert respuesta.status_code == 200
+    estudiante_instance.refresh_from_db()
+    assert estudiante_instance.grado == '10'
+    assert estudiante_instance.foto.name == 'fotos/999.png'
+    assert default_storage.open(estudiante_instance.foto.name).read() == b'imagen'
+    assert not default_storage.exists(anterior)
+
+
+def test_borrar_archivos_s3_agrupa_en_lotes_de_mil():
+    import boto3
+    from botocore.stub import Stubber
+    from storages.backends.s3boto3 import S3Boto3Storage
+    from cuenta.limpieza import borrar_archivos
+
+    cliente = boto3.client('s3', region_name='us-east-1', aws_access_key_id='x', aws_secret_access_key='x')
+    storage = S3Boto3Storage(bucket_name='archivos-prueba')
+    nombres = [f'documentos/{i}.pdf' for i in range(1500)]
+    with Stubber(cliente) as stubber:
+        for lote in (nombres[:1000], nombres[1000:]):
+            stubber.add_response('delete_objects', {}, {
+                'Bucket': 'archivos-prueba',
+                'Delete': {'Objects': [{'Key': nombre} for nombre in lote], 'Quiet': True},
+            })
+        fallidos = borrar_archivos(nombres, storage=storage, cliente=cliente)
+        stubber.assert_no_pending_responses()
+
+    assert fallidos == []
+
+
+@pytest.mark.django_db
+def test_purgar_cuentas_borra_perfil_usuario_y_archivos(
+        estudiante_instance, settings, tmp_path, django_capture_on_commit_callbacks):
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from cuenta.limpieza import purgar_cuentas
+    from cuenta.models import CustomUser
+    from estudiante.models import Estudiante
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    estudiante_instance.foto.save('foto.png', ContentFile(b'imagen'), save=True)
+    nombre = estudiante_instance.foto.name
+    id_usuario = estudiante_instance.user_id
+
+    with django_capture_on_commit_callbacks(execute=True):
+        resultado = purgar_cuentas(Estudiante, [estudiante_instance.pk])
+
+    assert resultado['archivos'] == 1
+    assert not Estudiante.objects.filter(pk=estudiante_instance.pk).exists()
+    assert not CustomUser.objects.filter(pk=id_usuario).exists()
+    assert not default_storage.exists(nombre)
+
+
+@pytest.mark.django_db
+def test_resolver_documento_usa_la_cache_y_se_invalida_al_cambiar(estudiante_instance, django_assert_num_queries):
+    from cuenta.identidad import resolver, resolver_lote
+
+    with django_assert_num_queries(1):
+        identidad = resolver(estudiante_instance.numero_documento)
+    assert identidad == (estudiante_instance.user_id, 'estudiante', estudiante_instance.pk)
+    with django_assert_num_queries(0):
+        assert resolver(estudiante_instance.numero_documento) == identidad
+        assert resolver(estudiante_instance.numero_documento, 'profesor') is None
+
+    anterior = estudiante_instance.numero_documento
+    estudiante_instance.numero_documento = '55555'
+    estudiante_instance.save()
+
+    with django_assert_num_queries(1):
+        assert resolver_lote([anterior, '55555', 'inexistente']) == {'55555': identidad}
+    with django_assert_num_queries(0):
+        assert resolver('inexistente') is None
+
+
+@pytest.mark.django_db
+def test_autenticacion_con_cache_adjunta_el_perfil_y_se_invalida_en_logout(
+        estudiante_instance, django_assert_num_queries):
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient, APIRequestFactory
+    from cuenta.authentication import BearerTokenAuthentication
+
+    token = Token.objects.create(user=estudiante_instance.user)
+    autenticacion = BearerTokenAuthentication()
+    peticion = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token.key}')
+
+    with django_assert_num_queries(1):
+        user, auth = autenticacion.authenticate(peticion)
+    assert (user.pk, auth.key) == (estudiante_instance.user_id, token.key)
+    assert peticion.perfil_id == estudiante_instance.pk
+    with django_assert_num_queries(0):
+        autenticacion.authenticate(APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token.key}'))
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    assert client.post('/logout/').status_code == 200
+    assert client.post('/logout/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_revocar_por_tipo_vence_las_sesiones_y_el_barrido_las_borra(estudiante_instance, test_user):
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from cuenta.sesiones import barrer_vencidos, revocar
+
+    profesor = get_user_model().objects.create_user(username='prof_sesion', password='x', user_type='profesor')
+    token_estudiante = Token.objects.create(user=test_user)
+    token_profesor = Token.objects.create(user=profesor)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token_estudiante.key}')
+    # Deja la sesión en caché antes de revocar
+    assert client.get('/estudiante/est/me/').status_code == 200
+
+    assert revocar(user_type='estudiante') == 1
+
+    respuesta = client.get('/estudiante/est/me/')
+    assert respuesta.status_code == 401
+    assert 'expirado' in str(respuesta.data['detail'])
+    assert barrer_vencidos() == 1
+    assert list(Token.objects.values_list('key', flat=True)) == [token_profesor.key]
+
+
+@pytest.mark.django_db
+def test_renovar_no_revive_un_token_revocado(estudiante_instance, settings):
+    from django.core.cache import cache
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from cuenta.authentication import CLAVE_GENERACION, cache_local
+    from cuenta.models import ExpiracionToken
+    from cuenta.sesiones import renovar, revocar
+
+    settings.TOKEN_GENERACION_INTERVALO = 0
+    token = Token.objects.create(user=estudiante_instance.user)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    assert client.get('/estudiante/est/me/').status_code == 200
+    sesion = cache_local.get(token.key)
+
+    assert revocar(user_type='estudiante') == 1
+    assert renovar(token.key) is None
+    assert ExpiracionToken.objects.get(token=token).expira <= sesion['expira']
+
+    # Revocación hecha por otro proceso: su LRU conserva la sesión, pero la
+    # generación compartida cambió
+    cache_local.set(token.key, sesion)
+    cache.incr(CLAVE_GENERACION)
+    assert client.get('/estudiante/est/me/').status_code == 401
+
+
+@pytest.mark.django_db
+def test_sesion_se_extiende_con_el_uso(estudiante_instance, settings):
+    from datetime import timedelta
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+    from rest_framework.test import APIClient
+    from cuenta.models import ExpiracionToken
+
+    token = Token.objects.create(user=estudiante_instance.user)
+    casi_vencido = timezone.now() + timedelta(minutes=1)
+    ExpiracionToken.objects.filter(token=token).update(expira=casi_vencido)
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    assert client.get('/estudiante/est/me/').status_code == 200
+
+    expira = ExpiracionToken.objects.get(token=token).expira
+    assert expira > timezone.now() + timedelta(seconds=settings.TOKEN_TTL - 60)
@@ -0,0 +1,48 @@
+"""
+Autenticación por token para WebSockets.
+
+La API se autentica con tokens (cuenta/authentication.py), no con sesiones de
+Django, así que `AuthMiddlewareStack` de channels nunca encuentra al usuario.
+`TokenAuthMiddleware` lee el token del encabezado `Authorization`
+("Token <llave>" o "Bearer <llave>") o, porque los navegadores no permiten
+encabezados en WebSockets, del parámetro `?token=` de la URL, y lo valida con
+CachedTokenAuthentication (misma caché, vencimiento y renovación que HTTP).
+Sin token válido `scope['user']` queda como AnonymousUser.
+"""
+from urllib.parse import parse_qs
+
+from channels.db import database_sync_to_async
+from channels.middleware import BaseMiddleware
+from django.contrib.auth.models import AnonymousUser
+from rest_framework import exceptions
+
+from .authentication import CachedTokenAuthentication
+
+PALABRAS_CLAVE = ('token', 'bearer')
+
+
+def _llave_de(scope):
+    for nombre, valor in scope.get('headers', []):
+        if nombre == b'authorization':
+            partes = valor.decode('latin-1').split()
+            if len(partes) == 2 and partes[0].lower() in PALABRAS_CLAVE:
+                return partes[1]
+    parametros = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    return (parametros.get('token') or [None])[0]
+
+
+@database_sync_to_async
+def _autenticar(llave):
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(llave)
+    except exceptions.AuthenticationFailed:
+        return AnonymousUser(), None
+    return user, user._perfil_id
+
+
+class TokenAuthMiddleware(BaseMiddleware):
+    async def __call__(self, scope, receive, send):
+        llave = _llave_de(scope)
+        user, perfil_id = await _autenticar(llave) if llave else (AnonymousUser(), None)
+        scope = dict(scope, user=user, perfil_id=perfil_id)
+        return await super().__call__(scope, receive, send)
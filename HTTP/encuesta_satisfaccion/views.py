@@ -18,6 +18,8 @@ from .serializers import EncuestaSatisfaccionSerializer, EncuestaSatisfaccionLis
 
 # Permisos
 from cuenta.permissions import IsEstudiante, IsAdministrador, IsProfesor, IsProfesorOrAdministrador
+from cuenta.identidad import resolver_lote
+from cuenta.authentication import perfil_id_de
 
 
 class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
@@ -55,20 +57,18 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
         if user.is_superuser or getattr(user, 'user_type', None) == 'administrador':
             return qs.all()
 
+        # El perfil ya viene resuelto con el token (ver cuenta/authentication.py)
         if getattr(user, 'user_type', None) == 'profesor':
-            from profesor.models import Profesor
-            try:
-                profesor = Profesor.objects.get(user=user)
-                return qs.filter(id_inscripcion__grupo__profesor=profesor)
-            except Profesor.DoesNotExist:
+            profesor_id = perfil_id_de(self.request)
+            if profesor_id is None:
                 return qs.none()
+            return qs.filter(id_inscripcion__grupo__profesor_id=profesor_id)
 
         if getattr(user, 'user_type', None) == 'estudiante':
-            try:
-                estudiante = Estudiante.objects.get(user=user)
-                return qs.filter(id_inscripcion__id_estudiante=estudiante)
-            except Estudiante.DoesNotExist:
+            estudiante_id = perfil_id_de(self.request)
+            if estudiante_id is None:
                 return qs.none()
+            return qs.filter(id_inscripcion__id_estudiante_id=estudiante_id)
 
         return qs.none()
 
@@ -118,21 +118,20 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
         # Validar que el estudiante solo responda su propia encuesta
         user = request.user
         if getattr(user, 'user_type', None) == 'estudiante':
-            try:
-                estudiante = Estudiante.objects.get(user=user)
-                if not Inscripcion.objects.filter(
-                    id_inscripcion=id_inscripcion,
-                    id_estudiante=estudiante,
-                ).exists():
-                    return Response(
-                        {'error': 'No tienes permiso para responder esta encuesta.'},
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-            except Estudiante.DoesNotExist:
+            estudiante_id = perfil_id_de(request)
+            if estudiante_id is None:
                 return Response(
                     {'error': 'No se encontró perfil de estudiante.'},
                     status=status.HTTP_404_NOT_FOUND,
                 )
+            if not Inscripcion.objects.filter(
+                id_inscripcion=id_inscripcion,
+                id_estudiante_id=estudiante_id,
+            ).exists():
+                return Response(
+                    {'error': 'No tienes permiso para responder esta encuesta.'},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
 
         # Upsert
         encuesta = EncuestaSatisfaccion.objects.filter(id_inscripcion=id_inscripcion).first()
@@ -298,6 +297,22 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
                 raise ValueError(f'Nota {d} fuera del rango permitido (0.0 – 5.0).')
             return d
 
+        def normalizar_documento(valor):
+            documento = str(valor).strip()
+            # pandas puede leer "1001234567.0" si la celda era numérica
+            if '.' in documento:
+                documento = documento.split('.')[0]
+            return documento
+
+        # Todos los documentos del archivo se resuelven de una vez
+        # (ver cuenta/identidad.py) en lugar de una consulta por fila
+        identidades = resolver_lote(
+            (normalizar_documento(valor) for valor in df['documento']), 'estudiante'
+        )
+        estudiantes = Estudiante.objects.only('id_estudiante', 'nombre', 'apellido').in_bulk(
+            [identidad.perfil_id for identidad in identidades.values()]
+        )
+
         # ── 4. Procesar fila a fila ───────────────────────────────────────
         creadas = 0
         actualizadas = 0
@@ -308,10 +323,7 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
             fila_num = idx + 2  # fila 1 = encabezado → datos desde fila 2
 
             # 4a. Documento
-            documento = str(row.get('documento', '')).strip()
-            # pandas puede leer "1001234567.0" si la celda era numérica
-            if '.' in documento:
-                documento = documento.split('.')[0]
+            documento = normalizar_documento(row.get('documento', ''))
 
             if not documento or documento in ('nan', 'None', ''):
                 detalle_errores.append({
@@ -322,9 +334,9 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
                 continue
 
             # 4b. Buscar estudiante por número de documento
-            try:
-                estudiante = Estudiante.objects.get(numero_documento=documento)
-            except Estudiante.DoesNotExist:
+            identidad = identidades.get(documento)
+            estudiante = estudiantes.get(identidad.perfil_id) if identidad else None
+            if estudiante is None:
                 detalle_errores.append({
                     'fila': fila_num,
                     'documento': documento,
@@ -447,9 +459,8 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
                 {'error': 'Solo los estudiantes pueden acceder a este endpoint.'},
                 status=status.HTTP_403_FORBIDDEN,
             )
-        try:
-            estudiante = Estudiante.objects.get(user=user)
-        except Estudiante.DoesNotExist:
+        estudiante_id = perfil_id_de(request)
+        if estudiante_id is None:
             return Response(
                 {'error': 'No se encontró perfil de estudiante.'},
                 status=status.HTTP_404_NOT_FOUND,
@@ -459,7 +470,7 @@ class EncuestaSatisfaccionViewSet(viewsets.ModelViewSet):
             'id_inscripcion__id_estudiante',
             'id_inscripcion__id_modulo',
             'id_inscripcion__grupo__profesor',
-        ).filter(id_inscripcion__id_estudiante=estudiante)
+        ).filter(id_inscripcion__id_estudiante_id=estudiante_id)
 
         serializer = EncuestaSatisfaccionListSerializer(encuestas, many=True)
         return Response(serializer.data)
@@ -1,19 +1,68 @@
 import json
+from types import SimpleNamespace
+
+from django.contrib.auth.models import AnonymousUser
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from cuenta.permissions import IsProfesorOrAdministradorOrMonitorAcademicoOrAdministrativo
+from . import difusion
+
+# Mismo permiso que la acción HTTP `sincronizacion`
+PERMISO = IsProfesorOrAdministradorOrMonitorAcademicoOrAdministrativo()
+
 
 class EstudianteConsumer(AsyncWebsocketConsumer):
+    """
+    Protocolo (ver estudiante/difusion.py):
+    - El cliente se autentica con su token (cuenta/websocket.py); solo se
+      aceptan los roles que pueden usar `sincronizacion`, los demás se cierran.
+    - Al conectar se envía {"tipo": "conectado", "version": N}.
+    - El cliente pide la instantánea con {"tipo": "snapshot", "despues_de": 0,
+      "limite": 500, "comprimir": true} y sigue pidiendo páginas con el valor
+      de "siguiente" hasta recibir null. Con "comprimir" la página llega como
+      frame binario con JSON en gzip.
+    - Los cambios llegan como {"tipo": "delta", "version": N, ...}.
+    """
+
     async def connect(self):
-        self.group_name = 'estudiantes'
+        self.group_name = None
+        if not PERMISO.has_permission(SimpleNamespace(user=self.scope.get('user') or AnonymousUser()), self):
+            await self.close(code=4403)
+            return
+        self.group_name = difusion.GRUPO
         await self.channel_layer.group_add(self.group_name, self.channel_name)
         await self.accept()
+        version = await database_sync_to_async(difusion.version_actual)()
+        await self.send(text_data=json.dumps({'tipo': 'conectado', 'version': version}))
 
     async def disconnect(self, close_code):
+        if self.group_name is None:
+            return
         await self.channel_layer.group_discard(self.group_name, self.channel_name)
 
-    async def receive(self, text_data):
-        pass
+    async def receive(self, text_data=None, bytes_data=None):
+        try:
+            mensaje = json.loads(text_data or '{}')
+        except ValueError:
+            await self.send(text_data=json.dumps({'tipo': 'error', 'detail': 'Mensaje JSON inválido.'}))
+            return
+
+        if mensaje.get('tipo') != 'snapshot':
+            return
+        try:
+            despues_de = int(mensaje.get('despues_de') or 0)
+            limite = int(mensaje.get('limite') or difusion.TAMANO_PAGINA_SNAPSHOT)
+        except (TypeError, ValueError):
+            await self.send(text_data=json.dumps({'tipo': 'error', 'detail': 'despues_de y limite deben ser números.'}))
+            return
+
+        pagina = await database_sync_to_async(difusion.pagina_snapshot)(despues_de, limite)
+        if mensaje.get('comprimir'):
+            await self.send(bytes_data=difusion.comprimir(pagina))
+        else:
+            await self.send(text_data=json.dumps(pagina, cls=DjangoJSONEncoder, ensure_ascii=False))
 
-    async def estudiantes_update(self, event):
-        data = event['data']
-        await self.send(text_data=json.dumps(data, ensure_ascii=False))
\ No newline at end of file
+    async def estudiantes_delta(self, event):
+        await self.send(text_data=json.dumps(event['data'], ensure_ascii=False))
@@ -0,0 +1,144 @@
+"""
+Difusión incremental del listado de estudiantes por WebSocket.
+
+En lugar de reenviar todos los estudiantes (con acudiente y auditorías
+anidadas) a cada cliente conectado tras cada registro, se publica solo el
+cambio ocurrido (creado, actualizado o eliminado) con un número de versión
+monótono:
+
+    {"tipo": "delta", "version": 42, "evento": "creado", "id_estudiante": 7, "estudiante": {...}}
+
+El cliente pide una instantánea paginada al conectarse (ver consumers.py),
+aplica los deltas con versión mayor a la de la instantánea y, si detecta un
+salto en la numeración, consulta GET /est/sincronizacion/?desde=<version>
+para recuperar los eventos perdidos o, si ya expiraron, volver a pedir la
+instantánea.
+
+La versión y los eventos recientes viven en la caché compartida (Redis en
+producción), de modo que todos los workers numeran sobre el mismo contador.
+"""
+import gzip
+import json
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import Estudiante
+
+GRUPO = 'estudiantes'
+CLAVE_VERSION = 'estudiantes:difusion:version'
+CLAVE_EVENTO = 'estudiantes:difusion:evento:{}'
+# Tiempo que se conservan los eventos para resincronizar sin instantánea
+TTL_EVENTOS = 60 * 60
+# Más eventos que estos en un salto: conviene más pedir la instantánea
+MAXIMO_EVENTOS_RESYNC = 500
+TAMANO_PAGINA_SNAPSHOT = 500
+MAXIMO_PAGINA_SNAPSHOT = 2000
+
+# Campos planos que viajan en los deltas y en la instantánea (sin consultas extra)
+CAMPOS_DIFUSION = (
+    'id_estudiante', 'nombre', 'apellido', 'numero_documento', 'email', 'colegio',
+    'estamento', 'grado', 'genero', 'ciudad_residencia', 'is_active', 'estado',
+    'verificacion_foto', 'verificacion_documento_identidad', 'verificacion_informacion',
+)
+
+
+def datos_estudiante(instance):
+    return {campo: getattr(instance, campo) for campo in CAMPOS_DIFUSION}
+
+
+def version_actual():
+    return cache.get(CLAVE_VERSION) or 0
+
+
+def _siguiente_version():
+    cache.add(CLAVE_VERSION, 0, timeout=None)
+    try:
+        return cache.incr(CLAVE_VERSION)
+    except ValueError:
+        # La clave expiró o fue desalojada entre add e incr
+        cache.add(CLAVE_VERSION, 0, timeout=None)
+        return cache.incr(CLAVE_VERSION)
+
+
+def publicar(evento, id_estudiante, estudiante=None):
+    """Numera el evento, lo guarda para resincronización y lo envía al grupo."""
+    version = _siguiente_version()
+    mensaje = {
+        'tipo': 'delta',
+        'version': version,
+        'evento': evento,
+        'id_estudiante': id_estudiante,
+        'estudiante': estudiante,
+    }
+    # Se serializa aquí para que fechas u otros tipos no rompan el channel layer
+    mensaje = json.loads(json.dumps(mensaje, cls=DjangoJSONEncoder))
+    cache.set(CLAVE_EVENTO.format(version), mensaje, timeout=TTL_EVENTOS)
+
+    channel_layer = get_channel_layer()
+    if channel_layer is not None:
+        async_to_sync(channel_layer.group_send)(GRUPO, {'type': 'estudiantes_delta', 'data': mensaje})
+    return version
+
+
+def publicar_al_confirmar(evento, instance):
+    """Publica el delta cuando la transacción en curso se confirma."""
+    id_estudiante = instance.pk
+    estudiante = datos_estudiante(instance) if evento != 'eliminado' else None
+
+    def _publicar():
+        try:
+            publicar(evento, id_estudiante, estudiante)
+        except Exception as e:
+            # Si Redis no está disponible el cambio ya quedó guardado; los
+            # clientes lo recuperan al resincronizar.
+            print(f"Error publicando delta del estudiante {id_estudiante}: {e}")
+
+    transaction.on_commit(_publicar)
+
+
+def eventos_desde(desde):
+    """
+    Eventos con versión mayor a `desde`. Retorna (version_actual, eventos) o
+    (version_actual, None) si el salto es muy grande o algún evento ya expiró,
+    en cuyo caso el cliente debe pedir una instantánea.
+    """
+    actual = version_actual()
+    if desde >= actual:
+        return actual, []
+    if actual - desde > MAXIMO_EVENTOS_RESYNC:
+        return actual, None
+    claves = [CLAVE_EVENTO.format(version) for version in range(desde + 1, actual + 1)]
+    encontrados = cache.get_many(claves)
+    if len(encontrados) != len(claves):
+        return actual, None
+    return actual, [encontrados[clave] for clave in claves]
+
+
+def pagina_snapshot(despues_de=0, limite=TAMANO_PAGINA_SNAPSHOT):
+    """
+    Página de la instantánea paginada por id_estudiante (keyset). La versión se
+    lee antes de la consulta: los deltas posteriores a ella deben aplicarse
+    encima de la instantánea.
+    """
+    limite = max(1, min(int(limite), MAXIMO_PAGINA_SNAPSHOT))
+    version = version_actual()
+    estudiantes = list(
+        Estudiante.objects.filter(id_estudiante__gt=despues_de)
+        .order_by('id_estudiante')
+        .values(*CAMPOS_DIFUSION)[:limite]
+    )
+    return {
+        'tipo': 'snapshot',
+        'version': version,
+        'estudiantes': estudiantes,
+        'siguiente': estudiantes[-1]['id_estudiante'] if len(estudiantes) == limite else None,
+    }
+
+
+def comprimir(mensaje):
+    """JSON comprimido con gzip para enviarlo como frame binario."""
+    return gzip.compress(json.dumps(mensaje, cls=DjangoJSONEncoder, ensure_ascii=False).encode('utf-8'))
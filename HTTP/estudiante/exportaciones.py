@@ -0,0 +1,44 @@
+from exportacion.motor import Columna, Exportacion, registrar
+
+from .models import Estudiante
+
+EXPORTACION_ESTUDIANTES = registrar(Exportacion(
+    nombre='estudiantes',
+    queryset=Estudiante.objects.all(),
+    columnas=[
+        Columna('nombre', 'nombre'),
+        Columna('apellido', 'apellido'),
+        Columna('numero_documento', 'numero_documento'),
+        Columna('email', 'email'),
+        Columna('ciudad_residencia', 'ciudad_residencia'),
+        Columna('eps', 'eps'),
+        Columna('grado', 'grado'),
+        Columna('tipo_documento', 'tipo_documento'),
+        Columna('genero', 'genero'),
+        Columna('fecha_nacimiento', 'fecha_nacimiento'),
+        Columna('telefono_fijo', 'telefono_fijo'),
+        Columna('celular', 'celular'),
+        Columna('departamento_residencia', 'departamento_residencia'),
+        Columna('comuna_residencia', 'comuna_residencia'),
+        Columna('direccion_residencia', 'direccion_residencia'),
+        Columna('estamento', 'estamento'),
+        Columna('discapacidad', 'discapacidad'),
+        Columna('tipo_discapacidad', 'tipo_discapacidad'),
+        Columna('descripcion_discapacidad', 'descripcion_discapacidad'),
+        # Datos del acudiente al final
+        Columna('acudiente_nombre', 'acudiente__nombre_acudiente'),
+        Columna('acudiente_apellido', 'acudiente__apellido_acudiente'),
+        Columna('acudiente_tipo_documento', 'acudiente__tipo_documento_acudiente'),
+        Columna('acudiente_numero_documento', 'acudiente__numero_documento_acudiente'),
+        Columna('acudiente_celular', 'acudiente__celular_acudiente'),
+    ],
+    filtros={
+        'genero': 'genero',
+        'estamento': 'estamento',
+        'grado': 'grado',
+        'estado': 'estado',
+        'ciudad_residencia': 'ciudad_residencia',
+        'colegio': 'colegio',
+    },
+    orden=('id_estudiante',),
+))
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:27
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('acudiente', '0002_alter_acudiente_numero_documento_acudiente_and_more'),
+        ('auditlog', '0017_add_actor_email'),
+        ('estudiante', '0002_estudiante_estrato'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='estudiante',
+            index=models.Index(django.db.models.functions.text.Lower('estamento'), name='estudiante_estamento_lower_idx'),
+        ),
+    ]
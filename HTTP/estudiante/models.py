@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from acudiente.models import Acudiente
 from django.conf import settings
 from auditlog.registry import auditlog
@@ -110,5 +111,9 @@ class Estudiante(models.Model):
         verbose_name = "Estudiante"
         verbose_name_plural = "Estudiantes"
         ordering = ['id_estudiante']
+        indexes = [
+            # Filtro de estamento insensible a mayúsculas (LOWER(estamento) = valor)
+            models.Index(Lower('estamento'), name='estudiante_estamento_lower_idx'),
+        ]
 
 auditlog.register(Estudiante)
\ No newline at end of file
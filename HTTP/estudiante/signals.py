@@ -1,5 +1,24 @@
-from django.db.models.signals import pre_delete
+from django.db.models.signals import pre_delete, post_save, post_delete
 from django.dispatch import receiver
 from .models import Estudiante
 from rest_framework.authtoken.models import Token
+from . import difusion
 
+
+# ---------------------------------------------------------------------------
+# Difusión incremental por WebSocket (ver estudiante/difusion.py)
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=Estudiante)
+def difusion_estudiante_guardado(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    # Guardados que solo tocan campos que no viajan en el delta (p. ej. audit_*)
+    if update_fields is not None and not set(update_fields) & set(difusion.CAMPOS_DIFUSION):
+        return
+    difusion.publicar_al_confirmar('creado' if created else 'actualizado', instance)
+
+
+@receiver(post_delete, sender=Estudiante)
+def difusion_estudiante_eliminado(sender, instance, **kwargs):
+    difusion.publicar_al_confirmar('eliminado', instance)
@@ -0,0 +1,102 @@
+import gzip
+import json
+
+import pytest
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from rest_framework.test import APIClient
+
+from rest_framework.authtoken.models import Token
+
+from cuenta.models import CustomUser
+from cuenta.websocket import TokenAuthMiddleware
+from estudiante import difusion
+from estudiante.consumers import EstudianteConsumer
+
+
+@pytest.mark.django_db
+def test_guardar_estudiante_publica_solo_el_delta(estudiante_instance, django_capture_on_commit_callbacks):
+    channel_layer = get_channel_layer()
+    canal = async_to_sync(channel_layer.new_channel)()
+    async_to_sync(channel_layer.group_add)(difusion.GRUPO, canal)
+    version_previa = difusion.version_actual()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        estudiante_instance.nombre = 'Cambiado'
+        estudiante_instance.save()
+
+    mensaje = async_to_sync(channel_layer.receive)(canal)['data']
+    assert mensaje['tipo'] == 'delta'
+    assert mensaje['evento'] == 'actualizado'
+    assert mensaje['version'] == version_previa + 1
+    assert mensaje['estudiante']['nombre'] == 'Cambiado'
+    # Solo campos planos: nada de acudiente ni auditorías anidadas
+    assert set(mensaje['estudiante']) == set(difusion.CAMPOS_DIFUSION)
+
+    # Guardados que solo tocan campos fuera del delta no se difunden
+    with django_capture_on_commit_callbacks(execute=True) as callbacks:
+        estudiante_instance.save(update_fields=['audit_foto'])
+    assert callbacks == []
+
+
+@pytest.mark.django_db
+def test_sincronizacion_retorna_eventos_o_pide_snapshot(estudiante_instance):
+    admin = CustomUser.objects.create(username='admin_difusion', password='x', user_type='administrador')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+
+    desde = difusion.version_actual()
+    difusion.publicar('actualizado', estudiante_instance.pk, difusion.datos_estudiante(estudiante_instance))
+    difusion.publicar('eliminado', estudiante_instance.pk)
+
+    response = client.get('/estudiante/est/sincronizacion/', {'desde': desde})
+    assert response.status_code == 200
+    assert response.data['snapshot_requerido'] is False
+    assert [evento['version'] for evento in response.data['eventos']] == [desde + 1, desde + 2]
+
+    # Un salto mayor al que se conserva obliga a pedir la instantánea
+    response = client.get('/estudiante/est/sincronizacion/', {'desde': desde - difusion.MAXIMO_EVENTOS_RESYNC})
+    assert response.data['snapshot_requerido'] is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_consumer_rechaza_conexiones_sin_token_valido(estudiante_instance):
+    token_estudiante = Token.objects.create(user=estudiante_instance.user)
+
+    async def conectar(ruta):
+        communicator = WebsocketCommunicator(TokenAuthMiddleware(EstudianteConsumer.as_asgi()), ruta)
+        conectado, _ = await communicator.connect()
+        await communicator.disconnect()
+        return conectado
+
+    assert async_to_sync(conectar)('/ws/estudiantes/') is False
+    assert async_to_sync(conectar)('/ws/estudiantes/?token=no-existe') is False
+    # Un estudiante no puede suscribirse a los datos de todos
+    assert async_to_sync(conectar)(f'/ws/estudiantes/?token={token_estudiante.key}') is False
+
+
+@pytest.mark.django_db(transaction=True)
+def test_consumer_envia_snapshot_paginado_y_comprimido(estudiante_instance):
+    admin = CustomUser.objects.create(username='admin_socket', password='x', user_type='administrador')
+    token = Token.objects.create(user=admin)
+
+    async def conversar():
+        communicator = WebsocketCommunicator(
+            TokenAuthMiddleware(EstudianteConsumer.as_asgi()), '/ws/estudiantes/',
+            headers=[(b'authorization', f'Token {token.key}'.encode())],
+        )
+        conectado, _ = await communicator.connect()
+        assert conectado
+        saludo = await communicator.receive_json_from()
+        assert saludo['tipo'] == 'conectado'
+
+        await communicator.send_json_to({'tipo': 'snapshot', 'despues_de': 0, 'limite': 1, 'comprimir': True})
+        pagina = json.loads(gzip.decompress(await communicator.receive_from()))
+        await communicator.disconnect()
+        return pagina
+
+    pagina = async_to_sync(conversar)()
+    assert pagina['tipo'] == 'snapshot'
+    assert [fila['id_estudiante'] for fila in pagina['estudiantes']] == [estudiante_instance.id_estudiante]
+    assert pagina['siguiente'] == estudiante_instance.id_estudiante
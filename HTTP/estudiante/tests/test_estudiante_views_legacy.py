@@ -161,6 +161,39 @@ def test_update_student(estudiante_profile, estudiante_user, admin_user):
     response = client.patch(url, {"numero_documento": "54321"}, format='json')
     assert response.status_code == status.HTTP_200_OK
 
+# Test: Update coalescido de los datos de cuenta
+@pytest.mark.django_db
+def test_partial_update_guarda_una_vez_por_tabla(estudiante_profile, admin_user):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from auditlog.models import LogEntry
+
+    client = APIClient()
+    client.force_authenticate(user=admin_user)
+    entradas_previas = LogEntry.objects.get_for_object(estudiante_profile).count()
+
+    with CaptureQueriesContext(connection) as consultas:
+        response = client.patch(detail_url(estudiante_profile.id_estudiante), {
+            "nombre": "Nuevo",
+            "apellido": "Nombre",
+            "email": "nuevo@example.com",
+            "is_active": "false",
+            "contrasena": "otra-clave",
+        }, format='json')
+    assert response.status_code == status.HTTP_200_OK, response.data
+
+    updates = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('UPDATE')]
+    assert len([sql for sql in updates if '"estudiante_estudiante"' in sql]) == 1
+    assert len([sql for sql in updates if '"cuenta_customuser"' in sql]) == 1
+    assert LogEntry.objects.get_for_object(estudiante_profile).count() == entradas_previas + 1
+
+    estudiante_profile.refresh_from_db()
+    estudiante_profile.user.refresh_from_db()
+    assert estudiante_profile.user.first_name == "Nuevo"
+    assert estudiante_profile.is_active is False and estudiante_profile.user.is_active is False
+    assert estudiante_profile.user.check_password("otra-clave")
+    assert estudiante_profile.contrasena == estudiante_profile.user.password
+
 # Test: Delete estudiante
 @pytest.mark.django_db
 def test_destroy_student(estudiante_profile, admin_user, profesor_user):
@@ -8,6 +8,7 @@ from rest_framework.authtoken.models import Token
 from ..views import EstudianteViewSet
 from ..models import Estudiante
 from cuenta.models import CustomUser
+from inscripcion.models import ArchivoPendienteEliminacion
 
 CustomUser = get_user_model()
 
@@ -102,8 +103,8 @@ class TestEstudianteViewSetEliminar:
         assert respuesta.status_code == status.HTTP_403_FORBIDDEN
         assert Estudiante.objects.filter(id_estudiante=estudiante.id_estudiante).exists()
     
-    def test_eliminar_archivos_s3(self, configurar_estudiante):
-        """Prueba que el método eliminar intenta borrar los archivos asociados en S3"""
+    def test_eliminar_archivos_s3(self, configurar_estudiante, django_capture_on_commit_callbacks):
+        """Prueba que el método eliminar borra en un solo lote los archivos asociados"""
         admin = configurar_estudiante['admin']
         estudiante = configurar_estudiante['estudiante']
         
@@ -119,24 +120,16 @@ class TestEstudianteViewSetEliminar:
         peticion = factory.delete(f'/api/estudiantes/{estudiante.id_estudiante}/')
         force_authenticate(peticion, user=admin)
         
-        with patch('estudiante.views.EstudianteViewSet.get_s3_client') as mock_cliente_s3:
-            mock_client = MagicMock()
-            mock_cliente_s3.return_value = mock_client
-            
-            respuesta = vista(peticion, pk=estudiante.id_estudiante)
+        with patch('cuenta.limpieza.borrar_archivos') as mock_borrar:
+            with django_capture_on_commit_callbacks(execute=True):
+                respuesta = vista(peticion, pk=estudiante.id_estudiante)
             
-            # Verificar que el cliente S3 fue llamado para eliminar archivos
-            assert mock_client.delete_object.call_count == 2  # Dos archivos con nombres
-            # Verificar que se usaron las claves correctas
-            claves_esperadas = [
-                f"media/{estudiante.documento_identidad.name.lstrip('/')}",
-                f"media/{estudiante.foto.name.lstrip('/')}"
-            ]
-            claves_reales = [
-                call[1]['Key'] for call in mock_client.delete_object.call_args_list
-            ]
-            for clave in claves_esperadas:
-                assert clave in claves_reales
+            # Los archivos se borran al confirmar, todos en una sola llamada
+            assert respuesta.status_code == status.HTTP_204_NO_CONTENT
+            assert mock_borrar.call_count == 1
+            nombres = mock_borrar.call_args[0][0]
+            for nombre in ['test_document.pdf', 'test_photo.jpg']:
+                assert nombre in nombres
     
     def test_eliminar_usuario_y_token(self, configurar_estudiante):
         """Prueba que el método eliminar también borra el usuario asociado y su token"""
@@ -163,7 +156,7 @@ class TestEstudianteViewSetEliminar:
             assert not CustomUser.objects.filter(id=id_usuario).exists()
             assert not Token.objects.filter(user_id=id_usuario).exists()
     
-    def test_manejo_excepciones_eliminar(self, configurar_estudiante):
+    def test_manejo_excepciones_eliminar(self, configurar_estudiante, django_capture_on_commit_callbacks):
         """Prueba que el método eliminar maneja las excepciones al borrar archivos S3 correctamente"""
         admin = configurar_estudiante['admin']
         estudiante = configurar_estudiante['estudiante']
@@ -178,14 +171,19 @@ class TestEstudianteViewSetEliminar:
         peticion = factory.delete(f'/api/estudiantes/{estudiante.id_estudiante}/')
         force_authenticate(peticion, user=admin)
         
-        with patch('estudiante.views.EstudianteViewSet.get_s3_client') as mock_cliente_s3:
+        with patch('cuenta.limpieza.default_storage') as mock_storage, \
+                patch('cuenta.limpieza.cliente_s3') as mock_cliente_s3:
             # Simular que el cliente S3 lanza una excepción al eliminar
+            mock_storage._normalize_name.side_effect = lambda nombre: nombre
             mock_client = MagicMock()
-            mock_client.delete_object.side_effect = Exception("Error al borrar en S3")
+            mock_client.delete_objects.side_effect = Exception("Error al borrar en S3")
             mock_cliente_s3.return_value = mock_client
             
             # La vista debería seguir teniendo éxito aunque falle la eliminación en S3
-            respuesta = vista(peticion, pk=estudiante.id_estudiante)
+            with django_capture_on_commit_callbacks(execute=True):
+                respuesta = vista(peticion, pk=estudiante.id_estudiante)
             
             assert respuesta.status_code == status.HTTP_204_NO_CONTENT
-            assert not Estudiante.objects.filter(id_estudiante=estudiante.id_estudiante).exists()
\ No newline at end of file
+            assert not Estudiante.objects.filter(id_estudiante=estudiante.id_estudiante).exists()
+            # Los archivos que no se pudieron borrar quedan en cola para reintentarse
+            assert ArchivoPendienteEliminacion.objects.filter(nombre='test_doc.pdf').exists()
@@ -3,7 +3,7 @@ from dotenv import load_dotenv
 load_dotenv()
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.contrib.auth.hashers import make_password
+from cuenta.contrasenas import hashear
 
 #Documentacion
 from drf_yasg.utils import swagger_auto_schema
@@ -22,27 +22,27 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 #Transacciones atomicas
 from django.db import transaction
 #HTTP
-from django.http import HttpResponse
 from rest_framework.response import Response
-#fecha y hora 
-from datetime import datetime
 #Amazon S3
-import boto3
 from botocore.exceptions import NoCredentialsError, ClientError
 #Acciones
 from rest_framework.decorators import action
-#pandas
-import pandas as pd
+#Exportacion
+from exportacion.motor import responder_exportacion
+from .exportaciones import EXPORTACION_ESTUDIANTES
 #filtros
 from django_filters.rest_framework import DjangoFilterBackend
-#Channels
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
+#Difusion WebSocket
+from . import difusion
 #Auditoria
 from django.dispatch import receiver
-from auditlog.models import LogEntry
+from cuenta.auditoria import entrada_auditoria
 from .serializers import LogEntrySerializer
 from auditlog.context import set_actor
+from cuenta.perfiles import actualizar_perfil
+from cuenta.renombrado import programar_renombrado
+from cuenta.limpieza import cliente_s3, purgar_cuentas
+from cuenta.identidad import resolver
 
 def file_update(instance, data, field_name):
         """
@@ -58,11 +58,6 @@ def file_update(instance, data, field_name):
             instance.save()
             data.pop(field_name)
 
-def extract_single_value(value):
-        if isinstance(value, list):
-            return value[0] if value else ''
-        return value
-                
 class EstudianteViewSet(viewsets.ModelViewSet):
     """
     API endpoint para gestionar estudiantes.
@@ -81,7 +76,7 @@ class EstudianteViewSet(viewsets.ModelViewSet):
         - retrieve, update, partial_update: Estudiantes pueden ver/actualizar sus propios datos, administradores pueden todos
         - destroy: Solo administradores
         """
-        if self.action == 'list':
+        if self.action in ['list', 'sincronizacion']:
             # Profesores y administradores pueden ver todos los estudiantes
             permission_classes = [IsProfesorOrAdministradorOrMonitorAcademicoOrAdministrativo]
         elif self.action in ['retrieve', 'update', 'partial_update']:
@@ -90,7 +85,7 @@ class EstudianteViewSet(viewsets.ModelViewSet):
             permission_classes = [AllowAny]
         elif self.action in ['create', 'buscar_por_documento']:
             permission_classes = [AllowAny]
-        elif self.action in ['destroy']:
+        elif self.action in ['destroy', 'export_excel']:
             permission_classes = [IsMonitorAdministrativoOrAdministrador]
         else:
             # Para cualquier otra acción, usuario autenticado
@@ -126,13 +121,42 @@ class EstudianteViewSet(viewsets.ModelViewSet):
         numero_documento = request.query_params.get('numero_documento')
         if not numero_documento:
             return Response({"detail": "El número de documento es requerido."}, status=status.HTTP_400_BAD_REQUEST)
+        # Los documentos inexistentes se responden desde la caché (ver cuenta/identidad.py)
+        identidad = resolver(numero_documento, 'estudiante')
+        if identidad is None:
+            return Response({"detail": "Estudiante no encontrado"}, status=status.HTTP_404_NOT_FOUND)
         try:
-            estudiante = Estudiante.objects.get(numero_documento=numero_documento)
+            estudiante = Estudiante.objects.get(pk=identidad.perfil_id)
             serializer = self.get_serializer(estudiante)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Estudiante.DoesNotExist:
             return Response({"detail": "Estudiante no encontrado"}, status=status.HTTP_404_NOT_FOUND)
     
+    @swagger_auto_schema(
+        operation_summary="Resincronizar la difusión de estudiantes",
+        operation_description=(
+            "Para clientes WebSocket que detectan un salto en la versión: retorna los "
+            "deltas con versión mayor a `desde`. Si ya no están disponibles, "
+            "`snapshot_requerido` es true y el cliente debe pedir la instantánea."
+        ),
+        manual_parameters=[
+            openapi.Parameter('desde', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=True,
+                              description="Última versión aplicada por el cliente"),
+        ]
+    )
+    @action(detail=False, methods=['get'], url_path='sincronizacion')
+    def sincronizacion(self, request):
+        try:
+            desde = int(request.query_params.get('desde', ''))
+        except ValueError:
+            return Response({"detail": "El parámetro desde debe ser un número."}, status=status.HTTP_400_BAD_REQUEST)
+        version, eventos = difusion.eventos_desde(desde)
+        return Response({
+            "version": version,
+            "snapshot_requerido": eventos is None,
+            "eventos": eventos or [],
+        })
+
     @swagger_auto_schema(
         operation_summary="Listar todos los estudiantes",
         operation_description="Retorna una lista de todos los estudiantes registrados"
@@ -175,8 +199,8 @@ class EstudianteViewSet(viewsets.ModelViewSet):
         if not data.get('contrasena'):
             data['contrasena'] = data.get('numero_documento', '')
         
-        # Hashear la contraseña
-        hashed_password = make_password(data['contrasena'])
+        # Se hashea una sola vez: el mismo hash va al usuario y al perfil (ver cuenta/contrasenas.py)
+        hashed_password = hashear(data['contrasena'])
         
         try:
             with transaction.atomic():
@@ -223,15 +247,8 @@ class EstudianteViewSet(viewsets.ModelViewSet):
                     foto=request.FILES.get('foto'),
                 )
 
-            channel_layer = get_channel_layer()
-            data = EstudianteSerializer(Estudiante.objects.all(), many=True).data
-            async_to_sync(channel_layer.group_send)(
-                'estudiantes',
-                {
-                    'type': 'estudiantes_update',
-                    'data': data
-                }
-            )
+            # El delta para los clientes WebSocket lo publica la señal post_save
+            # (ver estudiante/difusion.py), ya no se reenvía el listado completo.
 
             # Puedes retornar la información deseada
             return Response({'id': estudiante.id_estudiante}, status=status.HTTP_201_CREATED)
@@ -299,74 +316,20 @@ class EstudianteViewSet(viewsets.ModelViewSet):
                         status=status.HTTP_403_FORBIDDEN
                     )
 
-            user = instance.user
-
             pdf_fields = [
                 'documento_identidad',
                 'foto',
             ]
 
-            numero_documento_actualizado = False
-            nuevo_numero_documento = None
-
-            manual_fields = ['contrasena', 'is_active', 'nombre', 'apellido', 'email', 'numero_documento']
-
-            with set_actor(request.user):
-                # Actualizaciones manuales
-                for field in manual_fields:
-                    if field in data:
-                        value = extract_single_value(data.pop(field))
-                        if field == 'contrasena':
-                            user.set_password(value)
-                            user.save()
-                            instance.contrasena = make_password(value)
-                            instance.save()
-                        elif field == 'is_active':
-                            user.is_active = value
-                            user.save()
-                            instance.is_active = value
-                            instance.save()
-                        elif field == 'nombre':
-                            user.first_name = value
-                            user.save()
-                            instance.nombre = value
-                            instance.save()
-                        elif field == 'apellido':
-                            user.last_name = value
-                            user.save()
-                            instance.apellido = value
-                            instance.save()
-                        elif field == 'email':
-                            user.email = value
-                            user.save()
-                            instance.email = value
-                            instance.save()
-                        elif field == 'numero_documento':
-                            if instance.numero_documento != value:
-                                user.username = value
-                                user.save()
-                                instance.numero_documento = value
-                                instance.save()
-                                numero_documento_actualizado = True
-                                nuevo_numero_documento = value
-
-                # Renombrar archivos PDF si se actualizó el número de documento
-                if numero_documento_actualizado:
-                    for field in pdf_fields:
-                        file_field = getattr(instance, field, None)
-                        if file_field and hasattr(file_field, 'name') and file_field.name:
-                            import os
-                            from django.core.files.base import ContentFile
-                            old_file_name = file_field.name
-                            file_content = file_field.read()
-                            storage = file_field.storage
-                            if storage.exists(old_file_name):
-                                storage.delete(old_file_name)
-                            _, ext = os.path.splitext(old_file_name)
-                            new_filename = f"{nuevo_numero_documento}{ext}"
-                            file_dir = os.path.dirname(old_file_name)
-                            new_file_path = os.path.join(file_dir, new_filename)
-                            getattr(instance, field).save(new_file_path, ContentFile(file_content), save=True)
+            # Todo el partial_update en una transacción: el renombrado de archivos
+            # arranca solo después del último save de la petición
+            with set_actor(request.user), transaction.atomic():
+                # Datos de cuenta: se aplican en memoria y se guarda una vez por
+                # tabla (ver cuenta/perfiles.py)
+                if 'numero_documento' in actualizar_perfil(instance, data):
+                    # Los archivos se renombran en segundo plano al confirmar la
+                    # transacción, sin leerlos en la petición (ver cuenta/renombrado.py)
+                    programar_renombrado(instance, pdf_fields)
 
                 # Actualiza los archivos si se envían en el request
                 file_update(instance, data, 'documento_identidad')
@@ -419,11 +382,8 @@ class EstudianteViewSet(viewsets.ModelViewSet):
 
         instance.save(update_fields=['estado'])
 
-        # Busca el último logentry después de guardar
-        logentry = LogEntry.objects.filter(
-            object_id=instance.pk,
-            content_type__model='estudiante'
-        ).order_by('-timestamp').first()
+        # Entrada de auditoría capturada al guardar (ver cuenta/auditoria.py)
+        logentry = entrada_auditoria(instance)
 
         # Solo actualiza el campo de auditoría si el valor fue cambiado
         if foto_original != foto_nuevo and logentry:
@@ -447,14 +407,9 @@ class EstudianteViewSet(viewsets.ModelViewSet):
 
     def get_s3_client(self):
         """
-        Retorna un cliente de boto3 para S3 usando las variables de entorno.
+        Retorna el cliente S3 compartido del proceso (ver cuenta/limpieza.py).
         """
-        return boto3.client(
-            's3',
-            aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID', ''),
-            aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY', ''),
-            region_name=os.getenv('AWS_S3_REGION_NAME', 'us-east-1'),
-    )
+        return cliente_s3()
     
     @swagger_auto_schema(
         operation_summary="Eliminar un estudiante",
@@ -462,37 +417,10 @@ class EstudianteViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        user = None
-        s3 = self.get_s3_client()
-        bucket_name = os.getenv('AWS_STORAGE_BUCKET_NAME', 'archivos-estudiantes')
-
-        archivos = [
-            instance.documento_identidad,
-            instance.foto,
-        ]
-        for archivo in archivos:
-            if archivo and hasattr(archivo, 'name') and archivo.name:
-                key = f"media/{archivo.name.lstrip('/')}"  # Asegura el prefijo correcto
-                try:
-                    print(f"Eliminando archivo {key} de S3...")
-                    s3.delete_object(Bucket=bucket_name, Key=key)
-                except Exception as e:
-                    print(f"Error eliminando archivo {key} de S3: {str(e)}")
-
-        try:
-            user = instance.user
-        except Exception:
-            user = None
-
         try:
-            with transaction.atomic():
-                # Primero elimina tokens y usuario si existe
-                if user:
-                    from rest_framework.authtoken.models import Token
-                    Token.objects.filter(user=user).delete()
-                    user.delete()
-                # Luego elimina el estudiante
-                self.perform_destroy(instance)
+            # Usuario, tokens, inscripciones y archivos en una sola pasada; los
+            # archivos se borran en lote al confirmar (ver cuenta/limpieza.py)
+            purgar_cuentas(Estudiante, [instance.pk])
         except Exception as e:
             print(f"Error en la eliminación: {str(e)}")
             return Response({"detail": f"Error eliminando estudiante: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
@@ -520,57 +448,16 @@ class EstudianteViewSet(viewsets.ModelViewSet):
         
     @swagger_auto_schema(
         operation_summary="Exporta a excel todos los estudiantes",
-        operation_description="Exporta a excel todos los estudiantes"
+        operation_description=(
+            "Exporta los estudiantes en streaming (xlsx por defecto o `?formato=csv`). Acepta los "
+            "filtros genero, estamento, grado, estado, ciudad_residencia y colegio. Con "
+            "`?segundo_plano=1` se genera como trabajo y se retorna el enlace para descargarlo."
+        )
     )
     @action(detail=False, methods=['get'], url_path='export-excel',
             permission_classes=[IsMonitorAdministrativoOrAdministrador])
     def export_excel(self, request):
-        estudiantes = Estudiante.objects.all().select_related('acudiente')
-        data = []
-        for estudiante in estudiantes:
-            row = {
-                'nombre': estudiante.nombre,
-                'apellido': estudiante.apellido,
-                'numero_documento': estudiante.numero_documento,
-                'email': estudiante.email,
-                'ciudad_residencia': estudiante.ciudad_residencia,
-                'eps': estudiante.eps,
-                'grado': estudiante.grado,
-                'tipo_documento': estudiante.tipo_documento,
-                'genero': estudiante.genero,
-                'fecha_nacimiento': estudiante.fecha_nacimiento,
-                'telefono_fijo': estudiante.telefono_fijo,
-                'celular': estudiante.celular,
-                'departamento_residencia': estudiante.departamento_residencia,
-                'comuna_residencia': estudiante.comuna_residencia,
-                'direccion_residencia': estudiante.direccion_residencia,
-                'estamento': estudiante.estamento,
-                'discapacidad': estudiante.discapacidad,
-                'tipo_discapacidad': estudiante.tipo_discapacidad,
-                'descripcion_discapacidad': estudiante.descripcion_discapacidad,
-            }
-            # Agrega los datos del acudiente al final
-            acudiente = estudiante.acudiente
-            if acudiente:
-                row['acudiente_nombre'] = acudiente.nombre_acudiente
-                row['acudiente_apellido'] = acudiente.apellido_acudiente
-                row['acudiente_tipo_documento'] = acudiente.tipo_documento_acudiente
-                row['acudiente_numero_documento'] = acudiente.numero_documento_acudiente
-                row['acudiente_celular'] = acudiente.celular_acudiente
-            else:
-                row['acudiente_nombre'] = ''
-                row['acudiente_apellido'] = ''
-                row['acudiente_tipo_documento'] = ''
-                row['acudiente_numero_documento'] = ''
-                row['acudiente_celular'] = ''
-            data.append(row)
-
-        df = pd.DataFrame(data)
-        filename = f'estudiantes_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        df.to_excel(response, index=False)
-        return response
+        return responder_exportacion(request, EXPORTACION_ESTUDIANTES)
     
     #Filtros
     @swagger_auto_schema(
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class ExportacionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'exportacion'
+
+    def ready(self):
+        # Registra las exportaciones declaradas en <app>/exportaciones.py
+        autodiscover_modules('exportaciones')
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from exportacion.models import TrabajoExportacion
+from exportacion.motor import procesar_trabajo, reencolar_abandonados
+
+
+class Command(BaseCommand):
+    help = (
+        "Procesa los trabajos de exportación pendientes (por ejemplo, los que "
+        "quedaron encolados si el proceso se reinició antes de generarlos) y "
+        "reintenta los que quedaron en 'procesando' más del tiempo máximo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--minutos', type=int, default=None,
+                            help="Minutos en 'procesando' tras los cuales un trabajo se considera "
+                                 "abandonado (por defecto EXPORTACION_MINUTOS_MAXIMOS)")
+
+    def handle(self, *args, **options):
+        reencolados = reencolar_abandonados(options['minutos'])
+        pendientes = list(
+            TrabajoExportacion.objects.filter(estado='pendiente')
+            .order_by('fecha_creacion').values_list('pk', flat=True)
+        )
+        for id_trabajo in pendientes:
+            procesar_trabajo(id_trabajo)
+        self.stdout.write(self.style.SUCCESS(
+            f"Trabajos procesados: {len(pendientes)} (reencolados por abandono: {reencolados})"
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exportacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trabajoexportacion',
+            name='fecha_inicio',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
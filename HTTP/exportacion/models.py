@@ -0,0 +1,41 @@
+import uuid
+
+from django.conf import settings
+from django.db import models
+
+
+class TrabajoExportacion(models.Model):
+    """
+    Exportación grande ejecutada en segundo plano (ver exportacion/motor.py).
+    El archivo generado queda en el almacenamiento y se descarga desde
+    /exportacion/trabajos/<id>/descargar/.
+    """
+    ESTADOS = (
+        ('pendiente', 'Pendiente'),
+        ('procesando', 'Procesando'),
+        ('listo', 'Listo'),
+        ('error', 'Error'),
+    )
+
+    id_trabajo = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    exportacion = models.CharField(max_length=50)
+    formato = models.CharField(max_length=10)
+    parametros = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(max_length=12, choices=ESTADOS, default='pendiente')
+    archivo = models.FileField(upload_to='exportaciones/', null=True, blank=True)
+    filas = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    solicitado_por = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='exportaciones'
+    )
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    # Momento en que un proceso tomó el trabajo (estado 'procesando')
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_finalizacion = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.exportacion} ({self.formato}) | Estado: {self.estado}"
+
+    class Meta:
+        verbose_name = "Trabajo de exportación"
+        verbose_name_plural = "Trabajos de exportación"
@@ -0,0 +1,241 @@
+"""
+Motor de exportación a XLSX/CSV con memoria constante.
+
+Cada app declara sus exportaciones en `<app>/exportaciones.py` (columnas y
+filtros permitidos) y las registra con `registrar`. Las filas salen de un
+`values_list().iterator(chunk_size=...)`, así que nunca se materializa la
+tabla completa:
+
+- CSV: se escribe fila por fila directamente en un StreamingHttpResponse.
+- XLSX: se usa un Workbook de openpyxl en modo write-only (las filas van a
+  disco a medida que se agregan) sobre un archivo temporal, que luego se
+  envía por bloques.
+
+Con `?segundo_plano=1` la exportación se ejecuta como TrabajoExportacion en
+un hilo aparte y la respuesta trae el enlace para consultar su estado y
+descargar el archivo. Si el proceso muere a mitad de un trabajo, el comando
+`procesar_exportaciones` lo reintenta pasados EXPORTACION_MINUTOS_MAXIMOS.
+"""
+import csv
+import tempfile
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from wsgiref.util import FileWrapper
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import TrabajoExportacion
+
+Columna = namedtuple('Columna', ['titulo', 'campo'])
+
+FORMATOS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv; charset=utf-8',
+}
+TAMANO_BLOQUE = 2000
+TAMANO_BLOQUE_BYTES = 64 * 1024
+VALORES_VERDADEROS = ('1', 'true', 'si', 'sí')
+
+EXPORTACIONES = {}
+
+
+class Exportacion:
+    """
+    Declaración de una exportación: queryset base, columnas (título y lookup
+    de `values_list`) y filtros permitidos (parámetro del request -> lookup).
+    """
+
+    def __init__(self, nombre, queryset, columnas, filtros=None, orden=('pk',)):
+        self.nombre = nombre
+        self.queryset = queryset
+        self.columnas = list(columnas)
+        self.filtros = filtros or {}
+        self.orden = orden
+
+    @property
+    def titulos(self):
+        return [columna.titulo for columna in self.columnas]
+
+    def parametros_de(self, query_params):
+        """Solo los filtros declarados y con valor, como dict serializable."""
+        return {
+            parametro: query_params.get(parametro)
+            for parametro in self.filtros
+            if query_params.get(parametro) not in (None, '')
+        }
+
+    def filas(self, parametros):
+        queryset = self.queryset.all()
+        for parametro, valor in self.parametros_de(parametros).items():
+            queryset = queryset.filter(**{self.filtros[parametro]: valor})
+        return (
+            queryset.order_by(*self.orden)
+            .values_list(*[columna.campo for columna in self.columnas])
+            .iterator(chunk_size=TAMANO_BLOQUE)
+        )
+
+
+def registrar(exportacion):
+    EXPORTACIONES[exportacion.nombre] = exportacion
+    return exportacion
+
+
+def _celda(valor):
+    # openpyxl no acepta caracteres de control ni datetimes con zona horaria
+    if isinstance(valor, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', valor)
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.make_naive(valor)
+    return valor
+
+
+def escribir_xlsx(exportacion, parametros, destino):
+    """Escribe el libro en `destino` (ruta o archivo). Retorna las filas escritas."""
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(exportacion.nombre[:31])
+    hoja.append(exportacion.titulos)
+    total = 0
+    for fila in exportacion.filas(parametros):
+        hoja.append([_celda(valor) for valor in fila])
+        total += 1
+    libro.save(destino)
+    return total
+
+
+class _Eco:
+    """Archivo falso para que csv.writer retorne la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def generar_csv(exportacion, parametros):
+    escritor = csv.writer(_Eco())
+    # BOM para que Excel reconozca el UTF-8
+    yield '\ufeff' + escritor.writerow(exportacion.titulos)
+    for fila in exportacion.filas(parametros):
+        yield escritor.writerow(['' if valor is None else valor for valor in fila])
+
+
+def escribir_csv(exportacion, parametros, destino):
+    """Escribe el CSV en el archivo binario `destino`. Retorna las filas escritas."""
+    lineas = generar_csv(exportacion, parametros)
+    destino.write(next(lineas).encode('utf-8'))
+    total = 0
+    for linea in lineas:
+        destino.write(linea.encode('utf-8'))
+        total += 1
+    return total
+
+
+ESCRITORES = {'xlsx': escribir_xlsx, 'csv': escribir_csv}
+
+
+def nombre_archivo(exportacion, formato):
+    return f'{exportacion.nombre}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{formato}'
+
+
+def respuesta_exportacion(exportacion, parametros, formato='xlsx'):
+    """StreamingHttpResponse con el archivo exportado."""
+    if formato == 'csv':
+        response = StreamingHttpResponse(generar_csv(exportacion, parametros), content_type=FORMATOS['csv'])
+    else:
+        temporal = tempfile.TemporaryFile()
+        escribir_xlsx(exportacion, parametros, temporal)
+        temporal.seek(0)
+        # FileWrapper cierra (y así borra) el temporal al terminar la respuesta
+        response = StreamingHttpResponse(FileWrapper(temporal, TAMANO_BLOQUE_BYTES), content_type=FORMATOS['xlsx'])
+    response['Content-Disposition'] = f'attachment; filename="{nombre_archivo(exportacion, formato)}"'
+    return response
+
+
+def encolar_trabajo(exportacion, parametros, formato, usuario=None):
+    """Crea el trabajo y lo procesa en un hilo al confirmar la transacción."""
+    trabajo = TrabajoExportacion.objects.create(
+        exportacion=exportacion.nombre,
+        formato=formato,
+        parametros=exportacion.parametros_de(parametros),
+        solicitado_por=usuario if getattr(usuario, 'is_authenticated', False) else None,
+    )
+    transaction.on_commit(
+        lambda: threading.Thread(target=procesar_trabajo, args=(trabajo.pk,), daemon=True).start()
+    )
+    return trabajo
+
+
+def procesar_trabajo(id_trabajo):
+    """Genera el archivo de un trabajo pendiente y lo guarda en el almacenamiento."""
+    from django.db import connection
+
+    try:
+        # Se toma el trabajo con un UPDATE condicional para no procesarlo dos veces
+        if not TrabajoExportacion.objects.filter(pk=id_trabajo, estado='pendiente').update(
+            estado='procesando', fecha_inicio=timezone.now()
+        ):
+            return
+        trabajo = TrabajoExportacion.objects.get(pk=id_trabajo)
+        try:
+            exportacion = EXPORTACIONES[trabajo.exportacion]
+            with tempfile.TemporaryFile() as temporal:
+                trabajo.filas = ESCRITORES[trabajo.formato](exportacion, trabajo.parametros, temporal)
+                temporal.seek(0)
+                trabajo.archivo.save(nombre_archivo(exportacion, trabajo.formato), File(temporal), save=False)
+            trabajo.estado = 'listo'
+        except Exception as e:
+            print(f"Error procesando la exportación {id_trabajo}: {e}")
+            trabajo.estado = 'error'
+            trabajo.error = str(e)
+        trabajo.fecha_finalizacion = timezone.now()
+        trabajo.save(update_fields=['estado', 'archivo', 'filas', 'error', 'fecha_finalizacion'])
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+
+
+def reencolar_abandonados(minutos=None):
+    """
+    Devuelve a 'pendiente' los trabajos que llevan en 'procesando' más de
+    `minutos` (por defecto EXPORTACION_MINUTOS_MAXIMOS): el proceso que los
+    tomó murió (hilo daemon, reinicio del worker) antes de terminarlos.
+    Retorna cuántos reencoló.
+    """
+    if minutos is None:
+        minutos = getattr(settings, 'EXPORTACION_MINUTOS_MAXIMOS', 30)
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoExportacion.objects.filter(estado='procesando').filter(
+        Q(fecha_inicio__lt=limite) | Q(fecha_inicio__isnull=True)
+    ).update(estado='pendiente', fecha_inicio=None)
+
+
+def responder_exportacion(request, exportacion):
+    """
+    Punto de entrada común de las acciones export-excel: `?formato=xlsx|csv`,
+    los filtros declarados y `?segundo_plano=1` para generarla como trabajo.
+    """
+    formato = request.query_params.get('formato', 'xlsx').lower()
+    if formato not in FORMATOS:
+        return Response(
+            {"detail": f"Formato no soportado. Use uno de: {', '.join(FORMATOS)}."},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if str(request.query_params.get('segundo_plano', '')).lower() in VALORES_VERDADEROS:
+        trabajo = encolar_trabajo(exportacion, request.query_params, formato, request.user)
+        return Response({
+            "id_trabajo": trabajo.pk,
+            "estado": trabajo.estado,
+            "url_estado": request.build_absolute_uri(
+                reverse('trabajo-exportacion-detail', args=[trabajo.pk])
+            ),
+        }, status=status.HTTP_202_ACCEPTED)
+    return respuesta_exportacion(exportacion, request.query_params, formato)
@@ -0,0 +1,22 @@
+from django.urls import reverse
+from rest_framework import serializers
+
+from .models import TrabajoExportacion
+
+
+class TrabajoExportacionSerializer(serializers.ModelSerializer):
+    url_descarga = serializers.SerializerMethodField()
+
+    class Meta:
+        model = TrabajoExportacion
+        fields = [
+            'id_trabajo', 'exportacion', 'formato', 'parametros', 'estado', 'filas', 'error',
+            'fecha_creacion', 'fecha_inicio', 'fecha_finalizacion', 'url_descarga',
+        ]
+
+    def get_url_descarga(self, obj):
+        if obj.estado != 'listo' or not obj.archivo:
+            return None
+        url = reverse('trabajo-exportacion-descargar', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,84 @@
+import csv
+import io
+
+import pytest
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from cuenta.models import CustomUser
+from exportacion.models import TrabajoExportacion
+from exportacion.motor import procesar_trabajo
+
+
+@pytest.fixture
+def cliente_admin(db):
+    admin = CustomUser.objects.create(username='admin_exportacion', password='x', user_type='administrador')
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+def _contenido(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+def test_export_excel_estudiantes_en_streaming(cliente_admin, estudiante_instance):
+    response = cliente_admin.get('/estudiante/est/export-excel/')
+    assert response.status_code == 200
+    assert response.streaming
+
+    hoja = load_workbook(io.BytesIO(_contenido(response)), read_only=True).active
+    filas = list(hoja.iter_rows(values_only=True))
+    assert filas[0][:3] == ('nombre', 'apellido', 'numero_documento')
+    assert filas[1][2] == estudiante_instance.numero_documento
+    assert filas[1][-5] == estudiante_instance.acudiente.nombre_acudiente
+
+    # Filtros declarativos: un filtro sin coincidencias deja solo el encabezado
+    response = cliente_admin.get('/estudiante/est/export-excel/', {'formato': 'csv', 'genero': 'Otro'})
+    lineas = list(csv.reader(io.StringIO(_contenido(response).decode('utf-8-sig'))))
+    assert len(lineas) == 1 and lineas[0][0] == 'nombre'
+
+
+@pytest.mark.django_db
+def test_export_excel_en_segundo_plano(cliente_admin, acudiente_instance, settings, tmp_path,
+                                       django_capture_on_commit_callbacks):
+    settings.MEDIA_ROOT = str(tmp_path)
+
+    with django_capture_on_commit_callbacks(execute=False):
+        response = cliente_admin.get('/acudiente/acu/export-excel/', {'formato': 'csv', 'segundo_plano': '1'})
+    assert response.status_code == 202
+    id_trabajo = response.data['id_trabajo']
+
+    procesar_trabajo(id_trabajo)
+    trabajo = TrabajoExportacion.objects.get(pk=id_trabajo)
+    assert trabajo.estado == 'listo' and trabajo.filas == 1
+
+    estado = cliente_admin.get(response.data['url_estado'])
+    assert estado.data['url_descarga'].endswith(f'/exportacion/trabajos/{id_trabajo}/descargar/')
+    descarga = cliente_admin.get(estado.data['url_descarga'])
+    assert descarga.status_code == 200
+    assert acudiente_instance.nombre_acudiente in _contenido(descarga).decode('utf-8-sig')
+
+
+@pytest.mark.django_db
+def test_procesar_exportaciones_reintenta_trabajos_abandonados(acudiente_instance, settings, tmp_path):
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.utils import timezone
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    abandonado = TrabajoExportacion.objects.create(
+        exportacion='acudientes', formato='csv', estado='procesando',
+        fecha_inicio=timezone.now() - timedelta(minutes=settings.EXPORTACION_MINUTOS_MAXIMOS + 1),
+    )
+    en_curso = TrabajoExportacion.objects.create(
+        exportacion='acudientes', formato='csv', estado='procesando', fecha_inicio=timezone.now(),
+    )
+
+    call_command('procesar_exportaciones')
+
+    abandonado.refresh_from_db()
+    en_curso.refresh_from_db()
+    assert abandonado.estado == 'listo' and abandonado.filas == 1
+    assert en_curso.estado == 'procesando'
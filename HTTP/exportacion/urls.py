@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import TrabajoExportacionViewSet
+
+router = DefaultRouter()
+router.register(r'trabajos', TrabajoExportacionViewSet, basename='trabajo-exportacion')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,49 @@
+import os
+
+from rest_framework import viewsets, status
+from rest_framework.response import Response
+from rest_framework.decorators import action
+from django.http import FileResponse
+
+#Documentacion
+from drf_yasg.utils import swagger_auto_schema
+#Modelo
+from .models import TrabajoExportacion
+#Serializadores
+from .serializers import TrabajoExportacionSerializer
+#Autenticacion
+from rest_framework.permissions import IsAuthenticated
+
+
+class TrabajoExportacionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Consulta de las exportaciones ejecutadas en segundo plano.
+
+    Cada usuario ve sus propios trabajos; los administradores ven todos.
+    """
+    serializer_class = TrabajoExportacionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = TrabajoExportacion.objects.order_by('-fecha_creacion')
+        if getattr(self.request.user, 'user_type', None) != 'administrador':
+            queryset = queryset.filter(solicitado_por=self.request.user)
+        return queryset
+
+    @swagger_auto_schema(
+        operation_summary="Descargar el archivo de una exportación",
+        operation_description="Descarga el archivo generado por un trabajo de exportación terminado"
+    )
+    @action(detail=True, methods=['get'], url_path='descargar')
+    def descargar(self, request, pk=None):
+        trabajo = self.get_object()
+        if trabajo.estado != 'listo' or not trabajo.archivo:
+            return Response(
+                {"detail": "La exportación aún no está lista.", "estado": trabajo.estado},
+                status=status.HTTP_409_CONFLICT
+            )
+        return FileResponse(
+            trabajo.archivo.open('rb'),
+            as_attachment=True,
+            filename=os.path.basename(trabajo.archivo.name),
+        )
@@ -1,3 +1,4 @@
+import json
 import os
 import django
 from django.contrib.auth import get_user_model
@@ -38,13 +39,15 @@ def verify_grading_system():
     response_list = viewset(request_list)
     
     if response_list.status_code == 200:
-        print(f"✅ ÉXITO: Listado obtenido. Total: {len(response_list.data)} estudiantes.")
-        primer_estudiante = response_list.data[0]
+        # La lista se emite en streaming (ver seguimiento_academico/lista.py)
+        estudiantes = json.loads(b''.join(response_list.streaming_content))
+        print(f"✅ ÉXITO: Listado obtenido. Total: {len(estudiantes)} estudiantes.")
+        primer_estudiante = estudiantes[0]
         id_inscripcion = primer_estudiante['id_inscripcion']
         print(f"   Ejemplo: Estudiante {primer_estudiante['estudiante_nombre']} (Inscripción ID: {id_inscripcion})")
     else:
         print(f"❌ ERROR en listado: Status {response_list.status_code}")
-        print(response_list.data)
+        print(getattr(response_list, 'data', None))
         return
 
     # 4. PROBAR CALIFICACIÓN (POST create)
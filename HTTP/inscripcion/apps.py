@@ -2,4 +2,7 @@ from django.apps import AppConfig
 
 class InscripcionConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'inscripcion'
\ No newline at end of file
+    name = 'inscripcion'
+
+    def ready(self):
+        import inscripcion.signals
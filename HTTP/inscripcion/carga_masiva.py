@@ -0,0 +1,181 @@
+"""
+Carga masiva de inscripciones (lista JSON o CSV).
+
+En lugar de validar fila por fila contra la base de datos, se resuelven en
+bloque todos los estudiantes y grupos del lote (una consulta por tabla), las
+ofertas categoría de cada módulo salen de la caché de inscripcion/ofertas.py,
+se validan las filas en memoria con las mismas reglas de
+InscripcionViewSet.create y las válidas se insertan con un único bulk_create
+dentro de una transacción.
+"""
+import csv
+import io
+
+from django.db import transaction
+from django.db.models import Q
+
+from estudiante.models import Estudiante
+from grupo.models import Grupo
+
+from . import resumen
+from .models import Inscripcion
+from .ofertas import candidatas_por_modulo, elegir_oferta_categoria
+
+VALORES_FALSOS = ('false', '0', 'no', 'f', 'n')
+LARGO_TIPO_VINCULACION = Inscripcion._meta.get_field('tipo_vinculacion').max_length
+
+
+def leer_csv(archivo):
+    """Convierte un CSV (con encabezados) en una lista de dicts con las columnas normalizadas."""
+    contenido = archivo.read()
+    if isinstance(contenido, bytes):
+        contenido = contenido.decode('utf-8-sig')
+    lector = csv.DictReader(io.StringIO(contenido))
+    filas = []
+    for fila in lector:
+        filas.append({
+            str(columna).strip().lower().replace(' ', '_'): (valor.strip() if isinstance(valor, str) else valor)
+            for columna, valor in fila.items() if columna
+        })
+    return filas
+
+
+def _texto(valor):
+    valor = str(valor).strip() if valor is not None else ''
+    if valor.endswith('.0'):
+        # Documentos/IDs exportados desde Excel como número
+        valor = valor[:-2]
+    return valor or None
+
+
+def _entero(valor):
+    valor = _texto(valor)
+    return int(valor) if valor is not None else None
+
+
+def procesar_lote(filas):
+    """
+    Valida y crea las inscripciones del lote. Cada fila acepta `id_estudiante`
+    o `numero_documento`, `id_modulo`, `tipo_vinculacion` y opcionalmente
+    `id_oferta_categoria`, `oferta_academica`, `grupo`, `terminos` y
+    `observaciones`. Retorna el resumen por fila.
+    """
+    errores = []
+    normalizadas = []
+
+    # 1. Parseo de tipos, sin consultas
+    for indice, fila in enumerate(filas, start=1):
+        try:
+            normalizadas.append({
+                'fila': indice,
+                'id_estudiante': _entero(fila.get('id_estudiante')),
+                'numero_documento': _texto(fila.get('numero_documento')),
+                'id_modulo': _entero(fila.get('id_modulo')),
+                'id_oferta_categoria': _entero(fila.get('id_oferta_categoria')),
+                'oferta_academica': _entero(fila.get('oferta_academica')),
+                'grupo': _entero(fila.get('grupo')),
+                'tipo_vinculacion': _texto(fila.get('tipo_vinculacion')),
+                'terminos': str(fila.get('terminos', True)).strip().lower() not in VALORES_FALSOS,
+                'observaciones': fila.get('observaciones') or None,
+            })
+        except (TypeError, ValueError):
+            errores.append({'fila': indice, 'error': "Los identificadores deben ser números válidos."})
+
+    # 2. Resolución en bloque de las relaciones del lote
+    estudiantes_por_id = {}
+    estudiantes_por_documento = {}
+    ids = {f['id_estudiante'] for f in normalizadas if f['id_estudiante']}
+    documentos = {f['numero_documento'] for f in normalizadas if f['numero_documento'] and not f['id_estudiante']}
+    if ids or documentos:
+        for estudiante_id, documento in Estudiante.objects.filter(
+            Q(id_estudiante__in=ids) | Q(numero_documento__in=documentos)
+        ).values_list('id_estudiante', 'numero_documento'):
+            estudiantes_por_id[estudiante_id] = estudiante_id
+            estudiantes_por_documento[documento] = estudiante_id
+
+    # Solo los módulos que no están en caché generan consultas
+    ofertas = candidatas_por_modulo({f['id_modulo'] for f in normalizadas if f['id_modulo']})
+    grupos = set(Grupo.objects.filter(
+        id__in={f['grupo'] for f in normalizadas if f['grupo']}
+    ).values_list('id', flat=True))
+
+    # 3. Validación en memoria
+    validas = []
+    for fila in normalizadas:
+        if fila['id_estudiante']:
+            estudiante_id = estudiantes_por_id.get(fila['id_estudiante'])
+        else:
+            estudiante_id = estudiantes_por_documento.get(fila['numero_documento'])
+
+        error = None
+        oferta_categoria = None
+        if not fila['id_estudiante'] and not fila['numero_documento']:
+            error = "id_estudiante o numero_documento es requerido."
+        elif not estudiante_id:
+            error = "El estudiante no existe."
+        elif not fila['id_modulo']:
+            error = "id_modulo es requerido."
+        elif fila['id_modulo'] not in ofertas:
+            error = "El módulo no existe."
+        elif not fila['tipo_vinculacion']:
+            error = "tipo_vinculacion es requerido."
+        elif len(fila['tipo_vinculacion']) > LARGO_TIPO_VINCULACION:
+            error = f"tipo_vinculacion no puede tener más de {LARGO_TIPO_VINCULACION} caracteres."
+        elif fila['grupo'] and fila['grupo'] not in grupos:
+            error = "El grupo no existe."
+        else:
+            oferta_categoria, error = elegir_oferta_categoria(
+                ofertas[fila['id_modulo']],
+                fila['id_oferta_categoria'],
+                fila['oferta_academica'],
+            )
+        if error:
+            errores.append({'fila': fila['fila'], 'error': error})
+            continue
+        validas.append((fila, estudiante_id, oferta_categoria))
+
+    # 4. Duplicados: dentro del lote y contra las inscripciones existentes (una consulta)
+    existentes = set(Inscripcion.objects.filter(
+        id_estudiante__in={estudiante_id for _, estudiante_id, _ in validas},
+        id_modulo__in={fila['id_modulo'] for fila, _, _ in validas},
+    ).values_list('id_estudiante_id', 'id_modulo_id', 'id_oferta_categoria_id'))
+
+    nuevas = []
+    for fila, estudiante_id, oferta_categoria in validas:
+        clave = (estudiante_id, fila['id_modulo'], oferta_categoria.id_oferta_categoria)
+        if clave in existentes:
+            errores.append({'fila': fila['fila'], 'error': "El estudiante ya está inscrito en este módulo y oferta."})
+            continue
+        existentes.add(clave)
+        nuevas.append((fila, Inscripcion(
+            id_estudiante_id=estudiante_id,
+            id_modulo_id=fila['id_modulo'],
+            id_oferta_categoria_id=oferta_categoria.id_oferta_categoria,
+            oferta_academica_id=oferta_categoria.id_oferta_academica,
+            grupo_id=fila['grupo'],
+            tipo_vinculacion=fila['tipo_vinculacion'],
+            terminos=fila['terminos'],
+            observaciones=fila['observaciones'],
+            # Igual que en create: la constancia siempre se marca como verificada
+            verificacion_constancia=True,
+        )))
+
+    # 5. Inserción en bloque. bulk_create no dispara señales, así que el
+    # resumen del dashboard se actualiza explícitamente.
+    with transaction.atomic():
+        creadas = Inscripcion.objects.bulk_create([inscripcion for _, inscripcion in nuevas], batch_size=500)
+        if creadas:
+            resumen.aplicar_deltas(sumar=resumen.dimensiones_de(
+                Inscripcion.objects.filter(pk__in=[inscripcion.pk for inscripcion in creadas])
+            ))
+
+    return {
+        'total_filas': len(filas),
+        'creadas': len(creadas),
+        'errores': len(errores),
+        'detalle_exito': [
+            {'fila': fila['fila'], 'id_inscripcion': inscripcion.id_inscripcion}
+            for fila, inscripcion in nuevas
+        ],
+        'detalle_errores': sorted(errores, key=lambda error: error['fila']),
+    }
@@ -0,0 +1,100 @@
+"""
+Regla de estado de una inscripción (No revisado / Pendiente / Revisado).
+
+La regla se expresa como un CASE de SQL sobre las columnas de archivos y
+verificaciones de la inscripción y la verificación de información del
+estudiante, de modo que recalcular cualquier conjunto de inscripciones es un
+único UPDATE por estado nuevo (solo sobre las filas cuyo estado cambia). Como
+update() no pasa por auditlog, cada cambio de estado se registra
+explícitamente en el log de auditoría.
+
+- Con archivos subidos: Revisado si todos los documentos presentes están
+  verificados y el estudiante también; Pendiente si alguno de ellos (o el
+  estudiante) lo está; No revisado en otro caso.
+- Sin archivos: depende de las verificaciones manuales (pago, certificado y
+  recibo de servicio; la constancia siempre se fuerza a verificada).
+"""
+from auditlog.models import LogEntry
+from django.db import transaction
+from django.db.models import Case, Exists, OuterRef, Q, Value, When
+
+from estudiante.models import Estudiante
+
+from .models import Inscripcion
+
+REVISADO = "Revisado"
+PENDIENTE = "Pendiente"
+NO_REVISADO = "No revisado"
+
+# Archivo -> campo de verificación correspondiente
+DOCUMENTOS = {
+    'recibo_pago': 'verificacion_recibo_pago',
+    'constancia': 'verificacion_constancia',
+    'certificado': 'verificacion_certificado',
+    'recibo_servicio': 'verificacion_recibo_servicio',
+}
+VERIFICACIONES_MANUALES = ('verificacion_recibo_pago', 'verificacion_certificado', 'verificacion_recibo_servicio')
+
+# Campos que, al cambiar, pueden cambiar el estado
+CAMPOS_ESTADO = set(DOCUMENTOS) | set(DOCUMENTOS.values())
+
+
+def _tiene_archivo(campo):
+    return Q(**{f'{campo}__isnull': False}) & ~Q(**{campo: ''})
+
+
+def expresion_estado():
+    """Expresión CASE que calcula el estado de cada inscripción."""
+    # Subconsulta correlacionada: UPDATE no admite referencias a campos de otra tabla
+    estudiante_verificado = Exists(Estudiante.objects.filter(
+        id_estudiante=OuterRef('id_estudiante'), verificacion_informacion=True
+    ))
+
+    tiene_archivos = Q()
+    todos_verificados = Q()
+    alguno_verificado = Q()
+    for archivo, verificacion in DOCUMENTOS.items():
+        tiene_archivos |= _tiene_archivo(archivo)
+        todos_verificados &= ~_tiene_archivo(archivo) | Q(**{verificacion: True})
+        alguno_verificado |= _tiene_archivo(archivo) & Q(**{verificacion: True})
+
+    verificacion_manual = Q()
+    for verificacion in VERIFICACIONES_MANUALES:
+        verificacion_manual |= Q(**{verificacion: True})
+
+    return Case(
+        When(tiene_archivos & todos_verificados & estudiante_verificado, then=Value(REVISADO)),
+        When(tiene_archivos & (alguno_verificado | estudiante_verificado), then=Value(PENDIENTE)),
+        When(tiene_archivos, then=Value(NO_REVISADO)),
+        When(verificacion_manual & estudiante_verificado, then=Value(REVISADO)),
+        When(verificacion_manual, then=Value(PENDIENTE)),
+        default=Value(NO_REVISADO),
+    )
+
+
+def recalcular_estados(queryset=None):
+    """
+    Recalcula el estado de las inscripciones del queryset (todas por defecto)
+    con un UPDATE por estado nuevo y registra cada cambio en auditlog.
+    Retorna el número de inscripciones cuyo estado cambió.
+    """
+    if queryset is None:
+        queryset = Inscripcion.objects.all()
+    estado = expresion_estado()
+    with transaction.atomic():
+        cambiadas = list(
+            queryset.exclude(estado=estado).annotate(nuevo_estado=estado)
+            .select_related('id_estudiante', 'id_modulo', 'grupo')
+        )
+        por_estado = {}
+        for inscripcion in cambiadas:
+            por_estado.setdefault(inscripcion.nuevo_estado, []).append(inscripcion.pk)
+        for nuevo, pks in por_estado.items():
+            Inscripcion.objects.filter(pk__in=pks).update(estado=nuevo)
+        for inscripcion in cambiadas:
+            LogEntry.objects.log_create(
+                inscripcion,
+                action=LogEntry.Action.UPDATE,
+                changes={'estado': [inscripcion.estado, inscripcion.nuevo_estado]},
+            )
+    return len(cambiadas)
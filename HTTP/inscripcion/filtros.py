@@ -0,0 +1,51 @@
+import django_filters
+from django.db.models.functions import Lower
+
+from .models import Inscripcion
+
+
+class InscripcionFilter(django_filters.FilterSet):
+    """
+    Filtros de inscripciones para el listado y las acciones de filtro.
+
+    Cada filtro corresponde a un índice de Inscripcion (o Estudiante). Los
+    filtros insensibles a mayúsculas comparan LOWER(columna) con el valor en
+    minúsculas, para usar los índices funcionales en lugar de UPPER() de iexact.
+    """
+    estado = django_filters.CharFilter(field_name='estado')
+    tipo_vinculacion = django_filters.CharFilter(method='filtrar_tipo_vinculacion')
+    grupo = django_filters.CharFilter(method='filtrar_grupo')
+    id_modulo = django_filters.NumberFilter(field_name='id_modulo')
+    oferta_academica = django_filters.NumberFilter(field_name='oferta_academica')
+    id_estudiante = django_filters.NumberFilter(field_name='id_estudiante')
+    numero_documento = django_filters.CharFilter(method='filtrar_numero_documento')
+    estamento = django_filters.CharFilter(method='filtrar_estamento')
+    area = django_filters.NumberFilter(field_name='id_modulo__id_area')
+
+    class Meta:
+        model = Inscripcion
+        fields = [
+            'estado', 'tipo_vinculacion', 'grupo', 'id_modulo', 'oferta_academica',
+            'id_estudiante', 'numero_documento', 'estamento', 'area',
+        ]
+
+    def filtrar_tipo_vinculacion(self, queryset, name, value):
+        return queryset.alias(tipo_vinculacion_lower=Lower('tipo_vinculacion')).filter(
+            tipo_vinculacion_lower=value.lower()
+        )
+
+    def filtrar_estamento(self, queryset, name, value):
+        return queryset.alias(estamento_lower=Lower('id_estudiante__estamento')).filter(
+            estamento_lower=value.lower()
+        )
+
+    def filtrar_grupo(self, queryset, name, value):
+        if value.lower() in ('null', 'none'):
+            return queryset.filter(grupo__isnull=True)
+        try:
+            return queryset.filter(grupo_id=int(value))
+        except ValueError:
+            return queryset.none()
+
+    def filtrar_numero_documento(self, queryset, name, value):
+        return queryset.filter(id_estudiante__numero_documento=value.strip())
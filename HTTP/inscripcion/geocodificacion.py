@@ -0,0 +1,206 @@
+"""
+Geocodificación de direcciones de residencia con caché persistente.
+
+El endpoint inscripcion/geocodificacion solo lee DireccionGeocodificada; las
+llamadas al servicio externo se hacen fuera de la petición con el comando
+`geocodificar_direcciones`, respetando un límite de peticiones por segundo y
+reintentando los errores transitorios.
+
+El backend es configurable con el setting GEOCODIFICADOR_BACKEND (ruta a una
+clase con un método `geocodificar(direccion) -> (latitud, longitud) | None`).
+`GeocodificadorLocal` sirve como reemplazo sin red para pruebas y desarrollo.
+"""
+import hashlib
+import re
+import time
+import unicodedata
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from geopy.exc import GeocoderServiceError, GeocoderTimedOut
+from geopy.geocoders import Nominatim
+
+from .models import DireccionGeocodificada, Inscripcion
+
+CAMPOS_DIRECCION = (
+    'direccion_residencia',
+    'comuna_residencia',
+    'ciudad_residencia',
+    'departamento_residencia',
+)
+
+BACKEND_POR_DEFECTO = 'inscripcion.geocodificacion.GeocodificadorNominatim'
+MAX_INTENTOS = 3
+
+
+class GeocodificadorNominatim:
+    """Backend real sobre Nominatim (OpenStreetMap). Su política exige máximo 1 petición por segundo."""
+    pausa = 1.0
+
+    def __init__(self, timeout=10):
+        self.timeout = timeout
+        self.geolocator = Nominatim(user_agent="semillero_estudiantes_v1")
+
+    def geocodificar(self, direccion):
+        location = self.geolocator.geocode(direccion, timeout=self.timeout)
+        if location:
+            return location.latitude, location.longitude
+        return None
+
+
+class GeocodificadorLocal:
+    """
+    Backend sin red: busca la dirección en un diccionario {direccion: (lat, lon)}
+    y retorna None para las demás.
+    """
+    pausa = 0
+
+    def __init__(self, coordenadas=None):
+        self.coordenadas = coordenadas or {}
+        self.consultas = []
+
+    def geocodificar(self, direccion):
+        self.consultas.append(direccion)
+        return self.coordenadas.get(direccion)
+
+
+def obtener_geocodificador():
+    backend = getattr(settings, 'GEOCODIFICADOR_BACKEND', BACKEND_POR_DEFECTO)
+    return import_string(backend)()
+
+
+def texto_direccion(datos):
+    """Dirección completa tal como se envía al geocodificador."""
+    return ", ".join(str(datos.get(campo) or '') for campo in CAMPOS_DIRECCION)
+
+
+def normalizar_direccion(datos):
+    """Minúsculas, sin tildes ni signos y con espacios simples, para que variaciones triviales compartan caché."""
+    partes = []
+    for campo in CAMPOS_DIRECCION:
+        valor = unicodedata.normalize('NFKD', str(datos.get(campo) or ''))
+        valor = ''.join(c for c in valor if not unicodedata.combining(c)).lower()
+        valor = re.sub(r'[^a-z0-9#]+', ' ', valor).strip()
+        partes.append(valor)
+    return '|'.join(partes)
+
+
+def hash_direccion(datos):
+    return hashlib.sha1(normalizar_direccion(datos).encode('utf-8')).hexdigest()
+
+
+def direcciones_pendientes(max_intentos=MAX_INTENTOS):
+    """
+    Direcciones de estudiantes inscritos que no tienen entrada en la caché o
+    cuya última geocodificación falló por un error transitorio.
+    Retorna {hash: texto_direccion}.
+    """
+    direcciones = {}
+    for datos in Inscripcion.objects.order_by().values(
+        *(f'id_estudiante__{campo}' for campo in CAMPOS_DIRECCION)
+    ).distinct():
+        datos = {campo: datos[f'id_estudiante__{campo}'] for campo in CAMPOS_DIRECCION}
+        direcciones.setdefault(hash_direccion(datos), texto_direccion(datos))
+
+    resueltas = DireccionGeocodificada.objects.filter(hash_direccion__in=list(direcciones)).exclude(
+        estado=DireccionGeocodificada.ESTADO_ERROR, intentos__lt=max_intentos
+    ).values_list('hash_direccion', flat=True)
+    for clave in resueltas:
+        direcciones.pop(clave, None)
+    return direcciones
+
+
+def _geocodificar_con_reintentos(geocodificador, direccion, reintentos, espera):
+    for intento in range(reintentos + 1):
+        try:
+            return geocodificador.geocodificar(direccion)
+        except (GeocoderTimedOut, GeocoderServiceError):
+            if intento == reintentos:
+                raise
+            time.sleep(espera * (2 ** intento))
+
+
+def geocodificar_pendientes(geocodificador=None, limite=None, reintentos=2, espera=2.0, pausa=None):
+    """
+    Geocodifica las direcciones pendientes y guarda el resultado en la caché.
+    `pausa` (segundos entre peticiones) por defecto es la del backend.
+    Retorna un dict con el conteo por estado.
+    """
+    geocodificador = geocodificador or obtener_geocodificador()
+    pausa = getattr(geocodificador, 'pausa', 0) if pausa is None else pausa
+    pendientes = list(direcciones_pendientes().items())
+    if limite:
+        pendientes = pendientes[:limite]
+
+    conteo = {estado: 0 for estado, _ in DireccionGeocodificada.ESTADOS}
+    for indice, (clave, direccion) in enumerate(pendientes):
+        if indice and pausa:
+            time.sleep(pausa)
+        latitud = longitud = None
+        try:
+            coordenadas = _geocodificar_con_reintentos(geocodificador, direccion, reintentos, espera)
+            if coordenadas:
+                latitud, longitud = coordenadas
+                estado = DireccionGeocodificada.ESTADO_ENCONTRADA
+            else:
+                estado = DireccionGeocodificada.ESTADO_NO_ENCONTRADA
+        except (GeocoderTimedOut, GeocoderServiceError) as e:
+            print(f"Error geocodificando '{direccion}': {e}")
+            estado = DireccionGeocodificada.ESTADO_ERROR
+
+        entrada, _ = DireccionGeocodificada.objects.get_or_create(
+            hash_direccion=clave,
+            defaults={'direccion_texto': direccion, 'estado': estado},
+        )
+        entrada.direccion_texto = direccion
+        entrada.latitud = latitud
+        entrada.longitud = longitud
+        entrada.estado = estado
+        entrada.intentos = entrada.intentos + 1 if estado == DireccionGeocodificada.ESTADO_ERROR else 0
+        entrada.save()
+        conteo[estado] += 1
+    return conteo
+
+
+def coordenadas_inscripciones(queryset):
+    """
+    Coordenadas en caché para cada inscripción del queryset (dos consultas en
+    total) y la cobertura de la caché sobre esas inscripciones.
+    """
+    filas = list(queryset.order_by('id_inscripcion').values(
+        'id_estudiante', 'id_estudiante__nombre', 'id_estudiante__apellido',
+        *(f'id_estudiante__{campo}' for campo in CAMPOS_DIRECCION)
+    ))
+    for fila in filas:
+        datos = {campo: fila[f'id_estudiante__{campo}'] for campo in CAMPOS_DIRECCION}
+        fila['direccion_texto'] = texto_direccion(datos)
+        fila['hash_direccion'] = hash_direccion(datos)
+
+    cache = {
+        entrada.hash_direccion: entrada
+        for entrada in DireccionGeocodificada.objects.filter(
+            hash_direccion__in={fila['hash_direccion'] for fila in filas}
+        )
+    }
+
+    resultados = []
+    cobertura = {'total': len(filas), 'encontradas': 0, 'no_encontradas': 0, 'pendientes': 0}
+    for fila in filas:
+        entrada = cache.get(fila['hash_direccion'])
+        encontrado = bool(entrada and entrada.estado == DireccionGeocodificada.ESTADO_ENCONTRADA)
+        if encontrado:
+            cobertura['encontradas'] += 1
+        elif entrada and entrada.estado == DireccionGeocodificada.ESTADO_NO_ENCONTRADA:
+            cobertura['no_encontradas'] += 1
+        else:
+            cobertura['pendientes'] += 1
+        resultados.append({
+            "id": fila['id_estudiante'],
+            "nombre_completo": f"{fila['id_estudiante__nombre']} {fila['id_estudiante__apellido']}",
+            "direccion_texto": fila['direccion_texto'],
+            "latitud": entrada.latitud if encontrado else None,
+            "longitud": entrada.longitud if encontrado else None,
+            "encontrado": encontrado,
+        })
+    cobertura['porcentaje'] = round(cobertura['encontradas'] * 100 / cobertura['total'], 2) if filas else 0
+    return resultados, cobertura
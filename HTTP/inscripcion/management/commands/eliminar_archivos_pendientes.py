@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from inscripcion.subidas import procesar_eliminaciones
+
+
+class Command(BaseCommand):
+    help = "Borra del almacenamiento los archivos reemplazados que quedaron en cola"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=500,
+                            help="Máximo de archivos a procesar en esta ejecución")
+
+    def handle(self, *args, **options):
+        eliminados = procesar_eliminaciones(limite=options['limite'])
+        self.stdout.write(self.style.SUCCESS(f"Archivos eliminados: {eliminados}."))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from inscripcion.geocodificacion import geocodificar_pendientes
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocodifica las direcciones de residencia que aún no están en la caché "
+        "(o que fallaron por errores transitorios). Pensado para ejecutarse periódicamente."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limite', type=int, default=None,
+                            help="Máximo de direcciones a geocodificar en esta ejecución")
+        parser.add_argument('--pausa', type=float, default=None,
+                            help="Segundos entre peticiones (por defecto, los del backend)")
+        parser.add_argument('--reintentos', type=int, default=2,
+                            help="Reintentos por dirección ante timeouts o errores del servicio")
+
+    def handle(self, *args, **options):
+        conteo = geocodificar_pendientes(
+            limite=options['limite'],
+            pausa=options['pausa'],
+            reintentos=options['reintentos'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Geocodificación terminada: {conteo['encontrada']} encontradas, "
+            f"{conteo['no_encontrada']} no encontradas, {conteo['error']} con error."
+        ))
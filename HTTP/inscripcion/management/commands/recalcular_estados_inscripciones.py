@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from inscripcion.estados import recalcular_estados
+from inscripcion.models import Inscripcion
+
+
+class Command(BaseCommand):
+    help = "Recalcula en bloque el estado (No revisado/Pendiente/Revisado) de las inscripciones"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--periodo', type=int, default=None,
+                            help="ID de la oferta académica a recalcular (por defecto todas)")
+
+    def handle(self, *args, **options):
+        queryset = Inscripcion.objects.all()
+        if options['periodo']:
+            queryset = queryset.filter(
+                Q(oferta_academica_id=options['periodo'])
+                | Q(id_oferta_categoria__id_oferta_academica_id=options['periodo'])
+            )
+        actualizadas = recalcular_estados(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Estados recalculados. {actualizadas} inscripciones actualizadas."))
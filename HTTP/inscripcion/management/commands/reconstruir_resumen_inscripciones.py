@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from inscripcion.resumen import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = "Reconstruye desde cero la tabla pre-agregada del dashboard de inscripciones"
+
+    def handle(self, *args, **options):
+        filas = reconstruir_resumen()
+        self.stdout.write(self.style.SUCCESS(f"Resumen de inscripciones reconstruido: {filas} filas."))
@@ -0,0 +1,84 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:06
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copia de inscripcion.resumen al crear la tabla (las migraciones no importan código vivo)
+DIMENSIONES = {
+    'oferta_academica_id': 'oferta_academica_id',
+    'id_modulo_id': 'id_modulo_id',
+    'id_area_id': 'id_modulo__id_area_id',
+    'tipo_vinculacion': 'tipo_vinculacion',
+    'estamento': 'id_estudiante__estamento',
+    'genero': 'id_estudiante__genero',
+    'grado': 'id_estudiante__grado',
+    'estrato': 'id_estudiante__estrato',
+    'ciudad_residencia': 'id_estudiante__ciudad_residencia',
+}
+
+
+def clave_resumen(dimensiones):
+    valores = [dimensiones.get(dimension) for dimension in DIMENSIONES]
+    return hashlib.sha1(json.dumps(valores, default=str).encode('utf-8')).hexdigest()
+
+
+def poblar_resumen(apps, schema_editor):
+    from django.db.models import Count
+
+    Inscripcion = apps.get_model('inscripcion', 'Inscripcion')
+    ResumenInscripcion = apps.get_model('inscripcion', 'ResumenInscripcion')
+    filas = []
+    for grupo in Inscripcion.objects.order_by().values(*DIMENSIONES.values()).annotate(cantidad=Count('pk')):
+        dimensiones = {dimension: grupo[lookup] for dimension, lookup in DIMENSIONES.items()}
+        vinculacion = dimensiones['tipo_vinculacion']
+        estamento = dimensiones['estamento']
+        filas.append(ResumenInscripcion(
+            clave=clave_resumen(dimensiones),
+            cantidad=grupo['cantidad'],
+            vinculacion_clave=vinculacion.lower() if vinculacion is not None else None,
+            estamento_clave=estamento.lower() if estamento is not None else None,
+            **dimensiones,
+        ))
+    ResumenInscripcion.objects.bulk_create(filas, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('area', '0001_initial'),
+        ('estudiante', '0002_estudiante_estrato'),
+        ('inscripcion', '0005_inscripcion_certificado_academico'),
+        ('modulo', '0001_initial'),
+        ('oferta_academica', '0002_alter_ofertaacademica_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenInscripcion',
+            fields=[
+                ('id_resumen', models.AutoField(primary_key=True, serialize=False)),
+                ('clave', models.CharField(max_length=40, unique=True)),
+                ('tipo_vinculacion', models.CharField(max_length=255, null=True)),
+                ('estamento', models.CharField(max_length=50, null=True)),
+                ('vinculacion_clave', models.CharField(max_length=255, null=True)),
+                ('estamento_clave', models.CharField(max_length=50, null=True)),
+                ('genero', models.CharField(max_length=10, null=True)),
+                ('grado', models.CharField(max_length=20, null=True)),
+                ('estrato', models.CharField(max_length=20, null=True)),
+                ('ciudad_residencia', models.CharField(max_length=100, null=True)),
+                ('cantidad', models.IntegerField(default=0)),
+                ('id_area', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='area.area')),
+                ('id_modulo', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='modulo.modulo')),
+                ('oferta_academica', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='oferta_academica.ofertaacademica')),
+            ],
+            options={
+                'verbose_name': 'Resumen de inscripciones',
+                'verbose_name_plural': 'Resumen de inscripciones',
+                'indexes': [models.Index(fields=['oferta_academica', 'id_modulo', 'id_area'], name='resumen_periodo_modulo_idx'), models.Index(fields=['oferta_academica', 'vinculacion_clave', 'estamento_clave'], name='resumen_periodo_vinc_idx')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscripcion', '0006_resumeninscripcion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DireccionGeocodificada',
+            fields=[
+                ('id_direccion', models.AutoField(primary_key=True, serialize=False)),
+                ('hash_direccion', models.CharField(max_length=40, unique=True)),
+                ('direccion_texto', models.CharField(max_length=500)),
+                ('latitud', models.FloatField(blank=True, null=True)),
+                ('longitud', models.FloatField(blank=True, null=True)),
+                ('estado', models.CharField(choices=[('encontrada', 'Encontrada'), ('no_encontrada', 'No encontrada'), ('error', 'Error')], max_length=20)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Dirección geocodificada',
+                'verbose_name_plural': 'Direcciones geocodificadas',
+            },
+        ),
+    ]
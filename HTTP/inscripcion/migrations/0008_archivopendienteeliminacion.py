@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscripcion', '0007_direcciongeocodificada'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivoPendienteEliminacion',
+            fields=[
+                ('id_archivo', models.AutoField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=500)),
+                ('intentos', models.PositiveSmallIntegerField(default=0)),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archivo pendiente de eliminación',
+                'verbose_name_plural': 'Archivos pendientes de eliminación',
+            },
+        ),
+    ]
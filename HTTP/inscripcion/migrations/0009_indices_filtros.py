@@ -0,0 +1,40 @@
+# Generated by Django 5.0.14 on 2026-10-18 16:27
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auditlog', '0017_add_actor_email'),
+        ('estudiante', '0003_indices_filtros'),
+        ('grupo', '0005_grupo_oferta_academica_alter_grupo_monitor_academico_and_more'),
+        ('inscripcion', '0008_archivopendienteeliminacion'),
+        ('modulo', '0001_initial'),
+        ('oferta_academica', '0002_alter_ofertaacademica_options_and_more'),
+        ('oferta_categoria', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['oferta_academica', 'estado'], name='inscripcion_periodo_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['estado', 'id_inscripcion'], name='inscripcion_estado_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['grupo', 'id_inscripcion'], name='inscripcion_grupo_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(fields=['id_modulo', 'oferta_academica'], name='inscripcion_modulo_periodo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='inscripcion',
+            index=models.Index(django.db.models.functions.text.Lower('tipo_vinculacion'), name='inscripcion_vinc_lower_idx'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from estudiante.models import Estudiante
 from modulo.models import Modulo
 from oferta_categoria.models import OfertaCategoria
@@ -124,5 +125,112 @@ class Inscripcion(models.Model):
         verbose_name = 'Inscripción'
         verbose_name_plural = 'Inscripciones'
         ordering = ['fecha_inscripcion']
+        # Índices de los patrones de consulta de InscripcionFilter (ver inscripcion/filtros.py)
+        indexes = [
+            models.Index(fields=['oferta_academica', 'estado'], name='inscripcion_periodo_estado_idx'),
+            models.Index(fields=['estado', 'id_inscripcion'], name='inscripcion_estado_id_idx'),
+            models.Index(fields=['grupo', 'id_inscripcion'], name='inscripcion_grupo_id_idx'),
+            models.Index(fields=['id_modulo', 'oferta_academica'], name='inscripcion_modulo_periodo_idx'),
+            # Filtros insensibles a mayúsculas: se consultan como LOWER(tipo_vinculacion) = valor
+            models.Index(Lower('tipo_vinculacion'), name='inscripcion_vinc_lower_idx'),
+        ]
 
 auditlog.register(Inscripcion)
+
+
+class ResumenInscripcion(models.Model):
+    """
+    Tabla de hechos pre-agregada para el dashboard de inscripciones.
+
+    Cada fila cuenta las inscripciones que comparten la misma combinación de
+    periodo, módulo, área, vinculación y datos demográficos del estudiante.
+    Se mantiene de forma incremental desde las señales de Inscripcion,
+    Estudiante y Modulo (ver inscripcion/resumen.py) y se puede reconstruir
+    con el comando `reconstruir_resumen_inscripciones`.
+    """
+    id_resumen = models.AutoField(primary_key=True)
+    # Hash de la combinación de dimensiones, usado para el upsert incremental
+    clave = models.CharField(max_length=40, unique=True)
+
+    oferta_academica = models.ForeignKey(OfertaAcademica, on_delete=models.SET_NULL, null=True, related_name='+')
+    id_modulo = models.ForeignKey(Modulo, on_delete=models.SET_NULL, null=True, related_name='+')
+    id_area = models.ForeignKey('area.Area', on_delete=models.SET_NULL, null=True, related_name='+')
+    tipo_vinculacion = models.CharField(max_length=255, null=True)
+    estamento = models.CharField(max_length=50, null=True)
+    # Versiones en minúscula para los filtros insensibles a mayúsculas del dashboard
+    vinculacion_clave = models.CharField(max_length=255, null=True)
+    estamento_clave = models.CharField(max_length=50, null=True)
+
+    genero = models.CharField(max_length=10, null=True)
+    grado = models.CharField(max_length=20, null=True)
+    estrato = models.CharField(max_length=20, null=True)
+    ciudad_residencia = models.CharField(max_length=100, null=True)
+
+    cantidad = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"Resumen {self.clave} | Cantidad: {self.cantidad}"
+
+    class Meta:
+        verbose_name = 'Resumen de inscripciones'
+        verbose_name_plural = 'Resumen de inscripciones'
+        indexes = [
+            models.Index(fields=['oferta_academica', 'id_modulo', 'id_area'], name='resumen_periodo_modulo_idx'),
+            models.Index(fields=['oferta_academica', 'vinculacion_clave', 'estamento_clave'], name='resumen_periodo_vinc_idx'),
+        ]
+
+
+class DireccionGeocodificada(models.Model):
+    """
+    Caché persistente de coordenadas por dirección de residencia normalizada.
+
+    La clave es un hash de dirección/comuna/ciudad/departamento normalizados,
+    de modo que un estudiante que cambia de dirección simplemente apunta a otra
+    fila pendiente. El comando `geocodificar_direcciones` llena las faltantes
+    (ver inscripcion/geocodificacion.py).
+    """
+    ESTADO_ENCONTRADA = 'encontrada'
+    ESTADO_NO_ENCONTRADA = 'no_encontrada'
+    ESTADO_ERROR = 'error'
+    ESTADOS = [
+        (ESTADO_ENCONTRADA, 'Encontrada'),
+        (ESTADO_NO_ENCONTRADA, 'No encontrada'),
+        (ESTADO_ERROR, 'Error'),
+    ]
+
+    id_direccion = models.AutoField(primary_key=True)
+    hash_direccion = models.CharField(max_length=40, unique=True)
+    direccion_texto = models.CharField(max_length=500)
+    latitud = models.FloatField(null=True, blank=True)
+    longitud = models.FloatField(null=True, blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.direccion_texto} | {self.estado}"
+
+    class Meta:
+        verbose_name = 'Dirección geocodificada'
+        verbose_name_plural = 'Direcciones geocodificadas'
+
+
+class ArchivoPendienteEliminacion(models.Model):
+    """
+    Cola de archivos reemplazados que deben borrarse del almacenamiento.
+
+    Las vistas solo encolan el nombre; el borrado real se hace fuera de la
+    petición (hilo al confirmar la transacción o el comando
+    `eliminar_archivos_pendientes`), ver inscripcion/subidas.py.
+    """
+    id_archivo = models.AutoField(primary_key=True)
+    nombre = models.CharField(max_length=500)
+    intentos = models.PositiveSmallIntegerField(default=0)
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.nombre} | Intentos: {self.intentos}"
+
+    class Meta:
+        verbose_name = 'Archivo pendiente de eliminación'
+        verbose_name_plural = 'Archivos pendientes de eliminación'
@@ -0,0 +1,131 @@
+"""
+Resolución en caché de la oferta categoría de una inscripción.
+
+Por cada módulo se precalcula la lista ordenada de sus ofertas categoría
+candidatas junto con el estado de su oferta académica, y se guarda en la
+caché de Django. Las ofertas cambian pocas veces por semestre, así que en el
+flujo de inscripción la resolución no hace consultas. Las señales de
+inscripcion/signals.py invalidan la caché (incrementando su versión) cuando
+cambia una OfertaCategoria, una OfertaAcademica o la relación Modulo-OfertaCategoria.
+"""
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from modulo.models import Modulo
+
+OfertaCandidata = namedtuple(
+    'OfertaCandidata',
+    ['id_oferta_categoria', 'estado', 'id_oferta_academica', 'estado_oferta_academica'],
+)
+
+ESTADOS_OFERTA_ACTIVA = ('inscripcion', 'desarrollo')
+
+CLAVE_VERSION = 'inscripcion:ofertas_modulo:version'
+# Con la caché local (un proceso por worker) la invalidación solo llega al
+# proceso que hizo el cambio; el TTL acota cuánto puede durar un dato viejo.
+TTL_CANDIDATAS = 60 * 10
+
+
+def _version():
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, 1, timeout=None)
+        version = cache.get(CLAVE_VERSION, 1)
+    return version
+
+
+def _clave(modulo_id, version):
+    return f'inscripcion:ofertas_modulo:{version}:{modulo_id}'
+
+
+def invalidar_candidatas():
+    """Invalida las candidatas de todos los módulos."""
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        cache.add(CLAVE_VERSION, 2, timeout=None)
+
+
+def _cargar_candidatas(modulo_ids):
+    """Carga desde la base de datos las candidatas de los módulos dados (dos consultas)."""
+    candidatas = {modulo_id: [] for modulo_id in Modulo.objects.filter(
+        id_modulo__in=modulo_ids
+    ).values_list('id_modulo', flat=True)}
+    if not candidatas:
+        return candidatas
+
+    relaciones = Modulo.id_oferta_categoria.through.objects.filter(
+        modulo_id__in=list(candidatas)
+    ).order_by('ofertacategoria_id').values_list(
+        'modulo_id',
+        'ofertacategoria_id',
+        'ofertacategoria__estado',
+        'ofertacategoria__id_oferta_academica_id',
+        'ofertacategoria__id_oferta_academica__estado',
+    )
+    for modulo_id, *datos in relaciones:
+        candidatas[modulo_id].append(OfertaCandidata(*datos))
+    return candidatas
+
+
+def candidatas_por_modulo(modulo_ids):
+    """
+    {id_modulo: [OfertaCandidata ordenadas por id]} para los módulos dados.
+    Los módulos inexistentes no aparecen en el resultado. Solo consulta la base
+    de datos para los módulos que no están en caché.
+    """
+    modulo_ids = set(modulo_ids)
+    if not modulo_ids:
+        return {}
+    version = _version()
+    claves = {_clave(modulo_id, version): modulo_id for modulo_id in modulo_ids}
+    encontradas = {claves[clave]: valor for clave, valor in cache.get_many(list(claves)).items()}
+
+    faltantes = modulo_ids - set(encontradas)
+    if faltantes:
+        cargadas = _cargar_candidatas(faltantes)
+        cache.set_many(
+            {_clave(modulo_id, version): valor for modulo_id, valor in cargadas.items()},
+            timeout=TTL_CANDIDATAS,
+        )
+        encontradas.update(cargadas)
+    return encontradas
+
+
+def candidatas_modulo(modulo_id):
+    """Candidatas de un módulo, o None si el módulo no existe."""
+    return candidatas_por_modulo([modulo_id]).get(modulo_id)
+
+
+def elegir_oferta_categoria(candidatas, oferta_categoria_id=None, oferta_academica_id=None):
+    """
+    Elige la oferta categoría de una inscripción entre las candidatas del módulo:
+
+    - Si se envía `id_oferta_categoria` debe estar asociada al módulo.
+    - Si se envía `oferta_academica` se prefieren las ofertas de ese periodo, luego
+      las activas en inscripción, luego las activas y por último cualquiera.
+    - Si no se envía nada se toma la primera asociada al módulo.
+
+    Retorna (OfertaCandidata, error).
+    """
+    if oferta_categoria_id:
+        oferta = next((c for c in candidatas if c.id_oferta_categoria == oferta_categoria_id), None)
+        if not oferta:
+            return None, "La oferta categoría enviada no existe o no está asociada al módulo."
+    elif oferta_academica_id:
+        opciones = (
+            [c for c in candidatas if c.id_oferta_academica == oferta_academica_id]
+            or [c for c in candidatas if c.estado and c.estado_oferta_academica == 'inscripcion']
+            or [c for c in candidatas if c.estado]
+            or candidatas
+        )
+        oferta = opciones[0] if opciones else None
+    else:
+        oferta = candidatas[0] if candidatas else None
+
+    if not oferta:
+        return None, "El módulo no tiene una oferta de categoría asociada."
+    if not (oferta.estado or oferta.estado_oferta_academica in ESTADOS_OFERTA_ACTIVA):
+        return None, "La oferta categoria o academica no esta activa"
+    return oferta, None
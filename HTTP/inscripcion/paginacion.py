@@ -0,0 +1,19 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InscripcionCursorPagination(CursorPagination):
+    """
+    Paginación por cursor (keyset) sobre id_inscripcion.
+
+    Es opcional para no romper a los clientes que esperan la lista completa:
+    solo se pagina cuando la petición trae `cursor` o `page_size`.
+    """
+    ordering = 'id_inscripcion'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param not in request.query_params and self.page_size_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,198 @@
+"""
+Mantenimiento y consulta de la tabla pre-agregada ResumenInscripcion.
+
+El dashboard de inscripciones ya no recorre Inscripcion/Estudiante con un
+COUNT por gráfica: lee las filas del resumen que cumplen los filtros (una sola
+consulta indexada) y arma todas las distribuciones en memoria. Las señales de
+inscripcion/signals.py mantienen los conteos al día con `aplicar_deltas`.
+"""
+import hashlib
+import json
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from .models import Inscripcion, ResumenInscripcion
+
+# Dimensión del resumen -> lookup equivalente desde Inscripcion
+DIMENSIONES = {
+    'oferta_academica_id': 'oferta_academica_id',
+    'id_modulo_id': 'id_modulo_id',
+    'id_area_id': 'id_modulo__id_area_id',
+    'tipo_vinculacion': 'tipo_vinculacion',
+    'estamento': 'id_estudiante__estamento',
+    'genero': 'id_estudiante__genero',
+    'grado': 'id_estudiante__grado',
+    'estrato': 'id_estudiante__estrato',
+    'ciudad_residencia': 'id_estudiante__ciudad_residencia',
+}
+
+# Campos de cada modelo que, al cambiar, mueven una inscripción de fila en el resumen
+CAMPOS_INSCRIPCION = {'oferta_academica', 'id_modulo', 'tipo_vinculacion', 'id_estudiante'}
+CAMPOS_ESTUDIANTE = {'estamento', 'genero', 'grado', 'estrato', 'ciudad_residencia'}
+
+
+def dimensiones_de(queryset):
+    """Retorna la lista de dimensiones (una por inscripción) del queryset dado."""
+    lookups = list(DIMENSIONES.values())
+    return [
+        {dimension: fila[lookup] for dimension, lookup in DIMENSIONES.items()}
+        for fila in queryset.values(*lookups)
+    ]
+
+
+def clave_resumen(dimensiones):
+    """Hash estable de una combinación de dimensiones."""
+    valores = [dimensiones.get(dimension) for dimension in DIMENSIONES]
+    return hashlib.sha1(json.dumps(valores, default=str).encode('utf-8')).hexdigest()
+
+
+def _campos_resumen(dimensiones):
+    vinculacion = dimensiones.get('tipo_vinculacion')
+    estamento = dimensiones.get('estamento')
+    return {
+        **{dimension: dimensiones.get(dimension) for dimension in DIMENSIONES},
+        'vinculacion_clave': vinculacion.lower() if vinculacion is not None else None,
+        'estamento_clave': estamento.lower() if estamento is not None else None,
+    }
+
+
+def aplicar_deltas(restar=(), sumar=()):
+    """
+    Resta una unidad por cada combinación de `restar` y suma una por cada una
+    de `sumar`. Las combinaciones repetidas se agrupan para hacer un solo
+    UPDATE por fila del resumen.
+    """
+    deltas = Counter()
+    dimensiones_por_clave = {}
+    for signo, lista in ((-1, restar), (1, sumar)):
+        for dimensiones in lista:
+            clave = clave_resumen(dimensiones)
+            deltas[clave] += signo
+            dimensiones_por_clave[clave] = dimensiones
+
+    for clave, delta in deltas.items():
+        if delta == 0:
+            continue
+        actualizadas = ResumenInscripcion.objects.filter(clave=clave).update(cantidad=F('cantidad') + delta)
+        if not actualizadas and delta > 0:
+            try:
+                with transaction.atomic():
+                    ResumenInscripcion.objects.create(
+                        clave=clave, cantidad=delta, **_campos_resumen(dimensiones_por_clave[clave])
+                    )
+            except IntegrityError:
+                # Otra petición creó la fila entre el UPDATE y el INSERT
+                ResumenInscripcion.objects.filter(clave=clave).update(cantidad=F('cantidad') + delta)
+        elif delta < 0:
+            ResumenInscripcion.objects.filter(clave=clave, cantidad__lte=0).delete()
+
+
+@transaction.atomic
+def reconstruir_resumen():
+    """Recalcula todo el resumen desde cero con un único GROUP BY. Retorna las filas creadas."""
+    lookups = list(DIMENSIONES.values())
+    filas = []
+    for grupo in Inscripcion.objects.order_by().values(*lookups).annotate(cantidad=Count('pk')):
+        dimensiones = {dimension: grupo[lookup] for dimension, lookup in DIMENSIONES.items()}
+        filas.append(ResumenInscripcion(
+            clave=clave_resumen(dimensiones),
+            cantidad=grupo['cantidad'],
+            **_campos_resumen(dimensiones),
+        ))
+    ResumenInscripcion.objects.all().delete()
+    ResumenInscripcion.objects.bulk_create(filas, batch_size=1000)
+    return len(filas)
+
+
+def _filtro_activo(valor):
+    return valor not in (None, '', 'all')
+
+
+def resumen_filtrado(periodo=None, modulo=None, area=None, tipo_vinculacion=None, estamento=None):
+    """
+    Filas del resumen que cumplen los filtros del dashboard, con los nombres de
+    módulo y área ya resueltos.
+    """
+    queryset = ResumenInscripcion.objects.filter(cantidad__gt=0)
+    if _filtro_activo(periodo):
+        queryset = queryset.filter(oferta_academica_id=periodo)
+    if _filtro_activo(modulo):
+        queryset = queryset.filter(id_modulo_id=modulo)
+    if _filtro_activo(area):
+        queryset = queryset.filter(id_area_id=area)
+    if _filtro_activo(tipo_vinculacion):
+        queryset = queryset.filter(vinculacion_clave=tipo_vinculacion.lower())
+    if _filtro_activo(estamento):
+        queryset = queryset.filter(estamento_clave=estamento.lower())
+    return list(queryset.values(
+        'id_modulo_id', 'tipo_vinculacion', 'estamento', 'genero', 'grado', 'estrato',
+        'ciudad_residencia', 'cantidad',
+        nombre_modulo=F('id_modulo__nombre_modulo'),
+        nombre_area=F('id_area__nombre_area'),
+    ))
+
+
+def _conteo_ordenado(filas, dimension, defecto='Desconocido'):
+    conteo = Counter()
+    for fila in filas:
+        valor = fila[dimension]
+        conteo[valor if valor is not None else defecto] += fila['cantidad']
+    return sorted(conteo.items(), key=lambda item: -item[1])
+
+
+def distribuciones(filas):
+    """Arma las distribuciones del dashboard a partir de las filas del resumen."""
+    total = sum(fila['cantidad'] for fila in filas)
+
+    por_modulo = Counter()
+    areas = {}
+    por_modulo_genero = {}
+    for fila in filas:
+        if fila['id_modulo_id'] is None:
+            continue
+        nombre = fila['nombre_modulo']
+        por_modulo[nombre] += fila['cantidad']
+        areas[nombre] = fila['nombre_area']
+        genero = (fila['genero'].lower() if fila['genero'] is not None else 'desconocido').capitalize()
+        desglose = por_modulo_genero.setdefault(nombre, Counter())
+        desglose[genero] += fila['cantidad']
+
+    enrollments_by_estamento = []
+    for estamento, count in _conteo_ordenado(filas, 'estamento'):
+        percentage = round((count / total) * 100) if total else 0
+        enrollments_by_estamento.append({
+            "estamento": (estamento or 'Desconocido').capitalize(),
+            "count": count,
+            "percentage": int(percentage),
+        })
+
+    return {
+        "totalEnrollments": total,
+        "enrollmentsByModule": [
+            {"name": nombre, "enrollments": count, "area": areas[nombre]}
+            for nombre, count in sorted(por_modulo.items(), key=lambda item: -item[1])
+        ],
+        "enrollmentsByModuleAndGender": [
+            {"moduleName": nombre, "genderBreakdown": dict(sorted(por_modulo_genero[nombre].items()))}
+            for nombre in sorted(por_modulo_genero)
+        ],
+        "enrollmentsByEstamento": enrollments_by_estamento,
+        "enrollmentsByGrade": [
+            {"grade": grado, "count": count} for grado, count in _conteo_ordenado(filas, 'grado')
+        ],
+        "genderDistribution": [
+            {"gender": genero, "count": count} for genero, count in _conteo_ordenado(filas, 'genero')
+        ],
+        "estratoDistribution": [
+            {"estrato": estrato or 'Desconocido', "count": count} for estrato, count in _conteo_ordenado(filas, 'estrato')
+        ],
+        "vinculacionDistribution": [
+            {"type": vinculacion, "count": count} for vinculacion, count in _conteo_ordenado(filas, 'tipo_vinculacion')
+        ],
+        "municipioDistribution": [
+            {"municipality": municipio or 'Desconocido', "count": count}
+            for municipio, count in _conteo_ordenado(filas, 'ciudad_residencia')
+        ],
+    }
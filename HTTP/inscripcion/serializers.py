@@ -66,6 +66,79 @@ class InscripcionSerializer(serializers.ModelSerializer):
             'audit_recibo_servicio'
         ]
         read_only_fields = ('id_inscripcion',)
+
+    # Bloques anidados que solo se serializan (y consultan) cuando se piden con ?expand=
+    BLOQUES_EXPANDIBLES = {
+        'estudiante': ('estudiante',),
+        'modulo': ('modulo',),
+        'oferta_categoria': ('oferta_categoria',),
+        'auditoria': ('audit_documento_recibo_pago', 'audit_constancia', 'audit_certificado', 'audit_recibo_servicio'),
+    }
+    RELACIONES_BLOQUE = {
+        'estudiante': (
+            'id_estudiante__acudiente',
+            'id_estudiante__audit_foto__actor',
+            'id_estudiante__audit_documento_identidad__actor',
+            'id_estudiante__audit_informacion__actor',
+        ),
+        'modulo': ('id_modulo__id_categoria', 'id_modulo__id_area'),
+        'oferta_categoria': ('id_oferta_categoria__id_oferta_academica',),
+        'auditoria': (
+            'audit_documento_recibo_pago__actor',
+            'audit_constancia__actor',
+            'audit_certificado__actor',
+            'audit_recibo_servicio__actor',
+        ),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Proyección de campos (?fields= / ?expand=) calculada por la vista
+        campos = self.context.get('campos')
+        if campos is not None:
+            for nombre in list(self.fields):
+                if nombre not in campos and not self.fields[nombre].write_only:
+                    self.fields.pop(nombre)
+
+    @classmethod
+    def campos_solicitados(cls, fields=None, expand=None):
+        """
+        Traduce los parámetros ?fields= y ?expand= (listas separadas por coma) a
+        (campos, bloques). Sin ninguno de los dos se retorna (None, None): todos
+        los campos y todos los bloques anidados, como siempre.
+        """
+        if not fields and not expand:
+            return None, None
+        expandir = {bloque.strip() for bloque in (expand or '').split(',') if bloque.strip()}
+        campos_anidados = {campo for grupo in cls.BLOQUES_EXPANDIBLES.values() for campo in grupo}
+        if fields:
+            campos = {campo.strip() for campo in fields.split(',') if campo.strip()}
+        else:
+            campos = set(cls.Meta.fields) - campos_anidados
+        bloques = set()
+        for bloque, grupo in cls.BLOQUES_EXPANDIBLES.items():
+            if bloque in expandir:
+                campos |= set(grupo)
+            if campos & set(grupo):
+                bloques.add(bloque)
+        return campos, bloques
+
+    @classmethod
+    def setup_eager_loading(cls, queryset, bloques=None):
+        """
+        Precarga las relaciones anidadas que usa este serializador (estudiante,
+        acudiente, módulo, oferta y auditorías con su actor) para que serializar
+        N inscripciones cueste un número constante de consultas. Con `bloques`
+        solo se precargan las de los bloques pedidos.
+        """
+        if bloques is None:
+            bloques = cls.RELACIONES_BLOQUE.keys()
+        relaciones = [relacion for bloque in bloques for relacion in cls.RELACIONES_BLOQUE[bloque]]
+        if relaciones:
+            queryset = queryset.select_related(*relaciones)
+        if 'modulo' in bloques:
+            queryset = queryset.prefetch_related('id_modulo__id_oferta_categoria')
+        return queryset
         
 
 class InscripcionInfProfeSerializer(serializers.ModelSerializer):
@@ -0,0 +1,175 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import Inscripcion
+from estudiante.models import Estudiante
+from modulo.models import Modulo
+from oferta_academica.models import OfertaAcademica
+from oferta_categoria.models import OfertaCategoria
+from area.models import Area
+from . import resumen
+from .ofertas import invalidar_candidatas
+from .estados import recalcular_estados
+
+
+def _afecta_resumen(update_fields, campos):
+    """Un save con update_fields que no toca las dimensiones no cambia el resumen."""
+    return update_fields is None or bool(campos & set(update_fields))
+
+
+# ---------------------------------------------------------------------------
+# Resumen del dashboard: Inscripcion
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Inscripcion)
+def resumen_inscripcion_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._resumen_previo = []
+    if raw or not instance.pk or not _afecta_resumen(update_fields, resumen.CAMPOS_INSCRIPCION):
+        return
+    instance._resumen_previo = resumen.dimensiones_de(Inscripcion.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Inscripcion)
+def resumen_inscripcion_post_save(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or not _afecta_resumen(update_fields, resumen.CAMPOS_INSCRIPCION):
+        return
+    resumen.aplicar_deltas(
+        restar=getattr(instance, '_resumen_previo', []),
+        sumar=resumen.dimensiones_de(Inscripcion.objects.filter(pk=instance.pk)),
+    )
+
+
+@receiver(pre_delete, sender=Inscripcion)
+def resumen_inscripcion_pre_delete(sender, instance, **kwargs):
+    instance._resumen_previo = resumen.dimensiones_de(Inscripcion.objects.filter(pk=instance.pk))
+
+
+@receiver(post_delete, sender=Inscripcion)
+def resumen_inscripcion_post_delete(sender, instance, **kwargs):
+    resumen.aplicar_deltas(restar=getattr(instance, '_resumen_previo', []))
+
+
+# ---------------------------------------------------------------------------
+# Resumen del dashboard: cambios demográficos del estudiante
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Estudiante)
+def resumen_estudiante_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._resumen_previo = None
+    if raw or not instance.pk or not _afecta_resumen(update_fields, resumen.CAMPOS_ESTUDIANTE):
+        return
+    campos = sorted(resumen.CAMPOS_ESTUDIANTE)
+    anterior = Estudiante.objects.filter(pk=instance.pk).values(*campos).first()
+    if anterior and any(anterior[campo] != getattr(instance, campo) for campo in campos):
+        instance._resumen_previo = resumen.dimensiones_de(Inscripcion.objects.filter(id_estudiante=instance.pk))
+
+
+@receiver(post_save, sender=Estudiante)
+def resumen_estudiante_post_save(sender, instance, raw=False, **kwargs):
+    previo = getattr(instance, '_resumen_previo', None)
+    if raw or not previo:
+        return
+    resumen.aplicar_deltas(
+        restar=previo,
+        sumar=resumen.dimensiones_de(Inscripcion.objects.filter(id_estudiante=instance.pk)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Resumen del dashboard: cambio de área de un módulo
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Modulo)
+def resumen_modulo_pre_save(sender, instance, raw=False, **kwargs):
+    instance._resumen_previo = None
+    if raw or not instance.pk:
+        return
+    anterior = Modulo.objects.filter(pk=instance.pk).values('id_area_id').first()
+    if anterior and anterior['id_area_id'] != instance.id_area_id:
+        instance._resumen_previo = resumen.dimensiones_de(Inscripcion.objects.filter(id_modulo=instance.pk))
+
+
+@receiver(post_save, sender=Modulo)
+def resumen_modulo_post_save(sender, instance, raw=False, **kwargs):
+    previo = getattr(instance, '_resumen_previo', None)
+    if raw or not previo:
+        return
+    resumen.aplicar_deltas(
+        restar=previo,
+        sumar=resumen.dimensiones_de(Inscripcion.objects.filter(id_modulo=instance.pk)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Resumen del dashboard: borrado de un módulo, área u oferta académica
+# ---------------------------------------------------------------------------
+# Sus llaves en Inscripcion/Modulo son SET_NULL: el UPDATE en lote del borrado
+# no emite señales de Inscripcion, así que se resta la combinación anterior y
+# se suma la nueva (con la dimensión en NULL) alrededor del borrado.
+
+FILTROS_BORRADO = {
+    Modulo: 'id_modulo',
+    Area: 'id_modulo__id_area',
+    OfertaAcademica: 'oferta_academica',
+}
+
+
+@receiver(pre_delete, sender=Modulo)
+@receiver(pre_delete, sender=Area)
+@receiver(pre_delete, sender=OfertaAcademica)
+def resumen_dimension_pre_delete(sender, instance, **kwargs):
+    inscripciones = Inscripcion.objects.filter(**{FILTROS_BORRADO[sender]: instance.pk})
+    instance._resumen_ids = list(inscripciones.values_list('pk', flat=True))
+    instance._resumen_previo = resumen.dimensiones_de(Inscripcion.objects.filter(pk__in=instance._resumen_ids))
+
+
+@receiver(post_delete, sender=Modulo)
+@receiver(post_delete, sender=Area)
+@receiver(post_delete, sender=OfertaAcademica)
+def resumen_dimension_post_delete(sender, instance, **kwargs):
+    previo = getattr(instance, '_resumen_previo', None)
+    if not previo:
+        return
+    resumen.aplicar_deltas(
+        restar=previo,
+        sumar=resumen.dimensiones_de(Inscripcion.objects.filter(pk__in=instance._resumen_ids)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Caché de ofertas categoría candidatas por módulo
+# ---------------------------------------------------------------------------
+
+@receiver(post_save, sender=OfertaCategoria)
+@receiver(post_delete, sender=OfertaCategoria)
+@receiver(post_save, sender=OfertaAcademica)
+@receiver(post_delete, sender=OfertaAcademica)
+@receiver(post_delete, sender=Modulo)
+def ofertas_candidatas_cambio(sender, raw=False, **kwargs):
+    if not raw:
+        invalidar_candidatas()
+
+
+@receiver(m2m_changed, sender=Modulo.id_oferta_categoria.through)
+def ofertas_candidatas_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidar_candidatas()
+
+
+# ---------------------------------------------------------------------------
+# Estado de las inscripciones cuando cambia la verificación del estudiante
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Estudiante)
+def estado_estudiante_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._verificacion_cambio = False
+    if raw or not instance.pk or (update_fields is not None and 'verificacion_informacion' not in update_fields):
+        return
+    anterior = Estudiante.objects.filter(pk=instance.pk).values_list('verificacion_informacion', flat=True).first()
+    instance._verificacion_cambio = anterior is not None and anterior != instance.verificacion_informacion
+
+
+@receiver(post_save, sender=Estudiante)
+def estado_estudiante_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_verificacion_cambio', False):
+        recalcular_estados(Inscripcion.objects.filter(id_estudiante=instance.pk))
@@ -0,0 +1,204 @@
+"""
+Subida directa de los documentos de una inscripción al almacenamiento.
+
+Flujo:
+1. `preparar_subidas` genera, por cada campo de archivo pedido, un nombre
+   único y una URL firmada para subir el archivo sin pasar por el worker
+   (POST prefirmado de S3, o la URL local `subida-local` en desarrollo y pruebas).
+   Retorna además un token firmado con los nombres asignados.
+2. El cliente sube cada archivo directamente a su URL.
+3. `completar_subidas` valida el token, verifica que los archivos existan y
+   registra todos los nombres con un único UPDATE. Los archivos reemplazados
+   se encolan en ArchivoPendienteEliminacion y se borran fuera de la petición.
+"""
+import os
+import threading
+import uuid
+
+from auditlog.models import LogEntry
+from django.conf import settings
+from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+from cuenta.limpieza import borrar_archivos
+
+from .estados import recalcular_estados
+from .models import ArchivoPendienteEliminacion, Inscripcion
+
+CAMPOS_ARCHIVO = ('recibo_pago', 'constancia', 'certificado', 'certificado_academico', 'recibo_servicio')
+EXTENSIONES_PERMITIDAS = {
+    'pdf': 'application/pdf',
+    'png': 'image/png',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+}
+TAMANO_MAXIMO = getattr(settings, 'TAMANO_MAXIMO_SUBIDA', 20 * 1024 * 1024)
+VIGENCIA_SUBIDA = 60 * 60  # segundos
+SAL_SUBIDA = 'inscripcion.subidas'
+SAL_SUBIDA_LOCAL = 'inscripcion.subidas.local'
+
+
+class SubidaInvalida(Exception):
+    pass
+
+
+class AlmacenamientoS3:
+    """URLs prefirmadas (POST) sobre el bucket del almacenamiento por defecto."""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def url_subida(self, nombre, content_type, request=None):
+        cliente = self.storage.connection.meta.client
+        prefirmado = cliente.generate_presigned_post(
+            Bucket=self.storage.bucket_name,
+            Key=self.storage._normalize_name(nombre),
+            Fields={'Content-Type': content_type},
+            Conditions=[{'Content-Type': content_type}, ['content-length-range', 1, TAMANO_MAXIMO]],
+            ExpiresIn=VIGENCIA_SUBIDA,
+        )
+        return {'metodo': 'POST', 'url': prefirmado['url'], 'campos': prefirmado['fields']}
+
+    def existe(self, nombre):
+        return self.storage.exists(nombre)
+
+
+class AlmacenamientoLocal:
+    """
+    Reemplazo en sistema de archivos: la URL apunta a la acción `subida-local`,
+    que recibe el archivo con un PUT y lo guarda en el almacenamiento local.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def url_subida(self, nombre, content_type, request=None):
+        from django.urls import reverse
+
+        token = signing.dumps({'nombre': nombre, 'content_type': content_type}, salt=SAL_SUBIDA_LOCAL)
+        url = f"{reverse('Matricula-subida-local')}?token={token}"
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return {'metodo': 'PUT', 'url': url, 'campos': {}}
+
+    def existe(self, nombre):
+        return self.storage.exists(nombre)
+
+    def guardar(self, token, contenido):
+        try:
+            datos = signing.loads(token, salt=SAL_SUBIDA_LOCAL, max_age=VIGENCIA_SUBIDA)
+        except signing.BadSignature:
+            raise SubidaInvalida("El token de subida no es válido o expiró.")
+        if not contenido or len(contenido) > TAMANO_MAXIMO:
+            raise SubidaInvalida("El archivo está vacío o supera el tamaño permitido.")
+        guardado = self.storage.save(datos['nombre'], ContentFile(contenido))
+        if guardado != datos['nombre']:
+            self.storage.delete(guardado)
+            raise SubidaInvalida("El archivo ya fue subido.")
+        return guardado
+
+
+def obtener_almacenamiento():
+    if hasattr(default_storage, 'bucket_name'):
+        return AlmacenamientoS3(default_storage)
+    return AlmacenamientoLocal(default_storage)
+
+
+def nombre_unico(inscripcion, campo, extension):
+    """Ruta de upload_to del campo con un sufijo único (el archivo anterior no se pisa)."""
+    field = Inscripcion._meta.get_field(campo)
+    base, ext = os.path.splitext(field.upload_to(inscripcion, f'archivo.{extension}'))
+    return f"{base}_{uuid.uuid4().hex[:12]}{ext}"
+
+
+def preparar_subidas(inscripcion, archivos, request=None):
+    """
+    `archivos` es {campo: extension}. Retorna las URLs de subida por campo y el
+    token que se debe enviar a `completar_subidas`.
+    """
+    almacenamiento = obtener_almacenamiento()
+    nombres = {}
+    subidas = {}
+    for campo, extension in archivos.items():
+        if campo not in CAMPOS_ARCHIVO:
+            raise SubidaInvalida(f"'{campo}' no es un campo de archivo de la inscripción.")
+        extension = str(extension or '').lower().lstrip('.')
+        if extension not in EXTENSIONES_PERMITIDAS:
+            raise SubidaInvalida(f"Extensión no permitida para '{campo}': {extension or 'vacía'}.")
+        nombre = nombre_unico(inscripcion, campo, extension)
+        nombres[campo] = nombre
+        subidas[campo] = {
+            'nombre': nombre,
+            **almacenamiento.url_subida(nombre, EXTENSIONES_PERMITIDAS[extension], request),
+        }
+    token = signing.dumps({'inscripcion': inscripcion.pk, 'archivos': nombres}, salt=SAL_SUBIDA)
+    return {'subidas': subidas, 'token': token, 'expira_en': VIGENCIA_SUBIDA}
+
+
+def completar_subidas(inscripcion, token):
+    """
+    Registra los archivos subidos con un único UPDATE, recalcula el estado y
+    encola el borrado de los archivos reemplazados. Retorna los campos actualizados.
+    """
+    try:
+        datos = signing.loads(token, salt=SAL_SUBIDA, max_age=VIGENCIA_SUBIDA)
+    except signing.BadSignature:
+        raise SubidaInvalida("El token de subida no es válido o expiró.")
+    if datos['inscripcion'] != inscripcion.pk:
+        raise SubidaInvalida("El token no corresponde a esta inscripción.")
+
+    almacenamiento = obtener_almacenamiento()
+    archivos = datos['archivos']
+    faltantes = [campo for campo, nombre in archivos.items() if not almacenamiento.existe(nombre)]
+    if faltantes:
+        raise SubidaInvalida(f"No se encontraron los archivos subidos para: {', '.join(faltantes)}.")
+
+    anteriores = {campo: getattr(inscripcion, campo).name or None for campo in archivos}
+    cambios = {campo: [anteriores[campo], nombre] for campo, nombre in archivos.items() if anteriores[campo] != nombre}
+    if not cambios:
+        return []
+
+    with transaction.atomic():
+        queryset = Inscripcion.objects.filter(pk=inscripcion.pk)
+        queryset.update(**{campo: nombre for campo, (_, nombre) in cambios.items()})
+        recalcular_estados(queryset)
+        # update() no pasa por auditlog: se registra el cambio explícitamente
+        LogEntry.objects.log_create(inscripcion, action=LogEntry.Action.UPDATE, changes=cambios)
+        encolar_eliminacion([anterior for anterior, _ in cambios.values() if anterior])
+    inscripcion.refresh_from_db()
+    return list(cambios)
+
+
+def encolar_eliminacion(nombres):
+    """Encola archivos para borrarlos del almacenamiento cuando se confirme la transacción."""
+    nombres = [nombre for nombre in nombres if nombre]
+    if not nombres:
+        return
+    ArchivoPendienteEliminacion.objects.bulk_create([ArchivoPendienteEliminacion(nombre=nombre) for nombre in nombres])
+    transaction.on_commit(
+        lambda: threading.Thread(target=procesar_eliminaciones, daemon=True).start()
+    )
+
+
+def procesar_eliminaciones(limite=500, max_intentos=5):
+    """Borra del almacenamiento los archivos encolados. Retorna cuántos se eliminaron."""
+    from django.db import connection
+
+    try:
+        pendientes = list(ArchivoPendienteEliminacion.objects.filter(
+            intentos__lt=max_intentos
+        ).order_by('id_archivo')[:limite])
+        # Un solo delete_objects por cada 1000 archivos (ver cuenta/limpieza.py)
+        fallidos = set(borrar_archivos([pendiente.nombre for pendiente in pendientes], encolar_fallidos=False))
+        eliminados = [pendiente.pk for pendiente in pendientes if pendiente.nombre not in fallidos]
+        ArchivoPendienteEliminacion.objects.filter(
+            pk__in=[pendiente.pk for pendiente in pendientes if pendiente.nombre in fallidos]
+        ).update(intentos=F('intentos') + 1)
+        ArchivoPendienteEliminacion.objects.filter(pk__in=eliminados).delete()
+    finally:
+        if threading.current_thread() is not threading.main_thread():
+            connection.close()
+    return len(eliminados)
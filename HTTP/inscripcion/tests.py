@@ -1,3 +1,402 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from inscripcion.models import Inscripcion, ResumenInscripcion
+
+User = get_user_model()
+
+
+@pytest.fixture
+def admin_client(db):
+    admin = User.objects.create_user(
+        username='admin_inscripcion',
+        password='adminpass123',
+        user_type='administrador',
+    )
+    client = APIClient()
+    client.force_authenticate(user=admin)
+    return client
+
+
+def _conteo_resumen(**filtros):
+    return sum(ResumenInscripcion.objects.filter(**filtros).values_list('cantidad', flat=True))
+
+
+@pytest.mark.django_db
+def test_resumen_se_mantiene_con_las_senales(inscripcion_instance, estudiante_instance):
+    assert _conteo_resumen(genero='Masculino', vinculacion_clave='publico') == 1
+
+    # Un cambio demográfico del estudiante mueve la inscripción de fila
+    estudiante_instance.genero = 'Femenino'
+    estudiante_instance.save()
+    assert _conteo_resumen(genero='Masculino') == 0
+    assert _conteo_resumen(genero='Femenino') == 1
+
+    # Cambiar la vinculación de la inscripción también
+    inscripcion_instance.tipo_vinculacion = 'Privado'
+    inscripcion_instance.save()
+    assert _conteo_resumen(vinculacion_clave='publico') == 0
+    assert _conteo_resumen(vinculacion_clave='privado') == 1
+
+    inscripcion_instance.delete()
+    assert _conteo_resumen() == 0
+
+
+@pytest.mark.django_db
+def test_resumen_al_borrar_modulo_y_oferta(inscripcion_instance, modulo_instance, oferta_academica_instance):
+    # Los SET_NULL del borrado no emiten señales de Inscripcion
+    modulo_instance.delete()
+    assert _conteo_resumen(id_modulo_id__isnull=True, id_area_id__isnull=True) == 1
+    oferta_academica_instance.delete()
+    assert _conteo_resumen(oferta_academica_id__isnull=True) == 1
+
+    Inscripcion.objects.get(pk=inscripcion_instance.pk).delete()
+    assert _conteo_resumen() == 0
+
+
+@pytest.mark.django_db
+def test_reconstruir_resumen_coincide_con_las_inscripciones(inscripcion_instance):
+    ResumenInscripcion.objects.all().delete()
+    call_command('reconstruir_resumen_inscripciones')
+    assert _conteo_resumen() == Inscripcion.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_dashboard_lee_el_resumen(admin_client, inscripcion_instance, oferta_academica_instance, modulo_instance):
+    response = admin_client.get('/inscripcion/dashboard/', {
+        'periodo': oferta_academica_instance.id_oferta_academica,
+        'tipo_vinculacion': 'PUBLICO',
+    })
+    assert response.status_code == 200
+    assert response.data['totalEnrollments'] == 1
+    assert response.data['enrollmentsByModule'] == [
+        {'name': modulo_instance.nombre_modulo, 'enrollments': 1, 'area': 'Ciencias'}
+    ]
+    assert response.data['enrollmentsByModuleAndGender'][0]['genderBreakdown'] == {'Masculino': 1}
+
+    response = admin_client.get('/inscripcion/dashboard/', {'estamento': 'otro'})
+    assert response.data['totalEnrollments'] == 0
+
+
+@pytest.mark.django_db
+def test_matricula_grupo_stream_pagina_por_grupo(admin_client, inscripcion_instance, grupo_instance, django_assert_max_num_queries):
+    inscripcion_instance.grupo = grupo_instance
+    inscripcion_instance.save()
+
+    with django_assert_max_num_queries(12):
+        response = admin_client.get('/inscripcion/matricula-grupo/stream/', {'limite': 1})
+        lineas = [json.loads(linea) for linea in b''.join(response.streaming_content).splitlines()]
+    assert response['Content-Type'] == 'application/x-ndjson'
+
+    cabecera, pagina = lineas[0], lineas[1]
+    assert cabecera['tipo'] == 'grupo'
+    assert cabecera['grupo_id'] == grupo_instance.id
+    assert cabecera['cantidad'] == 1
+    assert [m['id_inscripcion'] for m in pagina['matriculas']] == [inscripcion_instance.id_inscripcion]
+    assert pagina['siguiente_cursor'] is None
+    assert lineas[-2]['grupo_id'] is None and lineas[-2]['cantidad'] == 0
+
+    # Continuación explícita de un grupo a partir del cursor
+    response = admin_client.get('/inscripcion/matricula-grupo/stream/', {
+        'grupo': grupo_instance.id, 'cursor': inscripcion_instance.id_inscripcion,
+    })
+    lineas = [json.loads(linea) for linea in b''.join(response.streaming_content).splitlines()]
+    assert lineas == [{'tipo': 'matriculas', 'grupo_id': grupo_instance.id, 'matriculas': [], 'siguiente_cursor': None}]
+
+
+@pytest.mark.django_db
+def test_geocodificacion_usa_la_cache_y_solo_recalcula_direcciones_nuevas(admin_client, inscripcion_instance, estudiante_instance):
+    from inscripcion.geocodificacion import GeocodificadorLocal, geocodificar_pendientes, texto_direccion
+
+    response = admin_client.get('/inscripcion/geocodificacion/')
+    assert response.status_code == 200
+    assert response.data[0]['encontrado'] is False
+    assert admin_client.get('/inscripcion/geocodificacion/cobertura/').data['pendientes'] == 1
+
+    direccion = texto_direccion(estudiante_instance.__dict__)
+    geocodificador = GeocodificadorLocal({direccion: (3.45, -76.53)})
+    assert geocodificar_pendientes(geocodificador)['encontrada'] == 1
+    # La segunda corrida no vuelve a consultar el servicio
+    geocodificar_pendientes(geocodificador)
+    assert geocodificador.consultas == [direccion]
+
+    response = admin_client.get('/inscripcion/geocodificacion/')
+    assert response.data[0]['latitud'] == 3.45
+    assert admin_client.get('/inscripcion/geocodificacion/cobertura/').data['encontradas'] == 1
+
+    # Un cambio de dirección deja la inscripción pendiente de nuevo
+    estudiante_instance.direccion_residencia = 'Otra calle 1'
+    estudiante_instance.save()
+    assert admin_client.get('/inscripcion/geocodificacion/cobertura/').data['pendientes'] == 1
+    geocodificar_pendientes(geocodificador)
+    assert len(geocodificador.consultas) == 2
+
+
+@pytest.mark.django_db
+def test_carga_masiva_valida_en_bloque(admin_client, inscripcion_instance, estudiante_instance, modulo_instance,
+                                       oferta_categoria_instance, django_assert_max_num_queries):
+    from django.core.files.uploadedfile import SimpleUploadedFile
+
+    inscripcion_instance.delete()
+    modulo_instance.id_oferta_categoria.add(oferta_categoria_instance)
+    filas = [
+        {'numero_documento': estudiante_instance.numero_documento, 'id_modulo': modulo_instance.id_modulo,
+         'tipo_vinculacion': 'Publico'},
+        # Duplicada dentro del mismo lote
+        {'id_estudiante': estudiante_instance.id_estudiante, 'id_modulo': modulo_instance.id_modulo,
+         'tipo_vinculacion': 'Publico'},
+        {'numero_documento': '000', 'id_modulo': modulo_instance.id_modulo, 'tipo_vinculacion': 'Publico'},
+        {'id_estudiante': estudiante_instance.id_estudiante, 'id_modulo': 999999, 'tipo_vinculacion': 'Publico'},
+    ]
+    with django_assert_max_num_queries(20):
+        response = admin_client.post('/inscripcion/carga-masiva/', filas, format='json')
+    assert response.status_code == 200
+    assert response.data['creadas'] == 1
+    assert [error['fila'] for error in response.data['detalle_errores']] == [2, 3, 4]
+
+    inscripcion = Inscripcion.objects.get(pk=response.data['detalle_exito'][0]['id_inscripcion'])
+    assert inscripcion.id_oferta_categoria_id == oferta_categoria_instance.id_oferta_categoria
+    assert inscripcion.oferta_academica_id == oferta_categoria_instance.id_oferta_academica_id
+    assert _conteo_resumen() == 1
+
+    # El mismo lote en CSV ya no crea nada: la inscripción existe
+    contenido = f"numero_documento,id_modulo,tipo_vinculacion\n{estudiante_instance.numero_documento},{modulo_instance.id_modulo},Publico\n"
+    archivo = SimpleUploadedFile('lote.csv', contenido.encode('utf-8'), content_type='text/csv')
+    response = admin_client.post('/inscripcion/carga-masiva/', {'archivo': archivo}, format='multipart')
+    assert response.data['creadas'] == 0
+    assert response.data['detalle_errores'][0]['error'].startswith('El estudiante ya está inscrito')
+
+
+@pytest.mark.django_db
+def test_carga_masiva_tipo_vinculacion_invalido_es_error_de_fila(admin_client, inscripcion_instance, estudiante_instance,
+                                                                 modulo_instance, oferta_categoria_instance):
+    inscripcion_instance.delete()
+    modulo_instance.id_oferta_categoria.add(oferta_categoria_instance)
+    fila = {'id_estudiante': estudiante_instance.id_estudiante, 'id_modulo': modulo_instance.id_modulo}
+    filas = [dict(fila, tipo_vinculacion='x' * 256), dict(fila, tipo_vinculacion=5)]
+
+    response = admin_client.post('/inscripcion/carga-masiva/', filas, format='json')
+
+    assert response.status_code == 200
+    assert [error['fila'] for error in response.data['detalle_errores']] == [1]
+    assert Inscripcion.objects.get().tipo_vinculacion == '5'
+
+
+@pytest.mark.django_db
+def test_candidatas_en_cache_se_invalidan(modulo_instance, oferta_categoria_instance, oferta_academica_instance,
+                                          django_assert_num_queries):
+    from inscripcion.ofertas import candidatas_modulo, elegir_oferta_categoria
+
+    assert candidatas_modulo(modulo_instance.id_modulo) == []
+    modulo_instance.id_oferta_categoria.add(oferta_categoria_instance)
+
+    candidatas = candidatas_modulo(modulo_instance.id_modulo)
+    with django_assert_num_queries(0):
+        oferta, error = elegir_oferta_categoria(candidatas_modulo(modulo_instance.id_modulo))
+    assert error is None
+    assert oferta.id_oferta_categoria == oferta_categoria_instance.id_oferta_categoria
+    assert candidatas == [oferta]
+
+    # Cerrar la oferta invalida la caché y la inscripción se rechaza
+    oferta_categoria_instance.estado = False
+    oferta_categoria_instance.save()
+    oferta_academica_instance.estado = 'finalizado'
+    oferta_academica_instance.save()
+    oferta, error = elegir_oferta_categoria(candidatas_modulo(modulo_instance.id_modulo))
+    assert oferta is None
+    assert error == "La oferta categoria o academica no esta activa"
+
+
+@pytest.mark.django_db
+def test_recalcular_estados_en_sql(inscripcion_instance, estudiante_instance):
+    from inscripcion.estados import recalcular_estados
+
+    def estado():
+        inscripcion_instance.refresh_from_db(fields=['estado'])
+        return inscripcion_instance.estado
+
+    queryset = Inscripcion.objects.filter(pk=inscripcion_instance.pk)
+    queryset.update(estado='Revisado', verificacion_recibo_pago=False)
+    assert recalcular_estados() == 1
+    assert estado() == 'No revisado'
+    # update() no pasa por auditlog: el cambio se registra explícitamente
+    from auditlog.models import LogEntry
+    entrada = LogEntry.objects.get_for_object(inscripcion_instance).latest('timestamp')
+    assert entrada.changes_dict['estado'] == ['Revisado', 'No revisado']
+    # Sin cambios no hay filas actualizadas
+    assert recalcular_estados() == 0
+
+    # Archivo subido y verificado, estudiante sin verificar -> Pendiente
+    queryset.update(recibo_pago='recibos_pago/1234567890.pdf', verificacion_recibo_pago=True)
+    recalcular_estados(queryset)
+    assert estado() == 'Pendiente'
+
+    # Al verificar al estudiante, la señal recalcula sus inscripciones
+    estudiante_instance.verificacion_informacion = True
+    estudiante_instance.save()
+    assert estado() == 'Revisado'
+
+    # Un archivo presente sin verificar impide el Revisado
+    queryset.update(certificado='certificados/1234567890.pdf', verificacion_certificado=False)
+    call_command('recalcular_estados_inscripciones')
+    assert estado() == 'Pendiente'
+
+
+def _consultas_actualizacion(client, inscripcion, valor):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connection) as contexto:
+        response = client.patch(f'/inscripcion/{inscripcion.pk}/', {'verificacion_recibo_pago': valor}, format='json')
+    assert response.status_code == 200
+    return [consulta['sql'] for consulta in contexto.captured_queries]
+
+
+@pytest.mark.django_db
+def test_auditoria_se_captura_sin_buscar_en_el_log(admin_client, inscripcion_instance):
+    """Benchmark: el costo de enlazar la auditoría no crece con la tabla de logs."""
+    from auditlog.models import LogEntry
+    from django.contrib.contenttypes.models import ContentType
+
+    _consultas_actualizacion(admin_client, inscripcion_instance, True)
+    pequeno = _consultas_actualizacion(admin_client, inscripcion_instance, False)
+
+    # Crece la tabla de logs con entradas del mismo objeto
+    content_type = ContentType.objects.get_for_model(Inscripcion)
+    LogEntry.objects.bulk_create([
+        LogEntry(content_type=content_type, object_pk=str(inscripcion_instance.pk),
+                 object_id=inscripcion_instance.pk, object_repr='x', action=LogEntry.Action.UPDATE, changes='{}')
+        for _ in range(5000)
+    ])
+    grande = _consultas_actualizacion(admin_client, inscripcion_instance, True)
+
+    assert len(pequeno) == len(grande)
+    # Solo lecturas por PK (para serializar la respuesta), nunca "la última entrada"
+    assert not [sql for sql in grande if 'FROM "auditlog_logentry"' in sql and 'ORDER BY' in sql]
+
+    inscripcion_instance.refresh_from_db()
+    entrada = inscripcion_instance.audit_documento_recibo_pago
+    # La entrada enlazada es la del guardado que cambió la verificación
+    assert entrada.changes_dict['verificacion_recibo_pago'] == ['False', 'True']
+
+
+@pytest.mark.django_db
+def test_listado_paginado_con_proyeccion(admin_client, inscripcion_instance, estudiante_instance,
+                                          django_assert_max_num_queries):
+    segunda = Inscripcion.objects.create(
+        id_estudiante=estudiante_instance,
+        id_modulo=inscripcion_instance.id_modulo,
+        tipo_vinculacion='Privado',
+    )
+
+    # Sin parámetros se mantiene la lista completa con todos los bloques
+    response = admin_client.get('/inscripcion/')
+    assert isinstance(response.data, list) and len(response.data) == 2
+    assert 'estudiante' in response.data[0] and 'audit_constancia' in response.data[0]
+
+    with django_assert_max_num_queries(3):
+        response = admin_client.get('/inscripcion/', {'page_size': 1, 'fields': 'id_inscripcion,estado'})
+    assert response.data['results'] == [{'id_inscripcion': inscripcion_instance.pk, 'estado': 'No revisado'}]
+
+    response = admin_client.get(response.data['next'])
+    assert [fila['id_inscripcion'] for fila in response.data['results']] == [segunda.pk]
+    assert response.data['next'] is None
+
+    response = admin_client.get('/inscripcion/filtro-estado/', {'estado': 'No revisado', 'expand': 'modulo'})
+    fila = response.data[0]
+    assert fila['modulo']['id_modulo'] == inscripcion_instance.id_modulo_id
+    assert 'estudiante' not in fila and 'audit_constancia' not in fila and 'tipo_vinculacion' in fila
+
+
+@pytest.mark.django_db
+def test_subida_directa_registra_archivos_en_una_escritura(admin_client, inscripcion_instance, settings, tmp_path):
+    from django.core.files.storage import default_storage
+    from inscripcion.models import ArchivoPendienteEliminacion
+    from inscripcion.subidas import procesar_eliminaciones
+
+    settings.MEDIA_ROOT = str(tmp_path)
+    default_storage.save('recibos_pago/anterior.pdf', ContentFile(b'viejo'))
+    Inscripcion.objects.filter(pk=inscripcion_instance.pk).update(recibo_pago='recibos_pago/anterior.pdf')
+
+    response = admin_client.post(f'/inscripcion/{inscripcion_instance.pk}/subidas/',
+                                 {'archivos': {'recibo_pago': 'pdf', 'constancia': 'pdf'}}, format='json')
+    assert response.status_code == 200
+    subidas = response.data['subidas']
+
+    # Sin subir los archivos la confirmación falla
+    response_completar = admin_client.post(f'/inscripcion/{inscripcion_instance.pk}/subidas/completar/',
+                                           {'token': response.data['token']}, format='json')
+    assert response_completar.status_code == 400
+
+    for subida in subidas.values():
+        assert subida['metodo'] == 'PUT'
+        assert APIClient().put(subida['url'], b'%PDF-1.4 contenido', content_type='application/pdf').status_code == 201
+
+    response_completar = admin_client.post(f'/inscripcion/{inscripcion_instance.pk}/subidas/completar/',
+                                           {'token': response.data['token']}, format='json')
+    assert response_completar.status_code == 200
+    assert sorted(response_completar.data['actualizados']) == ['constancia', 'recibo_pago']
+
+    inscripcion_instance.refresh_from_db()
+    assert inscripcion_instance.recibo_pago.name == subidas['recibo_pago']['nombre']
+    assert inscripcion_instance.constancia.name == subidas['constancia']['nombre']
+
+    # El archivo reemplazado queda en cola y se borra fuera de la petición
+    assert list(ArchivoPendienteEliminacion.objects.values_list('nombre', flat=True)) == ['recibos_pago/anterior.pdf']
+    assert procesar_eliminaciones() == 1
+    assert not default_storage.exists('recibos_pago/anterior.pdf')
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('filtros, indices', [
+    ({'tipo_vinculacion': 'PUBLICO'}, ['inscripcion_vinc_lower_idx']),
+    ({'estado': 'Revisado'}, ['inscripcion_estado_id_idx']),
+    # Sin estadísticas reales el planificador puede elegir cualquiera de los dos
+    ({'oferta_academica': 1, 'estado': 'Revisado'}, ['inscripcion_periodo_estado_idx', 'inscripcion_estado_id_idx']),
+    ({'grupo': '1'}, ['inscripcion_grupo_id_idx', 'inscripcion_inscripcion_grupo_id']),
+])
+def test_filtros_usan_indices(filtros, indices):
+    from django.db import connection
+    from inscripcion.filtros import InscripcionFilter
+
+    if connection.vendor != 'postgresql':
+        pytest.skip("El plan de ejecución solo se valida en PostgreSQL")
+
+    queryset = InscripcionFilter(filtros, queryset=Inscripcion.objects.order_by()).qs
+    with connection.cursor() as cursor:
+        # Con tablas de prueba casi vacías el planificador preferiría un seq scan
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = queryset.explain()
+    assert 'Seq Scan' not in plan
+    assert any(indice in plan for indice in indices), plan
+
+
+@pytest.mark.django_db
+def test_filtro_estamento_usa_indice_funcional():
+    from django.db import connection
+    from inscripcion.filtros import InscripcionFilter
+
+    if connection.vendor != 'postgresql':
+        pytest.skip("El plan de ejecución solo se valida en PostgreSQL")
+
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = InscripcionFilter({'estamento': 'ESTUDIANTE'}, queryset=Inscripcion.objects.all()).qs.explain()
+    assert 'estudiante_estamento_lower_idx' in plan
+
+
+@pytest.mark.django_db
+def test_acciones_de_filtro_usan_el_filterset(admin_client, inscripcion_instance):
+    response = admin_client.get('/inscripcion/filtro-vinculacion/', {'tipo_vinculacion': 'publico'})
+    assert [fila['id_inscripcion'] for fila in response.data] == [inscripcion_instance.pk]
+    response = admin_client.get('/inscripcion/', {'estamento': 'ESTUDIANTE', 'fields': 'id_inscripcion'})
+    assert response.data == [{'id_inscripcion': inscripcion_instance.pk}]
+    response = admin_client.get('/inscripcion/filtro-grupo/', {'grupo': inscripcion_instance.grupo_id})
+    assert len(response.data) == 1
+    response = admin_client.get('/inscripcion/filtro-grupo/', {'grupo': 'null'})
+    assert response.data == []
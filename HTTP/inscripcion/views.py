@@ -3,8 +3,13 @@ from rest_framework.response import Response
 from modulo.models import Modulo
 from profesor.models import Profesor
 from monitor_academico.models import MonitorAcademico
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.utils.encoders import JSONEncoder
+import json
 from auditlog.models import LogEntry
+from cuenta.auditoria import entrada_auditoria
 from .serializers import LogEntrySerializer
 from auditlog.context import set_actor
 
@@ -12,8 +17,9 @@ from auditlog.context import set_actor
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 #Modelo
-from .models import Inscripcion
+from .models import Inscripcion, ResumenInscripcion
 from estudiante.models import Estudiante
+from .resumen import resumen_filtrado, distribuciones
 #Serializadores
 from .serializers import InscripcionSerializer, InscripcionInfProfeSerializer
 #Autenticacion
@@ -22,27 +28,152 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from cuenta.permissions import IsAdministrador, IsEstudianteOrAdministrador, IsEstudianteOrAdministradorOrMonitorAdministrativo, IsProfesorOrAdministrador
 #Actions
 from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
+#Carga masiva
+import csv
+from .carga_masiva import leer_csv, procesar_lote
+from .ofertas import candidatas_modulo, elegir_oferta_categoria
+from .estados import recalcular_estados
+#Paginacion y filtros
+from .paginacion import InscripcionCursorPagination
+from .filtros import InscripcionFilter
+from django.db.models.functions import Lower
+#Subidas directas
+from .subidas import (
+    CAMPOS_ARCHIVO, SubidaInvalida, completar_subidas, encolar_eliminacion, obtener_almacenamiento,
+    preparar_subidas,
+)
 #Dashboard
-from django.db.models import Count, Value
-from django.db.models.functions import Coalesce, Lower
 from collections import OrderedDict
 #Geocodificacion
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut, GeocoderServiceError
+from .geocodificacion import coordenadas_inscripciones
+from cuenta.limpieza import archivos_de, borrar_archivos_al_confirmar
+from cuenta.identidad import resolver
 
 def file_update(instance, data, field_name):
         """
-        Elimina el archivo anterior y asigna el nuevo si se envía uno.
+        Asigna el nuevo archivo si se envía uno y encola el borrado del anterior.
+        Retorna True si el campo cambió; quien llama guarda la instancia una sola vez.
         """
         uploaded_file = data.get(field_name)
         if uploaded_file:
-            # Elimina el archivo anterior de S3 si existe
+            # El archivo anterior se borra del almacenamiento fuera de la petición
             old_file = getattr(instance, field_name, None)
             if old_file:
-                old_file.delete(save=False)
+                encolar_eliminacion([old_file.name])
             setattr(instance, field_name, uploaded_file)
-            instance.save()
             data.pop(field_name)
+            return True
+        return False
+
+LIMITE_DEFECTO_STREAM = 100
+LIMITE_MAXIMO_STREAM = 500
+
+
+def cabecera_grupo(grupo):
+    """Datos de cabecera de un grupo en matricula-grupo (None = estudiantes sin grupo)."""
+    if grupo is None:
+        return {
+            'grupo_id': None,
+            'nombre': "NO ASIGNADO",
+            'periodo': "NO ASIGNADO",
+            'profesor': None,
+            'monitor': None,
+        }
+
+    if grupo.profesor:
+        profesor_data = {
+            'id': grupo.profesor.id,
+            'nombre': str(grupo.profesor.nombre) + " " + str(grupo.profesor.apellido),
+        }
+    else:
+        profesor_data = None
+
+    if grupo.monitor_academico:
+        monitor_academico_data = {
+            'id': grupo.monitor_academico.id,
+            'nombre': str(grupo.monitor_academico.nombre) + " " + str(grupo.monitor_academico.apellido),
+        }
+    else:
+        monitor_academico_data = None
+
+    return {
+        'grupo_id': grupo.id,
+        'nombre': str(grupo.nombre),
+        'periodo': grupo.oferta_academica.nombre if grupo.oferta_academica else "NO ASIGNADO",
+        'profesor': profesor_data,
+        'monitor': monitor_academico_data,
+    }
+
+
+def _linea_json(data):
+    return json.dumps(data, cls=JSONEncoder, ensure_ascii=False) + "\n"
+
+
+def _inscripciones_de_grupo(grupo_id, periodo):
+    queryset = Inscripcion.objects.filter(grupo_id=grupo_id)
+    if periodo is not None and grupo_id is None:
+        # Los grupos ya se filtran por periodo; los sin grupo se filtran por su oferta
+        queryset = queryset.filter(id_oferta_categoria__id_oferta_academica_id=periodo)
+    return queryset
+
+
+def _pagina_matriculas(grupo_id, periodo, cursor, limite):
+    """
+    Una página (keyset sobre id_inscripcion) de las matrículas del grupo,
+    serializada con todas sus relaciones precargadas: el costo en consultas es
+    constante sin importar el tamaño de la página.
+    """
+    queryset = _inscripciones_de_grupo(grupo_id, periodo).filter(id_inscripcion__gt=cursor)
+    pagina = list(
+        InscripcionSerializer.setup_eager_loading(queryset).order_by('id_inscripcion')[:limite + 1]
+    )
+    hay_mas = len(pagina) > limite
+    pagina = pagina[:limite]
+    return {
+        'tipo': 'matriculas',
+        'grupo_id': grupo_id,
+        'matriculas': InscripcionSerializer(pagina, many=True).data,
+        'siguiente_cursor': pagina[-1].id_inscripcion if hay_mas else None,
+    }
+
+
+def _stream_pagina(grupo_id, periodo, cursor, limite):
+    yield _linea_json(_pagina_matriculas(grupo_id, periodo, cursor, limite))
+
+
+def _stream_grupos(periodo, limite):
+    """
+    Genera, grupo por grupo, la cabecera y la primera página de matrículas.
+    Solo hay una página en memoria a la vez; los conteos salen de un único
+    GROUP BY.
+    """
+    from grupo.models import Grupo
+
+    grupos = Grupo.objects.select_related('profesor', 'monitor_academico', 'oferta_academica').order_by('id')
+    conteos_qs = Inscripcion.objects.order_by().values('grupo_id').annotate(cantidad=Count('pk'))
+    if periodo is not None:
+        grupos = grupos.filter(oferta_academica_id=periodo)
+        conteos_qs = conteos_qs.filter(
+            Q(grupo__oferta_academica_id=periodo)
+            | Q(grupo__isnull=True, id_oferta_categoria__id_oferta_academica_id=periodo)
+        )
+    conteos = {fila['grupo_id']: fila['cantidad'] for fila in conteos_qs}
+
+    for grupo in grupos.iterator(chunk_size=200):
+        yield _linea_json({'tipo': 'grupo', **cabecera_grupo(grupo), 'cantidad': conteos.get(grupo.id, 0)})
+        yield _linea_json(_pagina_matriculas(grupo.id, periodo, 0, limite))
+
+    # Estudiantes sin grupo: el periodo se toma de la oferta de su primera inscripción
+    cabecera = cabecera_grupo(None)
+    periodo_sin_grupo = _inscripciones_de_grupo(None, periodo).order_by('id_inscripcion').values_list(
+        'id_oferta_categoria__id_oferta_academica__nombre', flat=True
+    ).first()
+    if periodo_sin_grupo:
+        cabecera['periodo'] = periodo_sin_grupo
+    yield _linea_json({'tipo': 'grupo', **cabecera, 'cantidad': conteos.get(None, 0)})
+    yield _linea_json(_pagina_matriculas(None, periodo, 0, limite))
+
 
 class InscripcionViewSet(viewsets.ModelViewSet):
     """
@@ -53,6 +184,8 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     queryset = Inscripcion.objects.all()
     serializer_class = InscripcionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = InscripcionCursorPagination
+    filterset_class = InscripcionFilter
 
     def get_permissions(self):
         """
@@ -68,19 +201,58 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             permission_classes = [IsEstudianteOrAdministrador]
         elif self.action == 'buscar_por_documento':
             permission_classes = [IsProfesorOrAdministrador]
+        elif self.action == 'subida_local':
+            # Autorizada por el token firmado de la URL
+            permission_classes = [AllowAny]
         else:
             permission_classes = [IsAdministrador]
         return [permission() for permission in permission_classes]
+
+    def _campos_solicitados(self):
+        if self.request is None or self.request.method != 'GET':
+            return None, None
+        return InscripcionSerializer.campos_solicitados(
+            self.request.query_params.get('fields'),
+            self.request.query_params.get('expand'),
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['campos'], _ = self._campos_solicitados()
+        return context
+
+    def _lista_inscripciones(self, queryset):
+        """
+        Respuesta común de los listados: precarga solo los bloques anidados
+        pedidos (?fields= / ?expand=) y pagina por cursor si se solicita.
+        """
+        _, bloques = self._campos_solicitados()
+        queryset = InscripcionSerializer.setup_eager_loading(queryset, bloques)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
     
     @swagger_auto_schema(
         operation_summary="Listar todos los Inscripciones",
-        operation_description="Retorna una lista de todos los Inscripciones registrados"
+        operation_description=(
+            "Retorna una lista de todos los Inscripciones registrados. "
+            "Con `cursor` o `page_size` la respuesta se pagina por cursor. Con `fields` y/o `expand` "
+            "solo se serializan los campos pedidos; los bloques anidados (estudiante, modulo, "
+            "oferta_categoria, auditoria) solo se incluyen si se piden. Aplica también a los filtros."
+        ),
+        manual_parameters=[
+            openapi.Parameter('fields', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Campos separados por coma, p. ej. id_inscripcion,estado"),
+            openapi.Parameter('expand', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="Bloques anidados a incluir: estudiante,modulo,oferta_categoria,auditoria"),
+        ]
     )
     def list(self, request, *args, **kwargs):
         queryset = self.filter_queryset(self.get_queryset())
         if not queryset.exists():
             return Response(status=status.HTTP_204_NO_CONTENT)
-        return super().list(request, *args, **kwargs)
+        return self._lista_inscripciones(queryset)
     
     @swagger_auto_schema(
         operation_summary="Crear un inscripcion",
@@ -100,8 +272,15 @@ class InscripcionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         try:
-            modulo = Modulo.objects.get(id_modulo=id_modulo)
-        except Modulo.DoesNotExist:
+            id_modulo = int(id_modulo)
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "id_modulo debe ser un número válido."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # Candidatas precalculadas y en caché: resolver la oferta no consulta la BD
+        candidatas = candidatas_modulo(id_modulo)
+        if candidatas is None:
             return Response(
                 {"detail": "El módulo no existe."},
                 status=status.HTTP_404_NOT_FOUND
@@ -147,17 +326,6 @@ class InscripcionViewSet(viewsets.ModelViewSet):
                     {"detail": "id_oferta_categoria debe ser un número válido."},
                     status=status.HTTP_400_BAD_REQUEST,
                 )
-
-            oferta_categoria = modulo.id_oferta_categoria.filter(
-                pk=oferta_categoria_id
-            ).first()
-
-            if not oferta_categoria:
-                return Response(
-                    {"detail": "La oferta categoría enviada no existe o no está asociada al módulo."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-
         elif oferta_academica_id:
             try:
                 oferta_academica_id = int(oferta_academica_id)
@@ -167,49 +335,12 @@ class InscripcionViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            oferta_categoria_qs = modulo.id_oferta_categoria.filter(
-                id_oferta_academica=oferta_academica_id
-            )
-
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.filter(
-                    estado=True, id_oferta_academica__estado='inscripcion'
-                )
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.filter(estado=True)
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.all()
-
-            oferta_categoria = oferta_categoria_qs.first()
-
-        else:
-            oferta_categoria_qs = modulo.id_oferta_categoria.all()
-
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.filter(estado=True, id_oferta_academica__estado='inscripcion')
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.filter(estado=True)
-            if not oferta_categoria_qs.exists():
-                oferta_categoria_qs = modulo.id_oferta_categoria.all()
-
-            oferta_categoria = oferta_categoria_qs.first()
+        oferta, error = elegir_oferta_categoria(candidatas, oferta_categoria_id, oferta_academica_id)
+        if error:
+            return Response({"detail": error}, status=status.HTTP_400_BAD_REQUEST)
 
-        if not oferta_categoria:
-            return Response(
-                {"detail": "El módulo no tiene una oferta de categoría asociada."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        oferta_academica = oferta_categoria.id_oferta_academica
-
-        if oferta_categoria.estado or oferta_academica.estado == 'inscripcion' or oferta_academica.estado == 'desarrollo':
-            data["id_oferta_categoria"] = oferta_categoria.id_oferta_categoria
-            data["oferta_academica"] = oferta_academica.id_oferta_academica
-        else:
-            return Response(
-                {"detail": "La oferta categoria o academica no esta activa"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        data["id_oferta_categoria"] = oferta.id_oferta_categoria
+        data["oferta_academica"] = oferta.id_oferta_academica
 
 
         # Forzar que la constancia siempre sea True por requerimiento temporal
@@ -273,12 +404,12 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             data = request.data.copy()
             instance = self.get_object()
 
-            # Procesa archivos, pero puedes guardar el estado antes/después si lo deseas
-            file_update(instance, data, 'recibo_pago')
-            file_update(instance, data, 'constancia')
-            file_update(instance, data, 'certificado')
-            file_update(instance, data, 'certificado_academico')
-            file_update(instance, data, 'recibo_servicio')
+            # Procesa archivos y los guarda con una sola escritura
+            archivos_actualizados = [
+                campo for campo in CAMPOS_ARCHIVO if file_update(instance, data, campo)
+            ]
+            if archivos_actualizados:
+                instance.save(update_fields=archivos_actualizados)
 
             serializer = self.get_serializer(instance, data=data, partial=True)
             serializer.is_valid(raise_exception=True)
@@ -335,55 +466,12 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         certificado_nuevo = instance.verificacion_certificado
         recibo_servicio_nuevo = instance.verificacion_recibo_servicio
 
-        # Check if there are any uploaded files
-        has_uploaded_files = bool(
-            instance.recibo_pago or
-            instance.constancia or
-            instance.certificado or
-            instance.recibo_servicio
-        )
+        # Recalcula el estado en SQL con la regla compartida (inscripcion/estados.py)
+        recalcular_estados(Inscripcion.objects.filter(pk=instance.pk))
+        instance.refresh_from_db(fields=['estado'])
 
-        estudiante_verificado = instance.id_estudiante.verificacion_informacion if instance.id_estudiante else False
-
-        if has_uploaded_files:
-            # Evaluamos el estado basándonos en documentos que existen
-            documentos_verificados = []
-            if instance.recibo_pago:
-                documentos_verificados.append(recibo_pago_nuevo)
-            if instance.constancia:
-                documentos_verificados.append(constancia_nuevo)
-            if instance.certificado:
-                documentos_verificados.append(certificado_nuevo)
-            if instance.recibo_servicio:
-                documentos_verificados.append(recibo_servicio_nuevo)
-
-            # Asigna el estado correcto
-            if all(documentos_verificados) and estudiante_verificado:
-                instance.estado = "Revisado"
-            elif any(documentos_verificados) or estudiante_verificado:
-                instance.estado = "Pendiente"
-            else:
-                instance.estado = "No revisado"
-        else:
-            # Si no hay archivos subidos, el estado depende de si el administrador
-            # ha verificado explícitamente algún campo (excluyendo constancia que es forzada a True)
-            verificaciones_manuales = [recibo_pago_nuevo, certificado_nuevo, recibo_servicio_nuevo]
-            
-            if any(verificaciones_manuales):
-                if estudiante_verificado:
-                    instance.estado = "Revisado"
-                else:
-                    instance.estado = "Pendiente"
-            else:
-                instance.estado = "No revisado"
-
-        instance.save(update_fields=['estado'])
-
-        # Busca el último logentry después de guardar
-        logentry = LogEntry.objects.filter(
-            object_id=instance.pk,
-            content_type__model='inscripcion'
-        ).order_by('-timestamp').first()
+        # Entrada de auditoría capturada al guardar (ver cuenta/auditoria.py)
+        logentry = entrada_auditoria(instance)
 
         # Solo actualiza el campo de auditoría si el valor fue cambiado
         campos_actualizados = []
@@ -409,19 +497,11 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Elimina los archivos de S3 si existen
-        if instance.recibo_pago:
-            instance.recibo_pago.delete(save=False)
-        if instance.constancia:
-            instance.constancia.delete(save=False)
-        if instance.certificado:
-            instance.certificado.delete(save=False)
-        if instance.certificado_academico:
-            instance.certificado_academico.delete(save=False)
-        if instance.recibo_servicio:
-            instance.recibo_servicio.delete(save=False)
-        # Ahora elimina la instancia del modelo
-        return super().destroy(request, *args, **kwargs)
+        with transaction.atomic():
+            response = super().destroy(request, *args, **kwargs)
+            # Los archivos se borran en un solo lote, y solo si se confirma la eliminación
+            borrar_archivos_al_confirmar(archivos_de([instance]))
+        return response
 
     #Filtros
     @swagger_auto_schema(
@@ -431,12 +511,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     @action (detail=False, methods=['get'], url_path='filtro-vinculacion',
             permission_classes=[IsAdministrador])
     def filtro_tipo_vinculacion(self, request, *args, **kwargs):
-        tipo_vinculacion = request.query_params.get('tipo_vinculacion', None)
-        queryset = self.get_queryset()
-        if tipo_vinculacion:
-            queryset = queryset.filter(tipo_vinculacion=tipo_vinculacion)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Equivale a GET /inscripcion/?tipo_vinculacion= (ver InscripcionFilter)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._lista_inscripciones(queryset)
 
     @swagger_auto_schema(
         operation_summary="Filtrar inscripcion por estado (Activo o Inactivo)",
@@ -445,12 +522,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     @action (detail=False, methods=['get'], url_path='filtro-estado',
             permission_classes=[IsAdministrador])
     def filtro_estado(self, request, *args, **kwargs):
-        estado = request.query_params.get('estado', None)
-        queryset = self.get_queryset()
-        if estado:
-            queryset = queryset.filter(estado=estado)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Equivale a GET /inscripcion/?estado= (ver InscripcionFilter)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._lista_inscripciones(queryset)
 
     @swagger_auto_schema(
         operation_summary="Filtrar inscripcion por grupo",
@@ -459,23 +533,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     @action (detail=False, methods=['get'], url_path='filtro-grupo',
             permission_classes=[IsAdministrador])
     def filtro_grupo(self, request, *args, **kwargs):
-        grupo = request.query_params.get('grupo', None)
-        
-        # Obtener queryset base y optimizar la consulta para Grupo y Profesor
-        queryset = self.get_queryset().select_related('grupo', 'grupo__profesor') 
-
-        if grupo:
-            # Caso 1: Filtrar por grupos nulos
-            if grupo.lower() in ['null', 'none']:
-                # Aplica el filtro para registros donde el campo 'grupo' es NULL
-                queryset = queryset.filter(grupo__isnull=True)
-            
-            # Caso 2: Filtrar por un ID de grupo específico
-            else:
-                # Filtra por el ID/valor del grupo
-                # Usamos 'grupo__pk' para asegurar que filtramos por la clave foránea
-                queryset = queryset.filter(grupo__pk=grupo)
-            
+        # ?grupo=<id> o ?grupo=null para los registros sin grupo (ver InscripcionFilter)
+        queryset = self.filter_queryset(self.get_queryset()).select_related('grupo', 'grupo__profesor')
+
         # El serializador InscripcionInfProfeSerializer mostrará el profesor
         serializer = InscripcionInfProfeSerializer(queryset, many=True)
         return Response(serializer.data)
@@ -487,13 +547,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     @action (detail=False, methods=['get'], url_path='filtro-estudiante',
             permission_classes=[IsEstudianteOrAdministrador])
     def filtro_estudiante(self, request, *args, **kwargs):
-        estudiante = request.query_params.get('id_estudiante', None)
-        queryset = self.get_queryset()
-
-        if estudiante:
-            queryset = queryset.filter(id_estudiante=estudiante)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Equivale a GET /inscripcion/?id_estudiante= (ver InscripcionFilter)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._lista_inscripciones(queryset)
 
     @swagger_auto_schema(
         operation_summary="Buscar inscripciones por número de documento del estudiante",
@@ -529,18 +585,17 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         # Normalizar: quitar espacios al inicio/fin
         numero_documento = numero_documento.strip()
 
-        # Verificar si el estudiante existe primero
-        from estudiante.models import Estudiante
-        estudiante_qs = Estudiante.objects.filter(numero_documento=numero_documento)
-        if not estudiante_qs.exists():
+        # Verificar si el estudiante existe primero (desde la caché, ver cuenta/identidad.py)
+        identidad = resolver(numero_documento, 'estudiante')
+        if identidad is None:
             return Response(
                 {"detail": f"No existe ningún estudiante con el número de documento '{numero_documento}'."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Buscar inscripciones del estudiante
+        # Buscar inscripciones del estudiante por el índice de la llave foránea
         queryset = self.get_queryset().filter(
-            id_estudiante__numero_documento=numero_documento
+            id_estudiante_id=identidad.perfil_id
         ).select_related('id_estudiante', 'id_modulo', 'grupo', 'oferta_academica')
 
         # Filtro opcional por período académico
@@ -548,8 +603,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         if oferta_academica_id:
             queryset = queryset.filter(oferta_academica__id_oferta_academica=oferta_academica_id)
 
-        if not queryset.exists():
-            estudiante = estudiante_qs.first()
+        inscripciones = list(queryset)
+        if not inscripciones:
+            estudiante = Estudiante.objects.only('nombre', 'apellido', 'numero_documento').get(pk=identidad.perfil_id)
             return Response(
                 {
                     "detail": f"El estudiante '{estudiante.nombre} {estudiante.apellido}' existe pero no tiene inscripciones registradas.",
@@ -562,7 +618,7 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             )
 
         result = []
-        for inscripcion in queryset:
+        for inscripcion in inscripciones:
             estudiante = inscripcion.id_estudiante
             result.append({
                 "id_inscripcion": inscripcion.id_inscripcion,
@@ -578,13 +634,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path="filtro-modulo",
             permission_classes=[IsAdministrador])
     def filtro_modulo(self, request):
-        modulo = request.query_params.get('id_modulo', None)
-        queryset = self.get_queryset()
-
-        if modulo:
-            queryset = queryset.filter(id_modulo=modulo)
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        # Equivale a GET /inscripcion/?id_modulo= (ver InscripcionFilter)
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._lista_inscripciones(queryset)
 
     
     @action(detail=False, methods=['get'], url_path="auditoria-matricula",
@@ -599,56 +651,18 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             permission_classes=[IsAdministrador])
     def matricula_grupo(self, request):
         from grupo.models import Grupo
-        all_groups = Grupo.objects.select_related('profesor', 'monitor_academico').all()
+        all_groups = Grupo.objects.select_related('profesor', 'monitor_academico', 'oferta_academica').all()
         
         groups = OrderedDict()
         for grupo in all_groups:
-            gid = grupo.id
-            nombre_grupo = str(grupo.nombre)
-            periodo_nombre = grupo.oferta_academica.nombre if grupo.oferta_academica else "NO ASIGNADO"
-            
-            if grupo.profesor:
-                profesor_data = {
-                    'id': grupo.profesor.id,
-                    'nombre': str(grupo.profesor.nombre) + " " + str(grupo.profesor.apellido),
-                }
-            else:
-                profesor_data = None 
-
-            if grupo.monitor_academico:
-                monitor_academico_data = {
-                    'id' : grupo.monitor_academico.id,
-                    'nombre' : str(grupo.monitor_academico.nombre) + " " + str(grupo.monitor_academico.apellido),
-                }
-            else:
-                monitor_academico_data = None
-
-            groups[gid] = {
-                'grupo_id': gid,
-                'nombre': nombre_grupo,
-                'periodo': periodo_nombre,
-                'profesor': profesor_data,
-                'monitor': monitor_academico_data,
-                'matriculas': []
-            }
+            groups[grupo.id] = {**cabecera_grupo(grupo), 'matriculas': []}
         
         # Estudiantes sin grupo (gid = None)
-        groups[None] = {
-            'grupo_id': None,
-            'nombre': "NO ASIGNADO",
-            'periodo': "NO ASIGNADO",
-            'profesor': None,
-            'monitor': None,
-            'matriculas': []
-        }
+        groups[None] = {**cabecera_grupo(None), 'matriculas': []}
 
-        qs = Inscripcion.objects.select_related(
-            'grupo', 
-            'id_estudiante', 
-            'id_modulo', 
-            'id_oferta_categoria',
-            'id_oferta_categoria__id_oferta_academica'
-        ).all().order_by('grupo_id', 'id_inscripcion')
+        qs = InscripcionSerializer.setup_eager_loading(
+            Inscripcion.objects.select_related('grupo')
+        ).order_by('grupo_id', 'id_inscripcion')
 
         for ins in qs:
             gid = ins.grupo_id  # puede ser None
@@ -675,6 +689,151 @@ class InscripcionViewSet(viewsets.ModelViewSet):
 
         return Response(result, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        operation_summary="Preparar la subida directa de documentos",
+        operation_description=(
+            "Recibe `{\"archivos\": {\"recibo_pago\": \"pdf\", ...}}` y retorna, por campo, la URL "
+            "(y campos del formulario) para subir el archivo directamente al almacenamiento, "
+            "más un `token` para confirmar con `subidas/completar`."
+        ),
+    )
+    @action(detail=True, methods=['post'], url_path="subidas")
+    def subidas(self, request, pk=None):
+        inscripcion = self.get_object()
+        archivos = request.data.get('archivos')
+        if not isinstance(archivos, dict) or not archivos:
+            return Response(
+                {"detail": "Debes enviar 'archivos' como {campo: extension}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            return Response(preparar_subidas(inscripcion, archivos, request), status=status.HTTP_200_OK)
+        except SubidaInvalida as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    @swagger_auto_schema(
+        operation_summary="Confirmar la subida directa de documentos",
+        operation_description="Registra en una sola escritura los archivos subidos con el `token` de `subidas`."
+    )
+    @action(detail=True, methods=['post'], url_path="subidas/completar")
+    def completar_subida(self, request, pk=None):
+        inscripcion = self.get_object()
+        token = request.data.get('token')
+        if not token:
+            return Response({"detail": "El token es requerido."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            with set_actor(request.user):
+                actualizados = completar_subidas(inscripcion, token)
+        except SubidaInvalida as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"actualizados": actualizados, "inscripcion": self.get_serializer(inscripcion).data},
+            status=status.HTTP_200_OK
+        )
+
+    @swagger_auto_schema(auto_schema=None)
+    @action(detail=False, methods=['put'], url_path="subida-local")
+    def subida_local(self, request):
+        """Reemplazo local del POST prefirmado de S3 (solo sin USE_S3)."""
+        almacenamiento = obtener_almacenamiento()
+        if not hasattr(almacenamiento, 'guardar'):
+            return Response({"detail": "No disponible con almacenamiento S3."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            # El cuerpo del PUT es el archivo crudo, igual que en una subida a S3
+            nombre = almacenamiento.guardar(request.query_params.get('token', ''), request.body)
+        except SubidaInvalida as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"nombre": nombre}, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_summary="Carga masiva de inscripciones",
+        operation_description=(
+            "Recibe una lista JSON de inscripciones (o `{\"inscripciones\": [...]}`) o un archivo CSV "
+            "en el campo `archivo`. Cada fila requiere `id_estudiante` o `numero_documento`, "
+            "`id_modulo` y `tipo_vinculacion`; opcionalmente `id_oferta_categoria`, "
+            "`oferta_academica`, `grupo`, `terminos` y `observaciones`. "
+            "Las filas válidas se crean en una sola transacción y se retorna el resultado por fila."
+        ),
+    )
+    @action(detail=False, methods=['post'], url_path="carga-masiva",
+            permission_classes=[IsAdministrador],
+            parser_classes=[JSONParser, MultiPartParser, FormParser])
+    def carga_masiva(self, request):
+        archivo = request.FILES.get('archivo')
+        if archivo:
+            if not archivo.name.lower().endswith('.csv'):
+                return Response({"error": "El archivo debe ser .csv."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                filas = leer_csv(archivo)
+            except (UnicodeDecodeError, csv.Error) as exc:
+                return Response({"error": f"No se pudo leer el archivo CSV: {exc}"}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            filas = request.data
+            if isinstance(filas, dict):
+                filas = filas.get('inscripciones')
+
+        if not isinstance(filas, list) or not filas:
+            return Response(
+                {"error": "Debes enviar una lista de inscripciones o un archivo CSV en el campo \"archivo\"."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not all(isinstance(fila, dict) for fila in filas):
+            return Response({"error": "Cada inscripción debe ser un objeto."}, status=status.HTTP_400_BAD_REQUEST)
+
+        resultado = procesar_lote(filas)
+        return Response({"mensaje": "Carga finalizada.", **resultado}, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Matrículas por grupo en streaming (NDJSON)",
+        operation_description=(
+            "Versión paginada y en streaming de matricula-grupo. Cada línea es un objeto JSON.\n"
+            "- Sin `grupo`: por cada grupo emite una línea `tipo=grupo` (cabecera y cantidad) y una "
+            "línea `tipo=matriculas` con la primera página y su `siguiente_cursor`.\n"
+            "- Con `grupo` (id o `null` para los sin grupo) y `cursor`: emite solo la siguiente "
+            "página de ese grupo."
+        ),
+        manual_parameters=[
+            openapi.Parameter('periodo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="ID de la oferta académica"),
+            openapi.Parameter('grupo', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                              description="ID del grupo a paginar o 'null' para los estudiantes sin grupo"),
+            openapi.Parameter('cursor', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description="Último id_inscripcion recibido del grupo"),
+            openapi.Parameter('limite', openapi.IN_QUERY, type=openapi.TYPE_INTEGER,
+                              description=f"Matrículas por página (máximo {LIMITE_MAXIMO_STREAM})"),
+        ]
+    )
+    @action(detail=False, methods=['get'], url_path="matricula-grupo/stream",
+            permission_classes=[IsAdministrador])
+    def matricula_grupo_stream(self, request):
+        from grupo.models import Grupo
+
+        try:
+            limite = int(request.query_params.get('limite', LIMITE_DEFECTO_STREAM))
+            cursor = int(request.query_params.get('cursor', 0))
+            periodo = request.query_params.get('periodo')
+            periodo = int(periodo) if periodo not in (None, '') else None
+            grupo = request.query_params.get('grupo')
+            if grupo not in (None, '', 'null'):
+                grupo = int(grupo)
+        except ValueError:
+            return Response(
+                {"error": "Los parámetros periodo, grupo, cursor y limite deben ser numéricos"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limite = max(1, min(limite, LIMITE_MAXIMO_STREAM))
+
+        if grupo in (None, ''):
+            lineas = _stream_grupos(periodo, limite)
+        else:
+            grupo_id = None if grupo == 'null' else grupo
+            if grupo_id is not None and not Grupo.objects.filter(id=grupo_id).exists():
+                return Response({"detail": "Grupo no encontrado."}, status=status.HTTP_404_NOT_FOUND)
+            lineas = _stream_pagina(grupo_id, periodo, cursor, limite)
+
+        response = StreamingHttpResponse(lineas, content_type='application/x-ndjson')
+        response['Cache-Control'] = 'no-cache'
+        return response
 
 
     @action(detail=False, methods=['get'], url_path="dashboard",
@@ -687,11 +846,21 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         tipo_vinculacion = request.query_params.get('tipo_vinculacion', None)
         estamento = request.query_params.get('estamento', None)
 
-        # Base queryset para inscripciones con filtro opcional
+        # Las distribuciones salen de la tabla pre-agregada (una sola lectura indexada)
+        filas_resumen = resumen_filtrado(
+            periodo=periodo_id,
+            modulo=modulo_id,
+            area=area_id,
+            tipo_vinculacion=tipo_vinculacion,
+            estamento=estamento,
+        )
+        distribucion = distribuciones(filas_resumen)
+        total_enrollments = distribucion['totalEnrollments']
+
+        # Queryset de inscripciones filtrado, solo para las inscripciones recientes
         inscripciones_qs = Inscripcion.objects.all()
         estudiantes_qs = Estudiante.objects.all()
 
-        # Filtrar inscripciones
         if periodo_id and periodo_id != 'all':
             inscripciones_qs = inscripciones_qs.filter(oferta_academica_id=periodo_id)
         if modulo_id and modulo_id != 'all' and modulo_id != '':
@@ -699,9 +868,9 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         if area_id and area_id != 'all' and area_id != '':
             inscripciones_qs = inscripciones_qs.filter(id_modulo__id_area_id=area_id)
         if tipo_vinculacion and tipo_vinculacion != 'all' and tipo_vinculacion != '':
-            inscripciones_qs = inscripciones_qs.filter(tipo_vinculacion__iexact=tipo_vinculacion)
+            inscripciones_qs = InscripcionFilter().filtrar_tipo_vinculacion(inscripciones_qs, 'tipo_vinculacion', tipo_vinculacion)
         if estamento and estamento != 'all' and estamento != '':
-            inscripciones_qs = inscripciones_qs.filter(id_estudiante__estamento__iexact=estamento)
+            inscripciones_qs = InscripcionFilter().filtrar_estamento(inscripciones_qs, 'estamento', estamento)
 
         # Filtrar estudiantes registrados por periodo
         if periodo_id and periodo_id != 'all':
@@ -726,101 +895,14 @@ class InscripcionViewSet(viewsets.ModelViewSet):
 
         # Filtrar estudiantes registrados por estamento si aplica
         if estamento and estamento != 'all' and estamento != '':
-            estudiantes_qs = estudiantes_qs.filter(estamento__iexact=estamento)
+            estudiantes_qs = estudiantes_qs.alias(estamento_lower=Lower('estamento')).filter(estamento_lower=estamento.lower())
 
         # totales
-        total_enrollments = inscripciones_qs.count()
         total_register = estudiantes_qs.count()
         active_modules = Modulo.objects.filter(estado=True).count()
         total_profesores = Profesor.objects.count()
         total_monitores = MonitorAcademico.objects.count()
 
-        # inscripciones por módulo (usando el queryset filtrado)
-        enrollments_by_module_qs = (
-            inscripciones_qs
-            .filter(id_modulo__isnull=False)
-            .values('id_modulo__nombre_modulo', 'id_modulo__id_area__nombre_area')
-            .annotate(enrollments=Count('pk'))
-            .order_by('-enrollments')
-        )
-        enrollments_by_module = [
-            {
-                "name": item['id_modulo__nombre_modulo'],
-                "enrollments": item['enrollments'],
-                "area": item['id_modulo__id_area__nombre_area'],
-            }
-            for item in enrollments_by_module_qs
-        ]
-
-        # inscripciones por módulo y género (usando el queryset filtrado)
-        enrollments_gender_qs = (
-            inscripciones_qs
-            .filter(id_modulo__isnull=False)
-            .values(
-                'id_modulo__nombre_modulo',
-                gender=Coalesce(Lower('id_estudiante__genero'), Value('desconocido'))
-            )
-            .annotate(count=Count('pk'))
-            .order_by('id_modulo__nombre_modulo', 'gender')
-        )
-
-        enrollments_by_module_and_gender = []
-        current_module = None
-        gender_breakdown = {}
-
-        for item in enrollments_gender_qs:
-            module_name = item['id_modulo__nombre_modulo']
-            gender = item['gender'].capitalize() 
-            count = item['count']
-
-            if module_name != current_module:
-                if current_module is not None:
-                    enrollments_by_module_and_gender.append({
-                        "moduleName": current_module,
-                        "genderBreakdown": gender_breakdown
-                    })
-                
-                current_module = module_name
-                gender_breakdown = {}
-
-            gender_breakdown[gender] = count
-
-        if current_module is not None:
-            enrollments_by_module_and_gender.append({
-                "moduleName": current_module,
-                "genderBreakdown": gender_breakdown
-            })
-
-        # inscripciones por estamento (usando el queryset filtrado)
-        estamento_qs = (
-            inscripciones_qs
-            .values(estamento=Coalesce('id_estudiante__estamento', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        enrollments_by_estamento = []
-        for item in estamento_qs:
-            count = item['count']
-            percentage = round((count / total_enrollments) * 100) if total_enrollments else 0
-            estamento = item['estamento'] or 'Desconocido'
-            enrollments_by_estamento.append({
-                "estamento": estamento.capitalize(),
-                "count": count,
-                "percentage": int(percentage),
-            })
-
-        # inscripciones por grado (usando el queryset filtrado)
-        grade_qs = (
-            inscripciones_qs
-            .values(grade=Coalesce('id_estudiante__grado', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        enrollments_by_grade = [
-            {"grade": item['grade'], "count": item['count']}
-            for item in grade_qs
-        ]
-
         # inscripciones recientes (usando el queryset filtrado)
         recent_qs = (
             inscripciones_qs
@@ -842,54 +924,6 @@ class InscripcionViewSet(viewsets.ModelViewSet):
                 "status": status,
             })
 
-        # distribución por género (usando el queryset filtrado)
-        gender_qs = (
-            inscripciones_qs
-            .values(gender=Coalesce('id_estudiante__genero', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        gender_distribution = [
-            {"gender": item['gender'], "count": item['count']}
-            for item in gender_qs
-        ]
-
-        # distribución por estrato (usando el queryset filtrado)
-        estrato_qs = (
-            inscripciones_qs
-            .values(estrato=Coalesce('id_estudiante__estrato', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        estrato_distribution = [
-            {"estrato": item['estrato'] or 'Desconocido', "count": item['count']}
-            for item in estrato_qs
-        ]
-
-        # distribución por vinculación (usando el queryset filtrado)
-        vinculacion_qs = (
-            inscripciones_qs
-            .values(vinculacion=Coalesce('tipo_vinculacion', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        vinculacion_distribution = [
-            {"type": item['vinculacion'], "count": item['count']}
-            for item in vinculacion_qs
-        ]
-
-        # distribución por municipio (usando el queryset filtrado)
-        municipio_qs = (
-            inscripciones_qs
-            .values(municipio=Coalesce('id_estudiante__ciudad_residencia', Value('Desconocido')))
-            .annotate(count=Count('pk'))
-            .order_by('-count')
-        )
-        municipio_distribution = [
-            {"municipality": item['municipio'] or 'Desconocido', "count": item['count']}
-            for item in municipio_qs
-        ]
-
         # indicadores
         inscritosMatriculados = (total_enrollments / total_register * 100) if total_register > 0 else 0
         inscritosNoMatriculados = 100 - inscritosMatriculados if total_register > 0 else 0
@@ -910,7 +944,7 @@ class InscripcionViewSet(viewsets.ModelViewSet):
         modulos_options = list(Modulo.objects.filter(estado=True).values('id_modulo', 'nombre_modulo', 'id_area_id'))
         areas_options = list(Area.objects.filter(estado_area=True).values('id_area', 'nombre_area'))
         
-        vinculaciones_unicas = list(Inscripcion.objects.values_list('tipo_vinculacion', flat=True).distinct())
+        vinculaciones_unicas = list(ResumenInscripcion.objects.filter(cantidad__gt=0).values_list('tipo_vinculacion', flat=True).distinct())
         vinculaciones_options = sorted(list(set([v for v in vinculaciones_unicas if v])))
         
         estamentos_unicos = list(Estudiante.objects.values_list('estamento', flat=True).distinct())
@@ -922,15 +956,15 @@ class InscripcionViewSet(viewsets.ModelViewSet):
             "activeModules": active_modules,
             "totalProfessors": total_profesores,
             "totalMonitors": total_monitores,
-            "enrollmentsByModuleAndGender": enrollments_by_module_and_gender, 
-            "enrollmentsByModule": enrollments_by_module,
-            "enrollmentsByEstamento": enrollments_by_estamento,
-            "enrollmentsByGrade": enrollments_by_grade,
+            "enrollmentsByModuleAndGender": distribucion['enrollmentsByModuleAndGender'],
+            "enrollmentsByModule": distribucion['enrollmentsByModule'],
+            "enrollmentsByEstamento": distribucion['enrollmentsByEstamento'],
+            "enrollmentsByGrade": distribucion['enrollmentsByGrade'],
             "recentEnrollments": recent_enrollments,
-            "genderDistribution": gender_distribution,
-            "estratoDistribution": estrato_distribution,
-            "vinculacionDistribution": vinculacion_distribution,
-            "municipioDistribution": municipio_distribution,
+            "genderDistribution": distribucion['genderDistribution'],
+            "estratoDistribution": distribucion['estratoDistribution'],
+            "vinculacionDistribution": distribucion['vinculacionDistribution'],
+            "municipioDistribution": distribucion['municipioDistribution'],
             "inscritosMatriculados": round(inscritosMatriculados, 2),
             "inscritosNoMatriculados": round(inscritosNoMatriculados, 2),
             "periodo_filtrado": periodo_id,
@@ -945,90 +979,34 @@ class InscripcionViewSet(viewsets.ModelViewSet):
 
         return Response(payload)
     import sys
+    @swagger_auto_schema(
+        operation_summary="Coordenadas de residencia de los estudiantes inscritos",
+        operation_description=(
+            "Retorna las coordenadas guardadas en la caché de geocodificación. Las direcciones "
+            "nuevas o modificadas quedan como pendientes (`encontrado` en falso) hasta que se "
+            "ejecute el comando `geocodificar_direcciones`. La cobertura está en `geocodificacion/cobertura`."
+        )
+    )
     @action(detail=False, methods=['get'], url_path="geocodificacion",
             permission_classes=[IsAdministrador])
     def geocodificacion(self, request):
         """
-        Geocodifica la dirección de residencia de todos los estudiantes
-        y retorna las coordenadas (Latitud, Longitud).
+        Retorna las coordenadas (Latitud, Longitud) de la dirección de residencia
+        de los estudiantes inscritos, leídas de la caché persistente.
         """
-        
-        # 1. Inicializa el geocodificador (solo una vez)
-        try:
-            # Es crucial especificar un user_agent único y descriptivo
-            geolocator = Nominatim(user_agent="semillero_estudiantes_v1")
-        except GeocoderServiceError as e:
-            return Response(
-                {"error": f"Error al inicializar el geocodificador: {e}"},
-                status=status.HTTP_503_SERVICE_UNAVAILABLE
-            )
-
-        # 2. Obtener los datos con Carga Ansiosa (Eager Loading)
-        # ❗ Corrección: Usar select_related() para evitar N+1 consultas a la BD
-        # Asume que 'id_estudiante' es el nombre de la relación ForeignKey
-        try:
-            inscripciones = self.get_queryset().select_related('id_estudiante')
-        except Exception as e:
-            return Response(
-                {"error": f"Error al obtener las inscripciones: {e}"},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-
-        resultados = []
-        
-        # El print para debug ahora usa el queryset precargado
-        if inscripciones.exists(): # Verifica que haya elementos antes de intentar acceder al índice
-            print(inscripciones[0].id_estudiante.direccion_residencia, flush=True)
-
-        # 3. Iterar y Geocodificar
-        for inscripcion in inscripciones:
-            # Acceso directo y eficiente al estudiante precargado
-            estudiante = inscripcion.id_estudiante
-            
-            # Validar si el estudiante existe (aunque con select_related() ya debería estar precargado)
-            if not estudiante:
-                print(f"Advertencia: Inscripción con ID {inscripcion.pk} no tiene estudiante asociado.")
-                continue
-                
-            # Construir la dirección completa para la geocodificación
-            direccion_completa = (
-                f"{estudiante.direccion_residencia}, "
-                f"{estudiante.comuna_residencia}, "
-                f"{estudiante.ciudad_residencia}, "
-                f"{estudiante.departamento_residencia}"
-            )
-
-            latitud = None
-            longitud = None
-            location = None
-            
-            try:
-                # Servicio de geocodificación. Usar timeout para evitar esperas largas.
-                location = geolocator.geocode(direccion_completa, timeout=10)
-
-                # Procesar el resultado
-                if location:
-                    latitud = location.latitude
-                    longitud = location.longitude
-                    
-            except (GeocoderTimedOut, GeocoderServiceError) as e:
-                # Manejo de errores de red o del servicio de geocodificación
-                print(f"Error geocodificando '{direccion_completa}': {e}")
-                
-            except Exception as e:
-                # Otro error inesperado
-                print(f"Error inesperado procesando '{direccion_completa}': {e}")
-                
-            # 4. Agregar el resultado a la lista de respuesta
-            resultados.append({
-                "id": estudiante.id_estudiante,
-                "nombre_completo": f"{estudiante.nombre} {estudiante.apellido}", # Asumiendo campos
-                "direccion_texto": direccion_completa,
-                "latitud": latitud,
-                "longitud": longitud,
-                "encontrado": bool(location)
-            })
-
-        # 5. Retornar JSON al frontend
+        resultados, _ = coordenadas_inscripciones(self.get_queryset())
         return Response(resultados, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        operation_summary="Cobertura de la caché de geocodificación",
+        operation_description=(
+            "Cuántas inscripciones tienen coordenadas encontradas, no encontradas o pendientes "
+            "de geocodificar, y el porcentaje encontrado."
+        )
+    )
+    @action(detail=False, methods=['get'], url_path="geocodificacion/cobertura",
+            permission_classes=[IsAdministrador])
+    def geocodificacion_cobertura(self, request):
+        _, cobertura = coordenadas_inscripciones(self.get_queryset())
+        return Response(cobertura, status=status.HTTP_200_OK)
+
@@ -0,0 +1,76 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from cuenta.contrasenas import crear_usuarios_lote
+from cuenta.models import CustomUser
+from login.views import LoginView
+
+PREFIJO = 'carga-login-'
+
+
+class Command(BaseCommand):
+    help = (
+        "Prueba de carga del login: crea usuarios temporales, inicia sesión con "
+        "ellos desde varios hilos y reporta p50/p95/p99 y consultas por login"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=50,
+                            help="Usuarios temporales a crear")
+        parser.add_argument('--concurrencia', type=int, default=10,
+                            help="Inicios de sesión simultáneos")
+        parser.add_argument('--rondas', type=int, default=3,
+                            help="Veces que inicia sesión cada usuario")
+        parser.add_argument('--p99-maximo', type=float, default=None,
+                            help="Falla si el p99 (ms) supera este valor")
+
+    def _login(self, username):
+        vista = LoginView.as_view()
+        factory = APIRequestFactory()
+        try:
+            inicio = time.perf_counter()
+            respuesta = vista(factory.post('/login/', {'numero_documento': username, 'contrasena': username}, format='json'))
+            return (time.perf_counter() - inicio) * 1000, respuesta.status_code
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        CustomUser.objects.filter(username__startswith=PREFIJO).delete()
+        usuarios = crear_usuarios_lote(
+            [{'username': f'{PREFIJO}{i}'} for i in range(options['usuarios'])], user_type='profesor'
+        )
+        nombres = [usuario.username for usuario in usuarios]
+        try:
+            # Consultas de un login con el token ya creado
+            self._login(nombres[0])
+            with CaptureQueriesContext(connection) as consultas:
+                self._login(nombres[0])
+            consultas_por_login = len(consultas)
+
+            peticiones = nombres * options['rondas']
+            inicio = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['concurrencia']) as pool:
+                resultados = list(pool.map(self._login, peticiones))
+            duracion = time.perf_counter() - inicio
+        finally:
+            CustomUser.objects.filter(username__startswith=PREFIJO).delete()
+
+        tiempos = [tiempo for tiempo, _ in resultados]
+        fallidos = sum(1 for _, codigo in resultados if codigo != 200)
+        percentiles = statistics.quantiles(tiempos, n=100, method='inclusive')
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+        self.stdout.write(
+            f"Logins: {len(tiempos)} ({fallidos} fallidos) en {duracion:.2f} s "
+            f"({len(tiempos) / duracion:.1f}/s) con {options['concurrencia']} hilos\n"
+            f"Consultas por login: {consultas_por_login}\n"
+            f"p50: {p50:.1f} ms | p95: {p95:.1f} ms | p99: {p99:.1f} ms"
+        )
+        if fallidos or (options['p99_maximo'] is not None and p99 > options['p99_maximo']):
+            raise SystemExit(1)
+        self.stdout.write(self.style.SUCCESS("Prueba de carga superada."))
@@ -1,3 +1,31 @@
-from django.test import TestCase
+import pytest
+from rest_framework.test import APIClient
+from rest_framework.authtoken.models import Token
 
-# Create your tests here.
+
+@pytest.mark.django_db
+def test_login_resuelve_token_y_perfil_en_una_consulta(estudiante_instance, django_assert_num_queries):
+    user = estudiante_instance.user
+    user.username = estudiante_instance.numero_documento
+    user.set_password('clave-login')
+    user.save()
+    token = Token.objects.create(user=user)
+    client = APIClient()
+
+    datos = {'numero_documento': estudiante_instance.numero_documento, 'contrasena': 'clave-login'}
+    with django_assert_num_queries(1):
+        respuesta = client.post('/login/', datos, format='json')
+
+    assert respuesta.status_code == 200
+    assert respuesta.data == {'token': token.key, 'tipo_usuario': 'estudiante', 'id': estudiante_instance.pk}
+
+
+@pytest.mark.django_db
+def test_login_crea_el_token_en_el_primer_inicio(test_user):
+    test_user.set_password('clave-login')
+    test_user.save()
+
+    respuesta = APIClient().post('/login/', {'numero_documento': 'test_user', 'contrasena': 'clave-login'}, format='json')
+
+    assert respuesta.status_code == 200
+    assert respuesta.data['token'] == Token.objects.get(user=test_user).key
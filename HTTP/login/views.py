@@ -6,6 +6,9 @@ from rest_framework import status
 from rest_framework.authtoken.models import Token
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from django.utils import timezone
+from cuenta.backends import perfil_id
+from cuenta import sesiones
 
 
 class LoginView(APIView):
@@ -42,53 +45,36 @@ class LoginView(APIView):
         if not numero_documento or not contrasena:
             return Response({'detail': 'Falta numero_documento o contrasena'}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Usaremos el número de documento como username
-        user = authenticate(username=numero_documento, password=contrasena)
+        # Usaremos el número de documento como username. DocumentoBackend trae en
+        # la misma consulta el token y la llave del perfil (ver cuenta/backends.py)
+        user = authenticate(request, username=numero_documento, password=contrasena)
         
         if user is None:
             return Response({'detail': 'Credenciales inválidas'}, status=status.HTTP_401_UNAUTHORIZED)
 
-        token, created = Token.objects.get_or_create(user=user)
+        try:
+            token = user.auth_token
+        except Token.DoesNotExist:
+            token = None
+        expira = getattr(getattr(token, 'expiracion', None), 'expira', None) if token else None
+        if token is not None and expira is not None and expira <= timezone.now():
+            # Token vencido que el barrido aún no borró: se emite uno nuevo
+            token.delete()
+            token = None
+        if token is None:
+            # Primer inicio de sesión: get_or_create por si llegan dos a la vez
+            token, created = Token.objects.get_or_create(user=user)
+        elif sesiones.debe_renovarse(expira) and sesiones.renovar(token.key) is None:
+            # Iniciar sesión también cuenta como uso del token (TTL deslizante);
+            # si se revocó entretanto, se emite uno nuevo
+            token.delete()
+            token, created = Token.objects.get_or_create(user=user)
         
         # Obtener el ID específico según el tipo de usuario
-        user_id = None
         tipo_usuario = user.user_type
-        
-        if tipo_usuario == 'administrador':
-            try:
-                from administrador.models import Administrador
-                admin = Administrador.objects.get(numero_documento=numero_documento)
-                user_id = admin.id_administrador
-            except Exception as e:
-                print(f"Error al buscar administrador: {str(e)}")
-        elif tipo_usuario == 'profesor':
-            try:
-                from profesor.models import Profesor
-                profesor = Profesor.objects.get(numero_documento=numero_documento)
-                user_id = profesor.user.id
-            except Exception as e:
-                print(f"Error al buscar profesor: {str(e)}")
-        elif tipo_usuario == 'estudiante':
-            try:
-                from estudiante.models import Estudiante
-                estudiante = Estudiante.objects.get(numero_documento=numero_documento)
-                user_id = estudiante.id_estudiante
-            except Exception as e:
-                print(f"Error al buscar estudiante: {str(e)}")
-        elif tipo_usuario == 'monitor_academico':
-            try:
-                from monitor_academico.models import MonitorAcademico
-                monitor_academico = MonitorAcademico.objects.get(numero_documento=numero_documento)
-                user_id = monitor_academico.id
-            except Exception as e:
-                print(f"Error al buscar el monitor academico: {str(e)}")
-        elif tipo_usuario == 'monitor_administrativo':
-            try:
-                from monitor_administrativo.models import MonitorAdministrativo
-                monitor_administrativo = MonitorAdministrativo.objects.get(numero_documento=numero_documento)
-                user_id = monitor_administrativo.id
-            except Exception as e:
-                print(f"Error al buscar el monitor administrativo: {str(e)}")
+        user_id = perfil_id(user)
+        if user_id is None:
+            print(f"No se encontró el perfil {tipo_usuario} del usuario {user.id}")
         
         # Devolver token, tipo de usuario y el ID específico
         return Response({
@@ -2,8 +2,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework import serializers
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
+from cuenta.authentication import invalidar_token
+from cuenta.models import CustomUser
+from cuenta.permissions import IsAdministrador
+from cuenta.sesiones import revocar
 
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
@@ -20,4 +25,56 @@ class LogoutView(APIView):
         # Se elimina el token del usuario (al usar TokenAuthentication, request.auth corresponde al token)
         if request.auth:
             request.auth.delete()
-        return Response({'detail': 'Logout exitoso'}, status=status.HTTP_200_OK)
\ No newline at end of file
+            # La señal post_delete ya invalida la sesión; se repite por si el
+            # token se borró antes en otra petición (ver cuenta/authentication.py)
+            invalidar_token(request.auth.key)
+        return Response({'detail': 'Logout exitoso'}, status=status.HTTP_200_OK)
+
+
+class RevocarSesionesView(APIView):
+    permission_classes = [IsAdministrador]
+
+    @swagger_auto_schema(
+        operation_summary="Revocar sesiones en lote",
+        operation_description=(
+            "Cierra en una sola operación todas las sesiones vigentes de un tipo de usuario "
+            "y/o iniciadas en un periodo. La sesión de quien hace la petición se conserva "
+            "salvo que `incluir_propia` sea true."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'tipo_usuario': openapi.Schema(type=openapi.TYPE_STRING, enum=[tipo for tipo, _ in CustomUser.USER_TYPE_CHOICES]),
+                'desde': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, description='Tokens creados desde'),
+                'hasta': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, description='Tokens creados hasta'),
+                'incluir_propia': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            }
+        ),
+        responses={
+            status.HTTP_200_OK: openapi.Response('Sesiones revocadas', openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={'revocadas': openapi.Schema(type=openapi.TYPE_INTEGER)}
+            )),
+            status.HTTP_400_BAD_REQUEST: "Filtros inválidos"
+        }
+    )
+    def post(self, request):
+        tipo_usuario = request.data.get('tipo_usuario') or None
+        if tipo_usuario and tipo_usuario not in dict(CustomUser.USER_TYPE_CHOICES):
+            return Response({'detail': f"Tipo de usuario no válido: {tipo_usuario}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            desde, hasta = [
+                serializers.DateTimeField().to_internal_value(request.data[campo]) if request.data.get(campo) else None
+                for campo in ('desde', 'hasta')
+            ]
+            incluir_propia = serializers.BooleanField().to_internal_value(request.data.get('incluir_propia', False))
+        except serializers.ValidationError as e:
+            return Response({'detail': e.detail}, status=status.HTTP_400_BAD_REQUEST)
+        if not (tipo_usuario or desde or hasta):
+            return Response({'detail': 'Indique tipo_usuario, desde o hasta.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        revocadas = revocar(
+            tipo_usuario, desde, hasta,
+            excluir=None if incluir_propia else getattr(request.auth, 'key', None),
+        )
+        return Response({'revocadas': revocadas}, status=status.HTTP_200_OK)
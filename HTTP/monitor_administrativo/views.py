@@ -1,6 +1,6 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.contrib.auth.hashers import make_password
+from cuenta.contrasenas import hashear
 
 #Documentacion
 from drf_yasg.utils import swagger_auto_schema
@@ -18,12 +18,13 @@ from rest_framework.parsers import JSONParser, MultiPartParser, FormParser
 #Transacciones atomicas
 from django.db import transaction
 #Auditoria
-from auditlog.models import LogEntry
+from cuenta.auditoria import entrada_auditoria
 from .serializers import LogEntrySerializer
 from auditlog.context import set_actor
-from django.contrib.contenttypes.models import ContentType
+from cuenta.perfiles import actualizar_perfil
+from cuenta.renombrado import programar_renombrado
+from cuenta.limpieza import purgar_cuentas
 
-from rest_framework.authtoken.models import Token
 
 def file_update(instance, data, field_name):
         """
@@ -38,11 +39,6 @@ def file_update(instance, data, field_name):
             setattr(instance, field_name, uploaded_file)
             instance.save()
             data.pop(field_name)
-def extract_single_value(value):
-        if isinstance(value, list):
-            return value[0] if value else ''
-        return value
-
 class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
     """
     API endpoint para gestionar administradores.
@@ -93,8 +89,8 @@ class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
         if not data.get('contrasena'):
             data['contrasena'] = data.get('numero_documento', '')
 
-        # Hashear la contraseña
-        hashed_password = make_password(data['contrasena'])
+        # Se hashea una sola vez: el mismo hash va al usuario y al perfil (ver cuenta/contrasenas.py)
+        hashed_password = hashear(data['contrasena'])
 
         try:
             with transaction.atomic():
@@ -174,7 +170,6 @@ class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
         try:
             data = request.data.copy() 
             instance = self.get_object()
-            user = instance.user
 
             pdf_fields = [
                 'documento_identidad_pdf',
@@ -186,84 +181,15 @@ class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
                 'foto'
             ]
 
-            numero_documento_actualizado = False
-            nuevo_numero_documento = None
-
-            with set_actor(request.user):
-                # Manejar la contraseña si está presente
-                if 'contrasena' in data and data['contrasena']:
-                    new_password = extract_single_value(data.pop('contrasena'))
-                    user.set_password(new_password)
-                    user.save()
-                    hashed_password = make_password(new_password)
-                    instance.contrasena = hashed_password
-                    instance.save()
-
-                # Manejar is_active
-                if 'is_active' in data:
-                    is_active = extract_single_value(data.pop('is_active'))
-                    user.is_active = is_active
-                    user.save()
-                    instance.is_active = is_active
-                    instance.save()
-
-                # Manejar el nombre de usuario
-                if 'nombre' in data:
-                    nombre = extract_single_value(data.pop('nombre'))
-                    user.first_name = nombre
-                    user.save()
-                    instance.nombre = nombre
-                    instance.save()
-
-                # Manejar el apellido
-                if 'apellido' in data:
-                    apellido = extract_single_value(data.pop('apellido'))
-                    user.last_name = apellido
-                    user.save()
-                    instance.apellido = apellido
-                    instance.save()
-
-                # Manejar el email
-                if 'email' in data:
-                    email = extract_single_value(data.pop('email'))
-                    user.email = email
-                    user.save()
-                    instance.email = email
-                    instance.save()
-
-                # Manejar numero_documento
-                if 'numero_documento' in data:
-                    numero_documento = extract_single_value(data.pop('numero_documento'))
-                    user.username = numero_documento
-                    user.save()
-                    instance.numero_documento = numero_documento
-                    instance.save()
-                    numero_documento_actualizado = True
-                    nuevo_numero_documento = numero_documento
-
-                # Actualización de nombre de archivos PDF si numero_documento fue actualizado
-                if numero_documento_actualizado:
-                    for field in pdf_fields:
-                        file_field = getattr(instance, field, None)
-                        if file_field and hasattr(file_field, 'name') and file_field.name:
-                            import os
-                            from django.core.files.base import ContentFile
-
-                            old_file_name = file_field.name  # Ruta completa en el bucket
-                            file_content = file_field.read()  # Lee el contenido antes de borrar
-
-                            # Elimina el archivo viejo del bucket
-                            storage = file_field.storage
-                            if storage.exists(old_file_name):
-                                storage.delete(old_file_name)
-
-                            # Construye el nuevo nombre
-                            new_filename = f"{nuevo_numero_documento}.pdf"
-                            file_dir = os.path.dirname(old_file_name)
-                            new_file_path = os.path.join(file_dir, new_filename)
-
-                            # Sube el archivo con el nuevo nombre
-                            getattr(instance, field).save(new_file_path, ContentFile(file_content), save=True)
+            # Todo el partial_update en una transacción: el renombrado de archivos
+            # arranca solo después del último save de la petición
+            with set_actor(request.user), transaction.atomic():
+                # Datos de cuenta: se aplican en memoria y se guarda una vez por
+                # tabla (ver cuenta/perfiles.py)
+                if 'numero_documento' in actualizar_perfil(instance, data):
+                    # Los archivos se renombran en segundo plano al confirmar la
+                    # transacción, sin leerlos en la petición (ver cuenta/renombrado.py)
+                    programar_renombrado(instance, pdf_fields)
 
                 # Actualización normal de archivos si no hay cambio de nombre
                 file_update(instance, data, 'documento_identidad_pdf')
@@ -324,12 +250,8 @@ class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
 
         instance.save(update_fields=['estado'])
 
-        # Busca el último logentry después de guardar
-        content_type = ContentType.objects.get_for_model(instance)
-        logentry = LogEntry.objects.filter(
-            object_id=instance.pk,
-            content_type=content_type
-        ).order_by('-timestamp').first()
+        # Entrada de auditoría capturada al guardar (ver cuenta/auditoria.py)
+        logentry = entrada_auditoria(instance)
 
 
         # Solo actualiza el campo de auditoría si el valor fue cambiado
@@ -378,34 +300,10 @@ class MonitorAdministrativoViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        user = getattr(instance, "user", None)
-        pdf_fields = [
-            'documento_identidad_pdf',
-            'rut_pdf',
-            'certificado_bancario_pdf',
-            'd10_pdf',
-            'tabulado_pdf',
-            'estado_mat_financiera_pdf',
-            'foto'
-        ]
-
-        # Elimina archivos PDF de S3 si existen
-        for field in pdf_fields:
-            pdf_file = getattr(instance, field, None)
-            if pdf_file:
-                try:
-                    pdf_file.delete(save=False)
-                except Exception:
-                    pass
-
         try:
-            with transaction.atomic():
-                # Elimina tokens y usuario primero
-                if user:
-                    Token.objects.filter(user=user).delete()
-                    user.delete()
-                # Luego elimina el MonitorAcademico
-                instance.delete()
+            # Usuario, tokens y archivos en una sola pasada; los archivos se
+            # borran en lote al confirmar (ver cuenta/limpieza.py)
+            purgar_cuentas(MonitorAdministrativo, [instance.pk])
         except Exception as e:
             return Response({"detail": f"Error eliminando monitor: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
 
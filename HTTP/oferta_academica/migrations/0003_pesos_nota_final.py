@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:06
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('oferta_academica', '0002_alter_ofertaacademica_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ofertaacademica',
+            name='peso_conceptual_docente',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.20'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='ofertaacademica',
+            name='peso_conceptual_estudiante',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.20'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='ofertaacademica',
+            name='peso_seguimiento_1',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.30'), max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='ofertaacademica',
+            name='peso_seguimiento_2',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.30'), max_digits=3),
+        ),
+    ]
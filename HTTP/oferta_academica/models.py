@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from django.db import models
 
 class OfertaAcademica(models.Model):
@@ -17,6 +19,12 @@ class OfertaAcademica(models.Model):
         default='inscripcion'
     )
 
+    # Pesos de la nota final del seguimiento académico; deben sumar 1
+    peso_seguimiento_1 = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.30'))
+    peso_seguimiento_2 = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.30'))
+    peso_conceptual_docente = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.20'))
+    peso_conceptual_estudiante = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.20'))
+
     def __str__(self):
         return f"Oferta: {self.nombre} | Estado: {self.get_estado_display()} | Inicio: {self.fecha_inicio}"
 
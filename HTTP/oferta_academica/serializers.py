@@ -1,8 +1,28 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import OfertaAcademica
 
+CAMPOS_PESO = ('peso_seguimiento_1', 'peso_seguimiento_2', 'peso_conceptual_docente', 'peso_conceptual_estudiante')
+
 class OfertaAcademicaSerializer(serializers.ModelSerializer):
     class Meta:
         model = OfertaAcademica
         fields = '__all__'
-        read_only_fields = ('id_oferta_academica',)
\ No newline at end of file
+        read_only_fields = ('id_oferta_academica',)
+        extra_kwargs = {campo: {'min_value': Decimal('0'), 'max_value': Decimal('1')} for campo in CAMPOS_PESO}
+
+    def validate(self, attrs):
+        """Los pesos de la nota final deben sumar 1 (se completan con los actuales o los por defecto)."""
+        if any(campo in attrs for campo in CAMPOS_PESO):
+            total = Decimal('0')
+            for campo in CAMPOS_PESO:
+                if campo in attrs:
+                    total += attrs[campo]
+                elif self.instance is not None:
+                    total += getattr(self.instance, campo)
+                else:
+                    total += OfertaAcademica._meta.get_field(campo).default
+            if total != Decimal('1'):
+                raise serializers.ValidationError({'pesos': f'Los pesos de la nota final deben sumar 1 (suman {total}).'})
+        return attrs
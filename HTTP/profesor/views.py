@@ -1,6 +1,6 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from django.contrib.auth.hashers import make_password
+from cuenta.contrasenas import hashear
 from rest_framework.decorators import action
 
 #Documentacion
@@ -22,12 +22,14 @@ from .serializers import ProfesorSerializer, AsignacionProfesorSerializer, Profe
 from modulo.serializers import ModuloProfesorSerializer
 from grupo.serializers import GrupoListaSerializer 
 #Auditoria
-from auditlog.models import LogEntry
+from cuenta.auditoria import entrada_auditoria
 from .serializers import LogEntrySerializer
 from auditlog.context import set_actor
-from django.contrib.contenttypes.models import ContentType
+from cuenta.perfiles import actualizar_perfil
+from cuenta.renombrado import programar_renombrado
+from cuenta.limpieza import purgar_cuentas
+from cuenta.authentication import perfil_id_de
 
-from rest_framework.authtoken.models import Token
 
 def file_update(instance, data, field_name):
         """
@@ -42,10 +44,6 @@ def file_update(instance, data, field_name):
             setattr(instance, field_name, uploaded_file)
             instance.save()
             data.pop(field_name)
-def extract_single_value(value):
-        if isinstance(value, list):
-            return value[0] if value else ''
-        return value
 class ProfesorViewSet(viewsets.ModelViewSet):
     """
     API endpoint para gestionar Profesores.
@@ -126,8 +124,8 @@ class ProfesorViewSet(viewsets.ModelViewSet):
         if not data.get('contrasena'):
             data['contrasena'] = data.get('numero_documento', '')
         
-        # Hashear la contraseña
-        hashed_password = make_password(data['contrasena'])
+        # Se hashea una sola vez: el mismo hash va al usuario y al perfil (ver cuenta/contrasenas.py)
+        hashed_password = hashear(data['contrasena'])
         
         try:
             with transaction.atomic():
@@ -211,7 +209,6 @@ class ProfesorViewSet(viewsets.ModelViewSet):
         try:
             data = request.data.copy() 
             instance = self.get_object()
-            user = instance.user
 
             pdf_fields = [
                 'documento_identidad_pdf',
@@ -223,83 +220,15 @@ class ProfesorViewSet(viewsets.ModelViewSet):
                 'foto'
             ]
 
-            numero_documento_actualizado = False
-            nuevo_numero_documento = None
-            
-            with set_actor(request.user):
-                # Manejar la contraseña si está presente
-                if 'contrasena' in data and data['contrasena']:
-                    new_password = extract_single_value(data.pop('contrasena'))
-                    user.set_password(new_password)
-                    user.save()
-                    hashed_password = make_password(new_password)
-                    instance.contrasena = hashed_password
-                    instance.save()
-                    
-                # Manejar is_active
-                if 'is_active' in data:
-                    is_active = extract_single_value(data.pop('is_active'))
-                    user.is_active = is_active
-                    user.save()
-                    instance.is_active = is_active
-                    instance.save()
-                
-                # Manejar el nombre de usuario
-                if 'nombre' in data:
-                    nombre = extract_single_value(data.pop('nombre'))
-                    user.first_name = nombre
-                    user.save()
-                    instance.nombre = nombre
-                    instance.save()
-                    
-                # Manejar el apellido
-                if 'apellido' in data:
-                    apellido = extract_single_value(data.pop('apellido'))
-                    user.last_name = apellido
-                    user.save()
-                    instance.apellido = apellido
-                    instance.save()
-                
-                # Manejar el email
-                if 'email' in data:
-                    email = extract_single_value(data.pop('email'))
-                    user.email = email
-                    user.save()
-                    instance.email = email
-                    instance.save()
-
-                if 'numero_documento' in data:
-                    numero_documento = extract_single_value(data.pop('numero_documento'))
-                    user.username = numero_documento
-                    user.save()
-                    instance.numero_documento = numero_documento
-                    instance.save()
-                    numero_documento_actualizado = True
-                    nuevo_numero_documento = numero_documento
-
-                # Actualización de nombre de archivos PDF si numero_documento fue actualizado
-                if numero_documento_actualizado:
-                    for field in pdf_fields:
-                        file_field = getattr(instance, field, None)
-                        if file_field and hasattr(file_field, 'name') and file_field.name:
-                            import os
-                            from django.core.files.base import ContentFile
-
-                            old_file_name = file_field.name  # Ruta completa en el bucket
-                            file_content = file_field.read()  # Lee el contenido antes de borrar
-
-                            # Elimina el archivo viejo del bucket
-                            storage = file_field.storage
-                            if storage.exists(old_file_name):
-                                storage.delete(old_file_name)
-
-                            # Construye el nuevo nombre
-                            new_filename = f"{nuevo_numero_documento}.pdf"
-                            file_dir = os.path.dirname(old_file_name)
-                            new_file_path = os.path.join(file_dir, new_filename)
-
-                            # Sube el archivo con el nuevo nombre
-                            getattr(instance, field).save(new_file_path, ContentFile(file_content), save=True)
+            # Todo el partial_update en una transacción: el renombrado de archivos
+            # arranca solo después del último save de la petición
+            with set_actor(request.user), transaction.atomic():
+                # Datos de cuenta: se aplican en memoria y se guarda una vez por
+                # tabla (ver cuenta/perfiles.py)
+                if 'numero_documento' in actualizar_perfil(instance, data):
+                    # Los archivos se renombran en segundo plano al confirmar la
+                    # transacción, sin leerlos en la petición (ver cuenta/renombrado.py)
+                    programar_renombrado(instance, pdf_fields)
                 
                 # --- CAMBIO: eliminar 'foto' si está vacía ---
                 if 'foto' in data:
@@ -373,12 +302,8 @@ class ProfesorViewSet(viewsets.ModelViewSet):
 
         instance.save(update_fields=['estado'])
 
-        # Busca el último logentry después de guardar
-        content_type = ContentType.objects.get_for_model(instance)
-        logentry = LogEntry.objects.filter(
-            object_id=instance.pk,
-            content_type=content_type
-        ).order_by('-timestamp').first()
+        # Entrada de auditoría capturada al guardar (ver cuenta/auditoria.py)
+        logentry = entrada_auditoria(instance)
 
 
         # Solo actualiza el campo de auditoría si el valor fue cambiado
@@ -427,34 +352,10 @@ class ProfesorViewSet(viewsets.ModelViewSet):
     )
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
-        user = getattr(instance, "user", None)
-        pdf_fields = [
-            'documento_identidad_pdf',
-            'rut_pdf',
-            'certificado_bancario_pdf',
-            'hoja_vida_pdf',
-            'certificado_laboral_pdf',
-            'certificado_academico_pdf',
-            'foto'
-        ]
-
-        # Elimina archivos PDF de S3 si existen
-        for field in pdf_fields:
-            pdf_file = getattr(instance, field, None)
-            if pdf_file:
-                try:
-                    pdf_file.delete(save=False)
-                except Exception:
-                    pass
-
         try:
-            with transaction.atomic():
-                # Elimina tokens y usuario primero
-                if user:
-                    Token.objects.filter(user=user).delete()
-                    user.delete()
-                # Luego elimina el MonitorAcademico
-                instance.delete()
+            # Usuario, tokens y archivos en una sola pasada; los archivos se
+            # borran en lote al confirmar (ver cuenta/limpieza.py)
+            purgar_cuentas(Profesor, [instance.pk])
         except Exception as e:
             return Response({"detail": f"Error eliminando monitor: {str(e)}"}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -528,20 +429,13 @@ class ProfesorViewSet(viewsets.ModelViewSet):
         Devuelve los grupos asociados al profesor autenticado.
         Endpoint: GET /api/profesores/mi-grupos/
         """
-        # Obtener el objeto Profesor asociado al usuario autenticado de forma segura
-        profesor = None
-        if isinstance(request.user, Profesor):
-            profesor = request.user
-        else:
-            profesor = getattr(request.user, 'profesor', None)
-            if profesor is None:
-                try:
-                    profesor = Profesor.objects.get(user=request.user)
-                except Profesor.DoesNotExist:
-                    return Response({'detail': 'Profesor no asociado al usuario.'}, status=status.HTTP_404_NOT_FOUND)
+        # El perfil ya viene resuelto con el token (ver cuenta/authentication.py)
+        profesor_id = perfil_id_de(request) if request.user.user_type == 'profesor' else None
+        if profesor_id is None:
+            return Response({'detail': 'Profesor no asociado al usuario.'}, status=status.HTTP_404_NOT_FOUND)
 
         # Obtener los grupos relacionados con sus estudiantes
-        qs = profesor.grupos.all().select_related('monitor_academico').prefetch_related(
+        qs = Grupo.objects.filter(profesor_id=profesor_id).select_related('monitor_academico').prefetch_related(
             'matricula__id_estudiante' 
         )
 
@@ -2,6 +2,7 @@ from django_rest_passwordreset.views import ResetPasswordRequestToken
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
 from rest_framework import status
+from cuenta.identidad import resolver
 
 #Documentacion
 from drf_yasg.utils import swagger_auto_schema
@@ -27,8 +28,12 @@ class CustomResetPasswordRequestToken(ResetPasswordRequestToken):
         if not document_number:
             return Response({'error': 'Se requiere el número de documento.'}, status=status.HTTP_400_BAD_REQUEST)
         
+        # Los documentos inexistentes se responden desde la caché (ver cuenta/identidad.py)
+        identidad = resolver(document_number)
         try:
-            user = User.objects.get(username=document_number)
+            if identidad is None or identidad.user_id is None:
+                raise User.DoesNotExist
+            user = User.objects.only('email').get(pk=identidad.user_id)
         except User.DoesNotExist:
             # No reveles si el número existe o no: responde como si hubiera funcionado
             return Response({'status': 'OK'}, status=status.HTTP_200_OK)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AcademicMonitoringConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seguimiento_academico'
+
+    def ready(self):
+        import seguimiento_academico.signals
@@ -0,0 +1,88 @@
+"""
+Lista de estudiantes de un profesor con sus notas (planilla de seguimiento).
+
+Antes se recorrían las inscripciones con `select_related` y se leía
+`insc.seguimiento`, una relación inversa sin precargar: una consulta más por
+estudiante. Ahora:
+
+- `filas_estudiantes` es una sola proyección `values_list()` con LEFT JOIN a
+  estudiante, grupo, módulo y seguimiento, leída con `iterator()` y emitida
+  como arreglo JSON fila por fila (StreamingHttpResponse).
+- `huella_estudiantes` calcula en la base de datos el MD5 de esa misma
+  proyección: el ETag. Si el profesor reabre la planilla y nada cambió, la
+  vista responde 304 sin leer ni serializar las filas.
+"""
+import json
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.db.models import F, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Concat, MD5
+from rest_framework.utils.encoders import JSONEncoder
+
+from inscripcion.models import Inscripcion
+
+# Columna de la proyección -> lookup desde Inscripcion
+COLUMNAS = {
+    'id_inscripcion': 'id_inscripcion',
+    'nombre': 'id_estudiante__nombre',
+    'apellido': 'id_estudiante__apellido',
+    'numero_documento': 'id_estudiante__numero_documento',
+    'email': 'id_estudiante__email',
+    'colegio': 'id_estudiante__colegio',
+    'tipo_vinculacion': 'tipo_vinculacion',
+    'grupo_nombre': 'grupo__nombre',
+    'modulo': 'id_modulo__nombre_modulo',
+    'id_seguimiento': 'seguimiento__id_seguimiento',
+    'seguimiento_1': 'seguimiento__seguimiento_1',
+    'seguimiento_2': 'seguimiento__seguimiento_2',
+    'nota_conceptual_docente': 'seguimiento__nota_conceptual_docente',
+    'nota_conceptual_estudiante': 'seguimiento__nota_conceptual_estudiante',
+    'nota_final': 'seguimiento__nota_final',
+    'observaciones': 'seguimiento__observaciones',
+}
+NOTAS = ('seguimiento_1', 'seguimiento_2', 'nota_conceptual_docente', 'nota_conceptual_estudiante', 'nota_final')
+SEPARADOR = '\x1f'
+TAMANO_BLOQUE = 500
+
+
+def inscripciones_de_profesor(profesor_id, grupo_id=None):
+    queryset = Inscripcion.objects.filter(grupo__profesor_id=profesor_id)
+    if grupo_id is not None:
+        queryset = queryset.filter(grupo_id=grupo_id)
+    return queryset.order_by('id_inscripcion')
+
+
+def huella_estudiantes(queryset):
+    """MD5 (calculado en la base) de todas las columnas de la lista, o None si está vacía."""
+    partes = []
+    for lookup in COLUMNAS.values():
+        # Distingue NULL de cadena vacía
+        partes += [Coalesce(Cast(F(lookup), TextField()), Value('\\N')), Value(SEPARADOR)]
+    return queryset.order_by().aggregate(
+        huella=MD5(StringAgg(Concat(*partes, output_field=TextField()), delimiter='\n', ordering='id_inscripcion'))
+    )['huella']
+
+
+def _fila(valores):
+    fila = dict(zip(COLUMNAS, valores))
+    for nota in NOTAS:
+        if fila[nota] is not None:
+            fila[nota] = float(fila[nota])
+    fila['colegio'] = fila['colegio'] or ''
+    fila['grupo_nombre'] = fila['grupo_nombre'] or 'Sin grupo'
+    fila['modulo'] = fila['modulo'] or 'N/A'
+    fila['observaciones'] = fila['observaciones'] or ''
+    # Campos combinados (retrocompatibilidad)
+    fila['estudiante_nombre'] = f"{fila['nombre']} {fila['apellido']}"
+    fila['documento'] = fila['numero_documento']
+    return fila
+
+
+def filas_estudiantes(queryset):
+    """Genera el arreglo JSON de la lista, fila por fila, desde una sola consulta."""
+    yield '['
+    separador = ''
+    for valores in queryset.values_list(*COLUMNAS.values()).iterator(chunk_size=TAMANO_BLOQUE):
+        yield separador + json.dumps(_fila(valores), cls=JSONEncoder, ensure_ascii=False)
+        separador = ','
+    yield ']'
@@ -0,0 +1,52 @@
+# Generated by Django 5.0.14 on 2026-10-18 17:06
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import ExpressionWrapper, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Round
+
+# Copia de seguimiento_academico/notas.py al momento de esta migración
+CAMPOS_PESO = {
+    'seguimiento_1': ('peso_seguimiento_1', Decimal('0.30')),
+    'seguimiento_2': ('peso_seguimiento_2', Decimal('0.30')),
+    'nota_conceptual_docente': ('peso_conceptual_docente', Decimal('0.20')),
+    'nota_conceptual_estudiante': ('peso_conceptual_estudiante', Decimal('0.20')),
+}
+
+
+def calcular_notas_finales(apps, schema_editor):
+    Inscripcion = apps.get_model('inscripcion', 'Inscripcion')
+    SeguimientoAcademico = apps.get_model('seguimiento_academico', 'SeguimientoAcademico')
+
+    decimal = models.DecimalField(max_digits=6, decimal_places=4)
+    total = None
+    for nota, (peso, por_defecto) in CAMPOS_PESO.items():
+        factor = Coalesce(F(f'oferta_academica__{peso}'), Value(por_defecto), output_field=decimal)
+        termino = ExpressionWrapper(OuterRef(nota) * factor, output_field=decimal)
+        total = termino if total is None else total + termino
+    nota_final = Subquery(
+        Inscripcion.objects.filter(pk=OuterRef('id_inscripcion_id'))
+        .annotate(nota_final=Round(total, 2, output_field=decimal))
+        .values('nota_final')[:1],
+        output_field=models.DecimalField(max_digits=4, decimal_places=2),
+    )
+    SeguimientoAcademico.objects.update(nota_final=nota_final)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inscripcion', '0009_indices_filtros'),
+        ('oferta_academica', '0003_pesos_nota_final'),
+        ('seguimiento_academico', '0002_alter_seguimientoacademico_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seguimientoacademico',
+            name='nota_final',
+            field=models.DecimalField(db_index=True, decimal_places=2, default=0.0, editable=False, max_digits=4),
+        ),
+        migrations.RunPython(calcular_notas_finales, migrations.RunPython.noop),
+    ]
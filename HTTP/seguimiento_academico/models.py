@@ -1,5 +1,4 @@
 from django.db import models
-from decimal import Decimal
 
 class SeguimientoAcademico(models.Model):
     id_seguimiento = models.AutoField(primary_key=True)
@@ -14,14 +13,17 @@ class SeguimientoAcademico(models.Model):
     fecha_ultimo_cambio = models.DateTimeField(auto_now=True)
     observaciones = models.TextField(blank=True, null=True)
 
-    @property
-    def nota_final(self):
-        """Calcula una nota final sugerida (opcional, ajusta los pesos)"""
-        # Ejemplo: 30% Seg1, 30% Seg2, 20% Concept Docente, 20% Estudiante
-        return (self.seguimiento_1 * Decimal('0.3') + 
-                self.seguimiento_2 * Decimal('0.3') + 
-                self.nota_conceptual_docente * Decimal('0.2') + 
-                self.nota_conceptual_estudiante * Decimal('0.2'))
+    # Nota final ponderada con los pesos de la oferta académica (ver notas.py)
+    nota_final = models.DecimalField(max_digits=4, decimal_places=2, default=0.00, db_index=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        from .notas import calcular_nota_final, pesos_de_inscripcion
+
+        self.nota_final = calcular_nota_final(self, pesos_de_inscripcion(self.id_inscripcion_id))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'nota_final'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Seguimiento {self.id_inscripcion.id_estudiante.nombre} - Insc: {self.id_inscripcion_id}"
@@ -0,0 +1,175 @@
+"""
+Nota final ponderada guardada en la base de datos.
+
+`nota_final` era una propiedad calculada en Python objeto por objeto, así que
+los reportes cargaban todos los seguimientos para promediarlos o
+clasificarlos. Ahora es una columna indexada de SeguimientoAcademico que se
+mantiene al escribir:
+
+- `save()` la calcula con los pesos de la oferta académica de la inscripción.
+- La planilla (planilla.py) la calcula por fila con los pesos que trae su
+  consulta de permisos y la incluye en el upsert.
+- Si cambian los pesos de una oferta, o la oferta de una inscripción,
+  `recalcular_notas_finales` la actualiza con un solo UPDATE (signals.py).
+
+Una columna generada no sirve porque los pesos están en otra tabla. Con la
+columna indexada, distribuciones, aprobados, rankings y promedios por grupo
+salen de agregados SQL (ver `analitica` en views.py).
+"""
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db.models import (
+    Avg, Count, DecimalField, ExpressionWrapper, F, IntegerField, Max, Min, OuterRef, Q, Subquery, Value,
+)
+from django.db.models.functions import Cast, Coalesce, Floor, Least, Round
+
+# Nota -> peso en OfertaAcademica
+CAMPOS_PESO = {
+    'seguimiento_1': 'peso_seguimiento_1',
+    'seguimiento_2': 'peso_seguimiento_2',
+    'nota_conceptual_docente': 'peso_conceptual_docente',
+    'nota_conceptual_estudiante': 'peso_conceptual_estudiante',
+}
+PESOS_POR_DEFECTO = {
+    'peso_seguimiento_1': Decimal('0.30'),
+    'peso_seguimiento_2': Decimal('0.30'),
+    'peso_conceptual_docente': Decimal('0.20'),
+    'peso_conceptual_estudiante': Decimal('0.20'),
+}
+CENTESIMA = Decimal('0.01')
+NOTA_APROBACION = Decimal('3.00')
+NOTA_MAXIMA = 5
+ANCHO_RANGO = Decimal('0.5')
+
+
+def calcular_nota_final(notas, pesos=None):
+    """
+    Nota final de `notas` (objeto o dict con las cuatro notas) con los `pesos`
+    dados (dict por nombre de peso; los que falten o sean None usan el valor
+    por defecto). Redondeada a centésimas, igual que en la base de datos.
+    """
+    pesos = pesos or {}
+    total = Decimal('0')
+    for nota, peso in CAMPOS_PESO.items():
+        valor = notas.get(nota) if isinstance(notas, dict) else getattr(notas, nota)
+        factor = pesos.get(peso)
+        if factor is None:
+            factor = PESOS_POR_DEFECTO[peso]
+        total += Decimal(str(valor or 0)) * Decimal(str(factor))
+    return total.quantize(CENTESIMA, rounding=ROUND_HALF_UP)
+
+
+def pesos_de_inscripcion(id_inscripcion):
+    """Pesos de la oferta académica de la inscripción (una consulta)."""
+    from inscripcion.models import Inscripcion
+
+    fila = Inscripcion.objects.filter(pk=id_inscripcion).values(
+        *[f'oferta_academica__{peso}' for peso in PESOS_POR_DEFECTO]
+    ).first() or {}
+    return {peso: fila.get(f'oferta_academica__{peso}') for peso in PESOS_POR_DEFECTO}
+
+
+def expresion_nota_final():
+    """
+    Nota final como expresión SQL sobre SeguimientoAcademico: una subconsulta
+    a su inscripción (con LEFT JOIN a la oferta) que pondera las notas.
+    """
+    from inscripcion.models import Inscripcion
+
+    decimal = DecimalField(max_digits=6, decimal_places=4)
+    total = None
+    for nota, peso in CAMPOS_PESO.items():
+        factor = Coalesce(F(f'oferta_academica__{peso}'), Value(PESOS_POR_DEFECTO[peso]), output_field=decimal)
+        termino = ExpressionWrapper(OuterRef(nota) * factor, output_field=decimal)
+        total = termino if total is None else total + termino
+    return Subquery(
+        Inscripcion.objects.filter(pk=OuterRef('id_inscripcion_id'))
+        .annotate(nota_final=Round(total, 2, output_field=decimal))
+        .values('nota_final')[:1],
+        output_field=DecimalField(max_digits=4, decimal_places=2),
+    )
+
+
+def recalcular_notas_finales(queryset):
+    """Recalcula la nota final de los seguimientos de `queryset` en un solo UPDATE."""
+    return queryset.update(nota_final=expresion_nota_final())
+
+
+def _numero(valor):
+    return float(valor) if valor is not None else None
+
+
+def analitica_notas(queryset, nota_aprobacion=NOTA_APROBACION, top=10):
+    """
+    Estadísticas de la nota final de los seguimientos de `queryset`, todas
+    con agregados SQL sobre la columna indexada: resumen, distribución en
+    rangos de 0.5, promedio por grupo y las `top` mejores notas.
+    """
+    aprobado = Q(nota_final__gte=nota_aprobacion)
+    resumen = queryset.aggregate(
+        total=Count('pk'),
+        promedio=Avg('nota_final'),
+        minima=Min('nota_final'),
+        maxima=Max('nota_final'),
+        aprobados=Count('pk', filter=aprobado),
+    )
+
+    # Rango = floor(nota / 0.5); la nota máxima cae en el último rango
+    rangos = int(NOTA_MAXIMA / ANCHO_RANGO)
+    cantidades = dict(
+        queryset.order_by()
+        .annotate(rango=Least(Cast(Floor(F('nota_final') / ANCHO_RANGO), IntegerField()), Value(rangos - 1)))
+        .values('rango').annotate(cantidad=Count('pk')).values_list('rango', 'cantidad')
+    )
+    distribucion = [
+        {
+            'desde': float(rango * ANCHO_RANGO),
+            'hasta': float((rango + 1) * ANCHO_RANGO),
+            'cantidad': cantidades.get(rango, 0),
+        }
+        for rango in range(rangos)
+    ]
+
+    por_grupo = [
+        {
+            'grupo': fila['id_inscripcion__grupo'],
+            'grupo_nombre': fila['id_inscripcion__grupo__nombre'] or 'Sin grupo',
+            'cantidad': fila['cantidad'],
+            'promedio': round(float(fila['promedio']), 2),
+            'aprobados': fila['aprobados'],
+        }
+        for fila in queryset.order_by()
+        .values('id_inscripcion__grupo', 'id_inscripcion__grupo__nombre')
+        .annotate(cantidad=Count('pk'), promedio=Avg('nota_final'), aprobados=Count('pk', filter=aprobado))
+        .order_by('-promedio', 'id_inscripcion__grupo__nombre')
+    ]
+
+    ranking = [
+        {
+            'id_seguimiento': fila['id_seguimiento'],
+            'id_inscripcion': fila['id_inscripcion'],
+            'nombre': fila['id_inscripcion__id_estudiante__nombre'],
+            'apellido': fila['id_inscripcion__id_estudiante__apellido'],
+            'grupo_nombre': fila['id_inscripcion__grupo__nombre'] or 'Sin grupo',
+            'nota_final': _numero(fila['nota_final']),
+        }
+        for fila in queryset.order_by('-nota_final', 'id_seguimiento').values(
+            'id_seguimiento', 'id_inscripcion', 'id_inscripcion__id_estudiante__nombre',
+            'id_inscripcion__id_estudiante__apellido', 'id_inscripcion__grupo__nombre', 'nota_final',
+        )[:top]
+    ]
+
+    return {
+        'resumen': {
+            'total': resumen['total'],
+            'promedio': round(_numero(resumen['promedio']), 2) if resumen['promedio'] is not None else None,
+            'minima': _numero(resumen['minima']),
+            'maxima': _numero(resumen['maxima']),
+            'nota_aprobacion': float(nota_aprobacion),
+            'aprobados': resumen['aprobados'],
+            'reprobados': resumen['total'] - resumen['aprobados'],
+        },
+        'distribucion': distribucion,
+        'por_grupo': por_grupo,
+        'ranking': ranking,
+    }
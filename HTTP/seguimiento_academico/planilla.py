@@ -0,0 +1,114 @@
+"""
+Guardado de la planilla de notas completa de un grupo en una sola petición.
+
+`create` califica una inscripción por petición (perfil, propiedad del grupo,
+búsqueda del seguimiento, validación y guardado): una planilla de 35
+estudiantes eran 35 peticiones y unas 150 consultas. `guardar_planilla`:
+
+1. Valida cada fila por separado (sin consultas) y reporta sus errores.
+2. Verifica en una sola consulta que las inscripciones existan y, para un
+   profesor, que pertenezcan a sus grupos; la misma consulta indica si ya
+   tenían seguimiento y trae los pesos de la nota final de su oferta.
+3. Hace upsert con `bulk_create(update_conflicts=True)` sobre
+   `id_inscripcion`: un INSERT ... ON CONFLICT por cada combinación de campos
+   enviados (en la práctica uno, o dos si algunas filas traen observaciones).
+
+El número de consultas no depende del número de filas.
+"""
+from django.db import transaction
+
+from inscripcion.models import Inscripcion
+
+from .models import SeguimientoAcademico
+from .notas import PESOS_POR_DEFECTO, calcular_nota_final
+from .serializers import CalificacionPlanillaSerializer
+
+MAXIMO_FILAS = 500
+
+
+def guardar_planilla(filas, profesor_id=None):
+    """
+    Guarda las notas de `filas`. Si se pasa `profesor_id`, solo acepta
+    inscripciones de sus grupos. Retorna un resultado por fila, en orden.
+    """
+    resultados = []
+    validas = {}
+    for indice, fila in enumerate(filas):
+        serializer = CalificacionPlanillaSerializer(data=fila)
+        if not serializer.is_valid():
+            resultados.append({
+                'fila': indice,
+                'id_inscripcion': fila.get('id_inscripcion') if isinstance(fila, dict) else None,
+                'estado': 'error',
+                'errores': serializer.errors,
+            })
+            continue
+        datos = serializer.validated_data
+        id_inscripcion = datos['id_inscripcion']
+        if id_inscripcion in validas:
+            resultados.append({
+                'fila': indice,
+                'id_inscripcion': id_inscripcion,
+                'estado': 'error',
+                'errores': {'id_inscripcion': ['La inscripción aparece más de una vez en la planilla.']},
+            })
+            continue
+        validas[id_inscripcion] = indice
+        resultados.append({'fila': indice, 'id_inscripcion': id_inscripcion, 'estado': 'pendiente', 'datos': datos})
+
+    if validas:
+        inscripciones = Inscripcion.objects.filter(id_inscripcion__in=list(validas))
+        if profesor_id is not None:
+            inscripciones = inscripciones.filter(grupo__profesor_id=profesor_id)
+        # Inscripciones permitidas, su seguimiento si existe y los pesos de su oferta (LEFT JOIN)
+        pesos = {}
+        permitidas = {}
+        for fila in inscripciones.values(
+            'id_inscripcion', 'seguimiento__id_seguimiento',
+            *[f'oferta_academica__{peso}' for peso in PESOS_POR_DEFECTO],
+        ):
+            permitidas[fila['id_inscripcion']] = fila['seguimiento__id_seguimiento']
+            pesos[fila['id_inscripcion']] = {peso: fila[f'oferta_academica__{peso}'] for peso in PESOS_POR_DEFECTO}
+    else:
+        permitidas = {}
+
+    por_campos = {}
+    for resultado in resultados:
+        if resultado['estado'] != 'pendiente':
+            continue
+        if resultado['id_inscripcion'] not in permitidas:
+            resultado.update(estado='error', errores={'id_inscripcion': [
+                'La inscripción no existe o no pertenece a tus grupos.' if profesor_id is not None
+                else 'La inscripción no existe.'
+            ]})
+            del resultado['datos']
+            continue
+        datos = resultado['datos']
+        campos = tuple(sorted(campo for campo in datos if campo != 'id_inscripcion'))
+        por_campos.setdefault(campos, []).append(resultado)
+
+    with transaction.atomic():
+        for campos, grupo in por_campos.items():
+            objetos = SeguimientoAcademico.objects.bulk_create(
+                [
+                    SeguimientoAcademico(
+                        id_inscripcion_id=resultado['id_inscripcion'],
+                        nota_final=calcular_nota_final(resultado['datos'], pesos[resultado['id_inscripcion']]),
+                        **{campo: resultado['datos'][campo] for campo in campos},
+                    )
+                    for resultado in grupo
+                ],
+                update_conflicts=True,
+                unique_fields=['id_inscripcion'],
+                # Los campos no enviados conservan su valor al actualizar
+                update_fields=[*campos, 'nota_final', 'fecha_ultimo_cambio'],
+            )
+            for resultado, objeto in zip(grupo, objetos):
+                del resultado['datos']
+                resultado.update(
+                    estado='actualizado' if permitidas[resultado['id_inscripcion']] else 'creado',
+                    # PostgreSQL retorna la llave tanto al insertar como al actualizar
+                    id_seguimiento=objeto.pk,
+                    nota_final=float(objeto.nota_final),
+                )
+    return resultados
@@ -1,3 +1,5 @@
+from decimal import Decimal
+
 from rest_framework import serializers
 from .models import SeguimientoAcademico
 
@@ -15,4 +17,13 @@ class SeguimientoAcademicoSerializer(serializers.ModelSerializer):
             'nota_conceptual_docente', 'nota_conceptual_estudiante', 
             'nota_final', 'fecha_ultimo_cambio', 'observaciones'
         ]
-        read_only_fields = ('id_seguimiento', 'fecha_ultimo_cambio')
\ No newline at end of file
+        read_only_fields = ('id_seguimiento', 'fecha_ultimo_cambio')
+
+class CalificacionPlanillaSerializer(serializers.Serializer):
+    """Una fila de la planilla de notas (ver seguimiento_academico/planilla.py)."""
+    id_inscripcion = serializers.IntegerField()
+    seguimiento_1 = serializers.DecimalField(max_digits=3, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('5'))
+    seguimiento_2 = serializers.DecimalField(max_digits=3, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('5'))
+    nota_conceptual_docente = serializers.DecimalField(max_digits=3, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('5'))
+    nota_conceptual_estudiante = serializers.DecimalField(max_digits=3, decimal_places=2, min_value=Decimal('0'), max_value=Decimal('5'))
+    observaciones = serializers.CharField(required=False, allow_blank=True, allow_null=True)
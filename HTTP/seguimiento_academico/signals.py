@@ -0,0 +1,47 @@
+from django.db.models.signals import pre_save, post_save
+from django.dispatch import receiver
+
+from inscripcion.models import Inscripcion
+from oferta_academica.models import OfertaAcademica
+from .models import SeguimientoAcademico
+from .notas import PESOS_POR_DEFECTO, recalcular_notas_finales
+
+
+# ---------------------------------------------------------------------------
+# Nota final: cambio de los pesos de una oferta académica
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=OfertaAcademica)
+def nota_final_oferta_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._pesos_cambiaron = False
+    if raw or not instance.pk or (update_fields is not None and not set(PESOS_POR_DEFECTO) & set(update_fields)):
+        return
+    anterior = OfertaAcademica.objects.filter(pk=instance.pk).values(*PESOS_POR_DEFECTO).first()
+    instance._pesos_cambiaron = anterior is not None and any(
+        anterior[peso] != getattr(instance, peso) for peso in PESOS_POR_DEFECTO
+    )
+
+
+@receiver(post_save, sender=OfertaAcademica)
+def nota_final_oferta_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_pesos_cambiaron', False):
+        recalcular_notas_finales(SeguimientoAcademico.objects.filter(id_inscripcion__oferta_academica=instance.pk))
+
+
+# ---------------------------------------------------------------------------
+# Nota final: cambio de la oferta académica de una inscripción
+# ---------------------------------------------------------------------------
+
+@receiver(pre_save, sender=Inscripcion)
+def nota_final_inscripcion_pre_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._oferta_cambio = False
+    if raw or not instance.pk or (update_fields is not None and 'oferta_academica' not in update_fields):
+        return
+    anterior = Inscripcion.objects.filter(pk=instance.pk).values_list('oferta_academica_id', flat=True)
+    instance._oferta_cambio = list(anterior) not in ([], [instance.oferta_academica_id])
+
+
+@receiver(post_save, sender=Inscripcion)
+def nota_final_inscripcion_post_save(sender, instance, raw=False, **kwargs):
+    if not raw and getattr(instance, '_oferta_cambio', False):
+        recalcular_notas_finales(SeguimientoAcademico.objects.filter(id_inscripcion=instance.pk))
@@ -1,3 +1,89 @@
-from django.test import TestCase
+import json
+from decimal import Decimal
 
-# Create your tests here.
+import pytest
+from rest_framework.test import APIClient
+
+from .models import SeguimientoAcademico
+
+
+@pytest.mark.django_db
+def test_planilla_guarda_por_lote_y_reporta_cada_fila(inscripcion_instance, profesor_instance, django_assert_max_num_queries):
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    notas = {'seguimiento_1': '4.0', 'seguimiento_2': '3.0', 'nota_conceptual_docente': '5', 'nota_conceptual_estudiante': '4.5'}
+    planilla = {'calificaciones': [
+        {'id_inscripcion': inscripcion_instance.pk, **notas},
+        {'id_inscripcion': 999999, **notas},
+        {'id_inscripcion': inscripcion_instance.pk, **notas, 'seguimiento_1': '7'},
+    ]}
+
+    with django_assert_max_num_queries(6):
+        respuesta = client.post('/seguimiento_academico/seg/planilla/', planilla, format='json')
+
+    assert respuesta.status_code == 200
+    assert [r['estado'] for r in respuesta.data['resultados']] == ['creado', 'error', 'error']
+    assert 'seguimiento_1' in respuesta.data['resultados'][2]['errores']
+    assert respuesta.data['resultados'][0]['nota_final'] == 4.0
+
+    planilla = {'calificaciones': [{'id_inscripcion': inscripcion_instance.pk, **notas, 'seguimiento_2': '5'}]}
+    respuesta = client.post('/seguimiento_academico/seg/planilla/', planilla, format='json')
+
+    assert respuesta.data['resultados'][0]['estado'] == 'actualizado'
+    assert SeguimientoAcademico.objects.get(id_inscripcion=inscripcion_instance).seguimiento_2 == 5
+
+
+@pytest.mark.django_db
+def test_nota_final_usa_pesos_de_la_oferta_y_alimenta_la_analitica(inscripcion_instance, profesor_instance, django_assert_max_num_queries):
+    seguimiento = SeguimientoAcademico.objects.create(
+        id_inscripcion=inscripcion_instance, seguimiento_1=5, seguimiento_2=2,
+        nota_conceptual_docente=4, nota_conceptual_estudiante=3,
+    )
+    assert seguimiento.nota_final == Decimal('3.50')
+
+    oferta = inscripcion_instance.oferta_academica
+    oferta.peso_seguimiento_1 = Decimal('0.70')
+    oferta.peso_seguimiento_2 = Decimal('0.10')
+    oferta.peso_conceptual_docente = Decimal('0.10')
+    oferta.peso_conceptual_estudiante = Decimal('0.10')
+    oferta.save()
+    seguimiento.refresh_from_db()
+    assert seguimiento.nota_final == Decimal('4.40')
+
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    with django_assert_max_num_queries(5):
+        respuesta = client.get('/seguimiento_academico/seg/analitica/', {'nota_aprobacion': '4.5'})
+
+    assert respuesta.status_code == 200
+    assert respuesta.data['resumen'] == {
+        'total': 1, 'promedio': 4.4, 'minima': 4.4, 'maxima': 4.4,
+        'nota_aprobacion': 4.5, 'aprobados': 0, 'reprobados': 1,
+    }
+    assert [r['cantidad'] for r in respuesta.data['distribucion'] if r['desde'] == 4.0] == [1]
+    assert respuesta.data['por_grupo'][0]['grupo_nombre'] == 'Grupo A'
+    assert respuesta.data['ranking'][0]['nota_final'] == 4.4
+
+
+@pytest.mark.django_db
+def test_estudiantes_seguimiento_una_consulta_y_etag(inscripcion_instance, profesor_instance, django_assert_max_num_queries):
+    client = APIClient()
+    client.force_authenticate(user=profesor_instance.user)
+    url = '/seguimiento_academico/seg/estudiantes-seguimiento/'
+
+    with django_assert_max_num_queries(3):
+        respuesta = client.get(url)
+        filas = json.loads(b''.join(respuesta.streaming_content))
+
+    assert respuesta.status_code == 200
+    assert [(f['id_inscripcion'], f['grupo_nombre'], f['id_seguimiento']) for f in filas] == [
+        (inscripcion_instance.pk, 'Grupo A', None)
+    ]
+    etag = respuesta['ETag']
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert client.get(url, {'grupo': inscripcion_instance.grupo_id + 1}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    SeguimientoAcademico.objects.create(id_inscripcion=inscripcion_instance, seguimiento_1=4)
+    respuesta = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert respuesta.status_code == 200
+    assert json.loads(b''.join(respuesta.streaming_content))[0]['seguimiento_1'] == 4.0
@@ -15,7 +15,13 @@ from cuenta.permissions import IsEstudiante, IsProfesor, IsAdministrador, IsProf
 
 
 from rest_framework.decorators import action
-from profesor.models import Profesor
+from cuenta.authentication import perfil_id_de
+from .planilla import MAXIMO_FILAS, guardar_planilla
+from .notas import NOTA_APROBACION, analitica_notas
+from .lista import filas_estudiantes, huella_estudiantes, inscripciones_de_profesor
+from django.http import HttpResponseNotModified, StreamingHttpResponse
+from django.utils.http import parse_etags, quote_etag
+from decimal import Decimal, InvalidOperation
 from inscripcion.models import Inscripcion
 
 class SeguimientoAcademicoViewSet(viewsets.ModelViewSet):
@@ -35,77 +41,57 @@ class SeguimientoAcademicoViewSet(viewsets.ModelViewSet):
             return queryset
         
         if user.user_type == 'profesor':
-            # Obtener el profesor asociado al usuario actual
-            try:
-                profesor = Profesor.objects.get(user=user)
-                # Filtrar seguimientos de inscripciones cuyos grupos pertenecen a este profesor
-                return queryset.filter(id_inscripcion__grupo__profesor=profesor)
-            except Profesor.DoesNotExist:
+            # El perfil del profesor ya viene resuelto con el token (ver cuenta/authentication.py)
+            profesor_id = perfil_id_de(self.request)
+            if profesor_id is None:
                 return queryset.none()
+            # Filtrar seguimientos de inscripciones cuyos grupos pertenecen a este profesor
+            return queryset.filter(id_inscripcion__grupo__profesor_id=profesor_id)
         
         return queryset.none()
 
     @swagger_auto_schema(
         operation_summary="Listar estudiantes para seguimiento",
-        operation_description="Retorna la lista de inscripciones (estudiantes) de los grupos del profesor con su estado de seguimiento.",
-        responses={200: "Lista de estudiantes con sus notas actuales"}
+        operation_description=(
+            "Retorna la lista de inscripciones (estudiantes) de los grupos del profesor con su estado de seguimiento. "
+            "La respuesta trae un `ETag`; si se envía en `If-None-Match` y nada cambió se responde 304 sin cuerpo."
+        ),
+        manual_parameters=[
+            openapi.Parameter('grupo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por uno de los grupos del profesor"),
+        ],
+        responses={200: "Lista de estudiantes con sus notas actuales", 304: "La lista no cambió"}
     )
     @action(detail=False, methods=['get'], url_path='estudiantes-seguimiento')
     def estudiantes_seguimiento(self, request):
         """
         Lista todos los estudiantes (inscripciones) que pertenecen a los grupos 
         del profesor autenticado, incluyendo sus notas si ya existen.
+        Una sola consulta en streaming (ver lista.py).
         """
         user = request.user
         if user.user_type != 'profesor' and not user.is_superuser:
             return Response({"error": "Solo profesores pueden acceder a esta lista"}, status=status.HTTP_403_FORBIDDEN)
         
-        try:
-            profesor = Profesor.objects.get(user=user)
-            # Obtenemos todas las inscripciones del profesor
-            inscripciones = Inscripcion.objects.filter(
-                grupo__profesor=profesor
-            ).select_related('id_estudiante', 'grupo', 'id_modulo')
-            
-            data = []
-            for insc in inscripciones:
-                # IMPORTANTE: En Django, acceder a un reverse OneToOneField que no existe
-                # lanza RelatedObjectDoesNotExist — getattr(..., None) NO lo captura.
-                # Por eso usamos try/except explícito.
-                try:
-                    seguimiento = insc.seguimiento
-                except Exception:
-                    seguimiento = None
-                
-                info = {
-                    "id_inscripcion": insc.id_inscripcion,
-                    # Campos planos para fácil acceso desde el frontend
-                    "nombre": insc.id_estudiante.nombre,
-                    "apellido": insc.id_estudiante.apellido,
-                    "numero_documento": insc.id_estudiante.numero_documento,
-                    "email": insc.id_estudiante.email,
-                    "colegio": getattr(insc.id_estudiante, 'colegio', ''),
-                    "tipo_vinculacion": insc.tipo_vinculacion,
-                    # Campo combinado (retrocompatibilidad)
-                    "estudiante_nombre": f"{insc.id_estudiante.nombre} {insc.id_estudiante.apellido}",
-                    "documento": insc.id_estudiante.numero_documento,
-                    "grupo_nombre": insc.grupo.nombre if insc.grupo else "Sin grupo",
-                    "modulo": insc.id_modulo.nombre_modulo if insc.id_modulo else "N/A",
-                    "id_seguimiento": seguimiento.id_seguimiento if seguimiento else None,
-                    # Notas directamente en el objeto raíz para facilitar mapeo
-                    "seguimiento_1": float(seguimiento.seguimiento_1) if seguimiento else None,
-                    "seguimiento_2": float(seguimiento.seguimiento_2) if seguimiento else None,
-                    "nota_conceptual_docente": float(seguimiento.nota_conceptual_docente) if seguimiento else None,
-                    "nota_conceptual_estudiante": float(seguimiento.nota_conceptual_estudiante) if seguimiento else None,
-                    "nota_final": float(seguimiento.nota_final) if seguimiento else None,
-                    "observaciones": seguimiento.observaciones if seguimiento else "",
-                }
-                data.append(info)
-            
-            return Response(data)
-        except Profesor.DoesNotExist:
+        # El perfil del profesor ya viene resuelto con el token (ver cuenta/authentication.py)
+        profesor_id = perfil_id_de(request) if user.user_type == 'profesor' else None
+        if profesor_id is None:
             return Response({"error": "No se encontró perfil de profesor para este usuario"}, status=status.HTTP_404_NOT_FOUND)
 
+        grupo = request.query_params.get('grupo')
+        if grupo and not grupo.isdigit():
+            return Response({"error": "'grupo' debe ser un id numérico"}, status=status.HTTP_400_BAD_REQUEST)
+        inscripciones = inscripciones_de_profesor(profesor_id, int(grupo) if grupo else None)
+
+        etag = quote_etag(huella_estudiantes(inscripciones) or 'vacia')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = StreamingHttpResponse(filas_estudiantes(inscripciones), content_type='application/json')
+        response['ETag'] = etag
+        # El navegador puede guardar la lista, pero siempre debe revalidarla
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
     @swagger_auto_schema(
         operation_summary="Crear o actualizar nota",
         operation_description="Crea un seguimiento o actualiza uno existente para una inscripción específica."
@@ -118,12 +104,11 @@ class SeguimientoAcademicoViewSet(viewsets.ModelViewSet):
 
         # Verificar que el profesor sea dueño del grupo de esa inscripción
         if request.user.user_type == 'profesor':
-            try:
-                profesor = Profesor.objects.get(user=request.user)
-                if not Inscripcion.objects.filter(id_inscripcion=id_inscripcion, grupo__profesor=profesor).exists():
-                    return Response({"error": "No tienes permiso para calificar a este estudiante"}, status=status.HTTP_403_FORBIDDEN)
-            except Profesor.DoesNotExist:
+            profesor_id = perfil_id_de(request)
+            if profesor_id is None:
                 return Response({"error": "No se encontró perfil de profesor"}, status=status.HTTP_404_NOT_FOUND)
+            if not Inscripcion.objects.filter(id_inscripcion=id_inscripcion, grupo__profesor_id=profesor_id).exists():
+                return Response({"error": "No tienes permiso para calificar a este estudiante"}, status=status.HTTP_403_FORBIDDEN)
 
         # Si ya existe un seguimiento para esa inscripción, lo actualizamos
         seguimiento = SeguimientoAcademico.objects.filter(id_inscripcion=id_inscripcion).first()
@@ -142,4 +127,92 @@ class SeguimientoAcademicoViewSet(viewsets.ModelViewSet):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
             
         serializer.save()
-        return Response(serializer.data, status=status.HTTP_201_CREATED if not seguimiento else status.HTTP_200_OK)
\ No newline at end of file
+        return Response(serializer.data, status=status.HTTP_201_CREATED if not seguimiento else status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Guardar la planilla de notas",
+        operation_description=(
+            "Crea o actualiza en una sola petición las notas de varias inscripciones. "
+            "Cada fila se valida por separado y la respuesta trae el resultado de cada una "
+            "(`creado`, `actualizado` o `error` con sus errores). Los profesores solo pueden "
+            f"calificar inscripciones de sus grupos. Máximo {MAXIMO_FILAS} filas."
+        ),
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'calificaciones': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_OBJECT, properties={
+                        'id_inscripcion': openapi.Schema(type=openapi.TYPE_INTEGER),
+                        'seguimiento_1': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'seguimiento_2': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'nota_conceptual_docente': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'nota_conceptual_estudiante': openapi.Schema(type=openapi.TYPE_NUMBER),
+                        'observaciones': openapi.Schema(type=openapi.TYPE_STRING),
+                    })
+                )
+            }
+        ),
+        responses={200: "Resultado por fila", 400: "Planilla vacía o con formato inválido"}
+    )
+    @action(detail=False, methods=['post'], url_path='planilla')
+    def planilla(self, request):
+        filas = request.data.get('calificaciones') if isinstance(request.data, dict) else request.data
+        if not isinstance(filas, list) or not filas:
+            return Response({"error": "Se espera una lista no vacía en 'calificaciones'"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(filas) > MAXIMO_FILAS:
+            return Response({"error": f"La planilla supera el máximo de {MAXIMO_FILAS} filas"}, status=status.HTTP_400_BAD_REQUEST)
+
+        profesor_id = None
+        if request.user.user_type == 'profesor':
+            profesor_id = perfil_id_de(request)
+            if profesor_id is None:
+                return Response({"error": "No se encontró perfil de profesor"}, status=status.HTTP_404_NOT_FOUND)
+
+        resultados = guardar_planilla(filas, profesor_id)
+        errores = sum(1 for resultado in resultados if resultado['estado'] == 'error')
+        return Response({
+            "guardadas": len(resultados) - errores,
+            "errores": errores,
+            "resultados": resultados,
+        }, status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_summary="Analítica de notas",
+        operation_description=(
+            "Estadísticas de la nota final calculadas en la base de datos: total, promedio, "
+            "mínima, máxima, aprobados y reprobados, distribución en rangos de 0.5, promedio "
+            "por grupo y ranking de las mejores notas. Los profesores solo ven sus grupos."
+        ),
+        manual_parameters=[
+            openapi.Parameter('oferta_academica', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por oferta académica"),
+            openapi.Parameter('grupo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por grupo"),
+            openapi.Parameter('modulo', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Filtrar por módulo"),
+            openapi.Parameter('nota_aprobacion', openapi.IN_QUERY, type=openapi.TYPE_NUMBER, description=f"Nota mínima para aprobar (por defecto {NOTA_APROBACION})"),
+            openapi.Parameter('top', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, description="Tamaño del ranking (por defecto 10, máximo 100)"),
+        ],
+        responses={200: "Estadísticas de notas", 400: "Parámetros inválidos"}
+    )
+    @action(detail=False, methods=['get'], url_path='analitica')
+    def analitica(self, request):
+        filtros = {}
+        for parametro, lookup in (
+            ('oferta_academica', 'id_inscripcion__oferta_academica'),
+            ('grupo', 'id_inscripcion__grupo'),
+            ('modulo', 'id_inscripcion__id_modulo'),
+        ):
+            valor = request.query_params.get(parametro)
+            if valor:
+                if not valor.isdigit():
+                    return Response({"error": f"'{parametro}' debe ser un id numérico"}, status=status.HTTP_400_BAD_REQUEST)
+                filtros[lookup] = int(valor)
+
+        try:
+            nota_aprobacion = Decimal(request.query_params.get('nota_aprobacion', NOTA_APROBACION))
+            top = int(request.query_params.get('top', 10))
+        except (InvalidOperation, ValueError):
+            return Response({"error": "'nota_aprobacion' y 'top' deben ser numéricos"}, status=status.HTTP_400_BAD_REQUEST)
+        if not nota_aprobacion.is_finite() or not 0 <= nota_aprobacion <= 5 or not 0 <= top <= 100:
+            return Response({"error": "'nota_aprobacion' va de 0 a 5 y 'top' de 0 a 100"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(analitica_notas(self.get_queryset().filter(**filtros), nota_aprobacion, top))
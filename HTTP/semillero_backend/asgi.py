@@ -4,13 +4,14 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'semillero_backend.settings')
 
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
 
 import estudiante.routing
+from cuenta.websocket import TokenAuthMiddleware
 
 application = ProtocolTypeRouter({
     "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    # La API usa tokens, no sesiones: el socket se autentica con el mismo token
+    "websocket": TokenAuthMiddleware(
         URLRouter(
             estudiante.routing.websocket_urlpatterns
         )
@@ -76,12 +76,13 @@ INSTALLED_APPS = [
     "auditlog",
     'prueba_diagnostica',
     'encuesta_satisfaccion',
+    'exportacion',
     'django_extensions',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-         'rest_framework.authentication.TokenAuthentication',
+         'cuenta.authentication.CachedTokenAuthentication',
          'cuenta.authentication.BearerTokenAuthentication',
     ),
     'EXCEPTION_HANDLER': 'cuenta.utils.custom_exception_handler',
@@ -150,6 +151,23 @@ CHANNEL_LAYERS = {
         },
     },
 }
+# Caché compartida entre workers. Sin REDIS_CACHE_URL (desarrollo/pruebas) se usa
+# la caché local en memoria de cada proceso.
+REDIS_CACHE_URL = os.getenv('REDIS_CACHE_URL')
+if REDIS_CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
 # Base de datos
 DATABASE_URL = os.environ.get('DATABASE_URL', 'sqlite:///db.sqlite3')
 DATABASES = {
@@ -189,8 +207,36 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hilos del pool acotado para hashear contraseñas en cargas masivas (ver
+# cuenta/contrasenas.py). Por defecto min(4, núcleos).
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '0')) or None
+
+# Vencimiento de los tokens (ver cuenta/sesiones.py): TTL deslizante en
+# segundos y mínimo de segundos entre extensiones de un mismo token
+TOKEN_TTL = int(os.getenv('TOKEN_TTL', str(7 * 24 * 60 * 60)))
+TOKEN_RENOVACION = int(os.getenv('TOKEN_RENOVACION', '300'))
+
+# Caché de sesiones por token (ver cuenta/authentication.py): segundos en la
+# caché compartida, segundos y tamaño del LRU local, alias de la caché
+# compartida (vacío para usar solo el LRU local) y segundos entre lecturas de
+# la generación compartida (ventana en la que un LRU puede servir una sesión
+# revocada desde otro proceso)
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', '300'))
+TOKEN_CACHE_TTL_LOCAL = int(os.getenv('TOKEN_CACHE_TTL_LOCAL', '30'))
+TOKEN_CACHE_MAX_LOCAL = int(os.getenv('TOKEN_CACHE_MAX_LOCAL', '10000'))
+TOKEN_CACHE_ALIAS = os.getenv('TOKEN_CACHE_ALIAS', 'default')
+TOKEN_GENERACION_INTERVALO = float(os.getenv('TOKEN_GENERACION_INTERVALO', '1'))
+
+# Ausencias consecutivas que marcan riesgo de deserción (ver asistencia/analitica.py)
+ASISTENCIA_AUSENCIAS_RIESGO = int(os.getenv('ASISTENCIA_AUSENCIAS_RIESGO', '3'))
+
+# Minutos en 'procesando' tras los cuales el comando procesar_exportaciones
+# reintenta un trabajo de exportación (ver exportacion/motor.py)
+EXPORTACION_MINUTOS_MAXIMOS = int(os.getenv('EXPORTACION_MINUTOS_MAXIMOS', '30'))
+
+# ModelBackend que además carga el token y el perfil en la misma consulta
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'cuenta.backends.DocumentoBackend',
 ]
 # Internacionalización
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -7,7 +7,7 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.shortcuts import render
 from login.views import LoginView
-from logout.views import LogoutView
+from logout.views import LogoutView, RevocarSesionesView
 
 schema_view = get_schema_view(
    openapi.Info(
@@ -51,9 +51,11 @@ urlpatterns = [
     path('monitor_academico/', include('monitor_academico.urls')),
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('logout/revocar/', RevocarSesionesView.as_view(), name='revocar-sesiones'),
     path('recuperacion_contrasena/', include('recuperacion_contrasena.urls')),
     path('prueba_diagnostica/', include('prueba_diagnostica.urls')),
     path('encuesta_satisfaccion/', include('encuesta_satisfaccion.urls')),
+    path('exportacion/', include('exportacion.urls')),
     path('swagger<format>/', schema_view.without_ui(cache_timeout=0), name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),